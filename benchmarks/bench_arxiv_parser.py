@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the arXiv Atom feed parser.
+
+Parses a 2,000-entry search feed with _parse_arxiv_feed and reports entries
+per second (best of --repeat runs). Pass --feed with a feed recorded from the
+export API, e.g.
+
+    curl -o feed.xml 'http://export.arxiv.org/api/query?search_query=cat:cs.LG&max_results=2000'
+
+otherwise a synthetic feed with the same structure (authors with
+affiliations, links, categories, DOI) is generated.
+
+Usage:
+    python benchmarks/bench_arxiv_parser.py [--feed feed.xml] [--entries 2000] [--repeat 10]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from core.arxiv import _parse_arxiv_feed
+
+WORDS = (
+    "we propose a novel method for learning representations of graphs with attention that "
+    "outperforms prior work on several benchmarks while requiring fewer parameters and less data"
+).split()
+
+
+def make_entry(rng: random.Random, n: int) -> str:
+    arxiv_id = f"2401.{n:05d}v{rng.randint(1, 3)}"
+    authors = "".join(
+        f"""
+    <author>
+      <name>Author {n}-{a}</name>
+      <arxiv:affiliation xmlns:arxiv="http://arxiv.org/schemas/atom">University of Examples</arxiv:affiliation>
+    </author>"""
+        for a in range(rng.randint(1, 8))
+    )
+    categories = "".join(
+        f'\n    <category term="{term}" scheme="http://arxiv.org/schemas/atom"/>'
+        for term in rng.sample(["cs.LG", "cs.AI", "cs.CL", "stat.ML", "cs.CV", "math.OC"], rng.randint(1, 4))
+    )
+    summary = " ".join(rng.choice(WORDS) for _ in range(rng.randint(120, 250)))
+    return f"""
+  <entry>
+    <id>http://arxiv.org/abs/{arxiv_id}</id>
+    <updated>2024-01-{rng.randint(1, 28):02d}T12:00:00Z</updated>
+    <published>2024-01-{rng.randint(1, 28):02d}T12:00:00Z</published>
+    <title>{" ".join(rng.choice(WORDS) for _ in range(10))}</title>
+    <summary>{summary}</summary>{authors}
+    <arxiv:comment xmlns:arxiv="http://arxiv.org/schemas/atom">12 pages, 4 figures</arxiv:comment>
+    <arxiv:doi xmlns:arxiv="http://arxiv.org/schemas/atom">10.48550/arXiv.{arxiv_id}</arxiv:doi>
+    <link href="http://arxiv.org/abs/{arxiv_id}" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}" rel="related" type="application/pdf"/>
+    <arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>{categories}
+  </entry>"""
+
+
+def make_feed(entries: int) -> bytes:
+    rng = random.Random(42)
+    body = "".join(make_entry(rng, n) for n in range(entries))
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <link href="http://arxiv.org/api/query" rel="self" type="application/atom+xml"/>
+  <title type="html">ArXiv Query: search_query=cat:cs.LG</title>
+  <opensearch:totalResults xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">{entries * 10}</opensearch:totalResults>
+  <opensearch:startIndex xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">0</opensearch:startIndex>
+  <opensearch:itemsPerPage xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">{entries}</opensearch:itemsPerPage>{body}
+</feed>""".encode()
+
+
+def main(feed: bytes, repeat: int) -> None:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        entries, _ = _parse_arxiv_feed(feed)
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    print(f"feed: {len(feed) / 1e6:.1f} MB, {len(entries)} entries")
+    print(f"best of {repeat}: {best * 1000:.1f} ms ({len(entries) / best:,.0f} entries/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feed", help="Recorded feed XML file (default: synthetic feed)")
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    if args.feed:
+        with open(args.feed, "rb") as f:
+            feed = f.read()
+    else:
+        feed = make_feed(args.entries)
+    main(feed, args.repeat)
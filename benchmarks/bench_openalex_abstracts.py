@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark OpenAlex abstract reconstruction: linear slot placement vs. sorting.
+
+Rebuilds every abstract of per_page=200 result pages with both
+implementations, checks that the outputs are identical and prints the time per
+page. Pass recorded pages with --page (JSON bodies of /works responses), e.g.
+
+    curl -o page.json 'https://api.openalex.org/works?search=attention&per_page=200'
+
+otherwise synthetic works from bench_openalex_select.py are used.
+
+Usage:
+    python benchmarks/bench_openalex_abstracts.py [--page page.json ...] [--repeat 50]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from bench_openalex_select import make_work
+from core.openalex import _reconstruct_abstract_by_sorting, _reconstruct_abstract_from_inverted_index
+
+
+def best_of(repeat: int, reconstruct, indexes: list) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for index in indexes:
+            reconstruct(index)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(pages: list[str], repeat: int) -> None:
+    if pages:
+        works = []
+        for page in pages:
+            with open(page, "rb") as f:
+                works.extend(json.load(f)["results"])
+    else:
+        rng = random.Random(42)
+        works = [make_work(rng, n) for n in range(200)]
+    indexes = [work["abstract_inverted_index"] for work in works if work.get("abstract_inverted_index")]
+    for index in indexes:
+        assert _reconstruct_abstract_from_inverted_index(index) == _reconstruct_abstract_by_sorting(index), "outputs differ"
+
+    page_count = len(works) / 200
+    sorting = best_of(repeat, _reconstruct_abstract_by_sorting, indexes) / page_count
+    linear = best_of(repeat, _reconstruct_abstract_from_inverted_index, indexes) / page_count
+    print(f"{len(indexes)} abstracts in {len(works)} works")
+    print(f"sorting: {sorting * 1000:.2f} ms per 200 works")
+    print(f"linear:  {linear * 1000:.2f} ms per 200 works ({sorting / linear:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page", action="append", default=[], help="Recorded /works response (repeatable)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    main(args.page, args.repeat)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark OpenAlex select= field projection on a per_page=200 result page.
+
+Builds a synthetic page of full OpenAlex work objects (shaped like real
+responses: authorships with institutions, every location, referenced and
+related works, counts_by_year, topics, ...) and the same page projected to
+OPENALEX_WORK_FIELDS, then compares the payload size and the time to decode
+and parse each one. Payload sizes are reported raw and gzip-compressed, since
+OpenAlex serves gzip.
+
+Usage:
+    python benchmarks/bench_openalex_select.py [--per-page 200] [--repeat 20]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from core.openalex import OPENALEX_WORK_FIELDS, _parse_openalex_work
+
+WORDS = (
+    "attention transformer network learning model neural language training data representation "
+    "graph inference sequence optimization gradient benchmark evaluation dataset encoder decoder"
+).split()
+
+
+def location(rng: random.Random, n: int) -> dict:
+    return {
+        "is_oa": rng.random() < 0.5,
+        "landing_page_url": f"https://doi.org/10.1234/example.{n}",
+        "pdf_url": f"https://example.org/papers/{n}.pdf" if rng.random() < 0.5 else None,
+        "source": {
+            "id": f"https://openalex.org/S{rng.randrange(10**9)}",
+            "display_name": "Journal of Synthetic Results",
+            "issn_l": "1234-5678",
+            "issn": ["1234-5678", "8765-4321"],
+            "is_oa": False,
+            "is_in_doaj": False,
+            "host_organization": f"https://openalex.org/P{rng.randrange(10**9)}",
+            "host_organization_name": "Example Publisher",
+            "type": "journal",
+        },
+        "license": "cc-by",
+        "version": "publishedVersion",
+        "is_accepted": True,
+        "is_published": True,
+    }
+
+
+def make_work(rng: random.Random, n: int) -> dict:
+    abstract = [rng.choice(WORDS) for _ in range(180)]
+    inverted_index: dict = {}
+    for position, word in enumerate(abstract):
+        inverted_index.setdefault(word, []).append(position)
+    authorships = [
+        {
+            "author_position": "middle",
+            "author": {
+                "id": f"https://openalex.org/A{rng.randrange(10**10)}",
+                "display_name": f"Author {n}-{a}",
+                "orcid": f"https://orcid.org/0000-0002-{rng.randrange(10**4):04d}-{rng.randrange(10**4):04d}",
+            },
+            "institutions": [
+                {
+                    "id": f"https://openalex.org/I{rng.randrange(10**9)}",
+                    "display_name": "University of Examples",
+                    "ror": "https://ror.org/00example",
+                    "country_code": "US",
+                    "type": "education",
+                    "lineage": [f"https://openalex.org/I{rng.randrange(10**9)}"],
+                }
+            ],
+            "countries": ["US"],
+            "is_corresponding": a == 0,
+            "raw_author_name": f"Author {n}-{a}",
+            "raw_affiliation_strings": ["Department of Computer Science, University of Examples, Springfield, USA"],
+        }
+        for a in range(rng.randint(2, 12))
+    ]
+    locations = [location(rng, n * 10 + i) for i in range(rng.randint(1, 6))]
+    return {
+        "id": f"https://openalex.org/W{n}",
+        "doi": f"https://doi.org/10.1234/example.{n}",
+        "title": " ".join(rng.choice(WORDS) for _ in range(10)),
+        "display_name": " ".join(rng.choice(WORDS) for _ in range(10)),
+        "relevance_score": rng.random() * 1000,
+        "publication_year": 2023,
+        "publication_date": "2023-06-12",
+        "ids": {"openalex": f"https://openalex.org/W{n}", "doi": f"https://doi.org/10.1234/example.{n}", "mag": str(n)},
+        "language": "en",
+        "primary_location": locations[0],
+        "type": "article",
+        "open_access": {"is_oa": True, "oa_status": "green", "oa_url": locations[0]["landing_page_url"], "any_repository_has_fulltext": True},
+        "authorships": authorships,
+        "countries_distinct_count": 1,
+        "institutions_distinct_count": 1,
+        "corresponding_author_ids": [authorships[0]["author"]["id"]],
+        "apc_list": {"value": 2000, "currency": "USD", "value_usd": 2000},
+        "cited_by_count": rng.randrange(10000),
+        "biblio": {"volume": "12", "issue": "3", "first_page": "100", "last_page": "120"},
+        "is_retracted": False,
+        "is_paratext": False,
+        "primary_topic": {"id": "https://openalex.org/T10028", "display_name": "Topic Modeling", "score": 0.99},
+        "topics": [
+            {"id": f"https://openalex.org/T{10000 + t}", "display_name": f"Topic {t}", "score": rng.random(),
+             "subfield": {"id": "https://openalex.org/subfields/1702", "display_name": "Artificial Intelligence"},
+             "field": {"id": "https://openalex.org/fields/17", "display_name": "Computer Science"},
+             "domain": {"id": "https://openalex.org/domains/3", "display_name": "Physical Sciences"}}
+            for t in range(3)
+        ],
+        "keywords": [{"id": f"https://openalex.org/keywords/{w}", "display_name": w, "score": rng.random()} for w in rng.sample(WORDS, 5)],
+        "concepts": [
+            {"id": f"https://openalex.org/C{rng.randrange(10**9)}", "wikidata": "https://www.wikidata.org/wiki/Q1",
+             "display_name": rng.choice(WORDS), "level": rng.randrange(4), "score": rng.random()}
+            for _ in range(rng.randint(5, 15))
+        ],
+        "mesh": [],
+        "locations_count": len(locations),
+        "locations": locations,
+        "best_oa_location": locations[-1],
+        "sustainable_development_goals": [],
+        "grants": [],
+        "referenced_works_count": 60,
+        "referenced_works": [f"https://openalex.org/W{rng.randrange(10**10)}" for _ in range(rng.randint(20, 80))],
+        "related_works": [f"https://openalex.org/W{rng.randrange(10**10)}" for _ in range(10)],
+        "abstract_inverted_index": inverted_index,
+        "cited_by_api_url": f"https://api.openalex.org/works?filter=cites:W{n}",
+        "counts_by_year": [{"year": year, "cited_by_count": rng.randrange(500)} for year in range(2012, 2025)],
+        "updated_date": "2024-11-02T07:19:25.371312",
+        "created_date": "2023-06-14",
+    }
+
+
+def parse_page(body: bytes) -> list:
+    return [_parse_openalex_work(work) for work in json.loads(body)["results"]]
+
+
+def best_of(repeat: int, body: bytes) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse_page(body)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(per_page: int, repeat: int) -> None:
+    rng = random.Random(42)
+    works = [make_work(rng, n) for n in range(per_page)]
+    selected = OPENALEX_WORK_FIELDS
+    full = json.dumps({"meta": {"count": per_page}, "results": works}).encode()
+    projected = json.dumps({"meta": {"count": per_page}, "results": [{k: w[k] for k in selected if k in w} for w in works]}).encode()
+    assert parse_page(full) == parse_page(projected), "projection changed the parsed output"
+
+    print(f"per_page={per_page}")
+    print(f"{'':>10} {'bytes':>10} {'gzip bytes':>11} {'decode+parse ms':>16}")
+    results = {}
+    for name, body in (("full", full), ("select", projected)):
+        results[name] = (len(body), len(gzip.compress(body)), best_of(repeat, body) * 1000)
+        print(f"{name:>10} {results[name][0]:>10} {results[name][1]:>11} {results[name][2]:>16.2f}")
+    print(f"{'saved':>10} {1 - results['select'][0] / results['full'][0]:>10.0%} "
+          f"{1 - results['select'][1] / results['full'][1]:>11.0%} {1 - results['select'][2] / results['full'][2]:>16.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-page", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.per_page, args.repeat)
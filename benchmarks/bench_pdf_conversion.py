@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark serial vs. parallel (page batch) PDF to markdown conversion.
+
+Generates synthetic PDFs of increasing length, converts each one serially (one
+to_markdown call) and in parallel page batches across the conversion process
+pool, checks that both produce the same markdown and prints the timings. The
+smallest page count where parallel wins is a good value for
+PAPERCLIP_PDF_PARALLEL_PAGE_THRESHOLD on that machine.
+
+Usage:
+    python benchmarks/bench_pdf_conversion.py [--workers N] [--pages 8,16,32,64,128,256]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+import pymupdf
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import config
+from utils.conversion import ConversionService
+from utils.markdown_cache import MarkdownCache
+from utils.pdf2md import _convert_document
+
+PARAGRAPH = (
+    "Preprints let researchers share results before peer review. This paragraph is filler text "
+    "that is long enough to wrap over several lines so the converter has real layout work to do. "
+)
+
+
+def make_pdf(path: str, page_count: int) -> None:
+    document = pymupdf.open()
+    for page_number in range(1, page_count + 1):
+        page = document.new_page()
+        page.insert_text((72, 72), f"Section {page_number}", fontsize=18)
+        page.insert_textbox(pymupdf.Rect(72, 100, 540, 740), PARAGRAPH * 12, fontsize=10)
+    document.save(path)
+
+
+async def timed_conversion(path: str, threshold: int, service: ConversionService, cache: MarkdownCache) -> tuple[float, str]:
+    with mock.patch.object(config, "PDF_PARALLEL_PAGE_THRESHOLD", threshold), \
+            mock.patch("utils.pdf2md.get_conversion_service", return_value=service), \
+            mock.patch("utils.pdf2md.get_markdown_cache", return_value=cache):
+        started = time.perf_counter()
+        markdown = await _convert_document(path, "benchmark", write_images=False)
+        return time.perf_counter() - started, markdown
+
+
+async def main(workers: int, page_counts: list[int]) -> None:
+    service = ConversionService(max_workers=workers, max_queue=workers, timeout=600)
+    # Disabled cache: measure conversion only
+    cache = MarkdownCache(tempfile.mkdtemp(), max_bytes=0)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        warmup = os.path.join(temp_dir, "warmup.pdf")
+        make_pdf(warmup, workers)
+        # Start every worker process before measuring
+        await timed_conversion(warmup, 1, service, cache)
+
+        print(f"workers={workers}")
+        print(f"{'pages':>6} {'serial s':>9} {'parallel s':>11} {'speedup':>8}")
+        for page_count in page_counts:
+            path = os.path.join(temp_dir, f"{page_count}.pdf")
+            make_pdf(path, page_count)
+            serial, serial_markdown = await timed_conversion(path, page_count + 1, service, cache)
+            parallel, parallel_markdown = await timed_conversion(path, 1, service, cache)
+            assert serial_markdown == parallel_markdown, f"outputs differ for {page_count} pages"
+            print(f"{page_count:>6} {serial:>9.2f} {parallel:>11.2f} {serial / parallel:>7.2f}x")
+    service.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=config.PDF_CONVERSION_WORKERS)
+    parser.add_argument("--pages", default="8,16,32,64,128,256")
+    args = parser.parse_args()
+    asyncio.run(main(max(args.workers, 2), [int(n) for n in args.pages.split(",")]))
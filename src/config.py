@@ -0,0 +1,85 @@
+"""
+Runtime configuration for the paperclip MCP server.
+
+Every setting can be overridden with a PAPERCLIP_* environment variable.
+"""
+
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Shared HTTP client (see core/http.py)
+HTTP_MAX_CONNECTIONS = _env_int("PAPERCLIP_HTTP_MAX_CONNECTIONS", 100)
+HTTP_MAX_KEEPALIVE_CONNECTIONS = _env_int("PAPERCLIP_HTTP_MAX_KEEPALIVE_CONNECTIONS", 40)
+HTTP_MAX_CONNECTIONS_PER_HOST = _env_int("PAPERCLIP_HTTP_MAX_CONNECTIONS_PER_HOST", 10)
+HTTP_KEEPALIVE_EXPIRY = _env_float("PAPERCLIP_HTTP_KEEPALIVE_EXPIRY", 60.0)
+HTTP_CONNECT_TIMEOUT = _env_float("PAPERCLIP_HTTP_CONNECT_TIMEOUT", 10.0)
+HTTP_TIMEOUT = _env_float("PAPERCLIP_HTTP_TIMEOUT", 30.0)
+HTTP2 = _env_bool("PAPERCLIP_HTTP2", True)
+# Sent in the User-Agent so OpenAlex routes us to its polite pool
+CONTACT_EMAIL = os.environ.get("PAPERCLIP_CONTACT_EMAIL", "")
+
+# Per-host request rates as "host=requests_per_second[:burst]" (see core/ratelimit.py)
+RATE_LIMITS = os.environ.get(
+    "PAPERCLIP_RATE_LIMITS",
+    "export.arxiv.org=0.333:1,arxiv.org=1:2,api.openalex.org=8:10,api.osf.io=2:5,share.osf.io=2:5",
+)
+RATE_LIMIT_MAX_QUEUE = _env_int("PAPERCLIP_RATE_LIMIT_MAX_QUEUE", 200)
+
+# Retries of idempotent requests (see core/retry.py)
+RETRY_MAX_ATTEMPTS = _env_int("PAPERCLIP_RETRY_MAX_ATTEMPTS", 4)
+RETRY_BASE_DELAY_SECONDS = _env_float("PAPERCLIP_RETRY_BASE_DELAY_SECONDS", 0.5)
+RETRY_MAX_DELAY_SECONDS = _env_float("PAPERCLIP_RETRY_MAX_DELAY_SECONDS", 8.0)
+RETRY_BUDGET_SECONDS = _env_float("PAPERCLIP_RETRY_BUDGET_SECONDS", 30.0)
+
+# Circuit breakers per upstream host (see core/circuit.py)
+CIRCUIT_FAILURE_THRESHOLD = _env_int("PAPERCLIP_CIRCUIT_FAILURE_THRESHOLD", 5)
+CIRCUIT_SLOW_CALL_SECONDS = _env_float("PAPERCLIP_CIRCUIT_SLOW_CALL_SECONDS", 10.0)
+CIRCUIT_COOLDOWN_SECONDS = _env_float("PAPERCLIP_CIRCUIT_COOLDOWN_SECONDS", 30.0)
+
+# Provider list cache (see core/providers.py)
+PROVIDER_CACHE_TTL_SECONDS = _env_float("PAPERCLIP_PROVIDER_CACHE_TTL_SECONDS", 3600.0)
+PROVIDER_CACHE_MAX_STALE_SECONDS = _env_float("PAPERCLIP_PROVIDER_CACHE_MAX_STALE_SECONDS", 86400.0)
+
+# Overall deadline for search_papers when no provider is given (see tools.py)
+SEARCH_DEADLINE_SECONDS = _env_float("PAPERCLIP_SEARCH_DEADLINE_SECONDS", 20.0)
+# Deadline for the OSF part of get_papers_metadata_batch (two paced requests per OSF ID)
+BATCH_METADATA_OSF_DEADLINE_SECONDS = _env_float("PAPERCLIP_BATCH_METADATA_OSF_DEADLINE_SECONDS", 20.0)
+# OSF IDs accepted per get_papers_metadata_batch call: at api.osf.io=2/s that is
+# one ID per second, so about as many as fit in the deadline above
+BATCH_METADATA_MAX_OSF_IDS = _env_int("PAPERCLIP_BATCH_METADATA_MAX_OSF_IDS", 20)
+
+# PDF downloads larger than this are aborted (see utils/pdf2md.py)
+PDF_MAX_DOWNLOAD_BYTES = _env_int("PAPERCLIP_PDF_MAX_DOWNLOAD_BYTES", 100 * 1024**2)
+
+# PDF to markdown conversion (see utils/conversion.py)
+PDF_CONVERSION_WORKERS = _env_int("PAPERCLIP_PDF_CONVERSION_WORKERS", os.cpu_count() or 2)
+PDF_CONVERSION_QUEUE_SIZE = _env_int("PAPERCLIP_PDF_CONVERSION_QUEUE_SIZE", 16)
+PDF_CONVERSION_TIMEOUT_SECONDS = _env_float("PAPERCLIP_PDF_CONVERSION_TIMEOUT_SECONDS", 120.0)
+# Documents with at least this many pages are split into batches converted in
+# parallel; 0 disables it. Off until measured on the deployment machine with
+# benchmarks/bench_pdf_conversion.py: on 1 CPU it gave no speedup (0.94-1.21x
+# for 8-256 pages), set it to the smallest page count where parallel wins.
+PDF_PARALLEL_PAGE_THRESHOLD = _env_int("PAPERCLIP_PDF_PARALLEL_PAGE_THRESHOLD", 0)
+
+# On-disk caches (see utils/disk_cache.py)
+CACHE_DIR = os.environ.get("PAPERCLIP_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "paperclip")
+PDF_CACHE_MAX_BYTES = _env_int("PAPERCLIP_PDF_CACHE_MAX_BYTES", 2 * 1024**3)
+PDF_CACHE_FRESH_SECONDS = _env_float("PAPERCLIP_PDF_CACHE_FRESH_SECONDS", 86400.0)
+MARKDOWN_CACHE_MAX_BYTES = _env_int("PAPERCLIP_MARKDOWN_CACHE_MAX_BYTES", 512 * 1024**2)
@@ -4,30 +4,56 @@ Core package for paperclip MCP server.
 
 from .arxiv import (
     fetch_arxiv_papers,
+    fetch_arxiv_papers_metadata,
     fetch_single_arxiv_paper_metadata,
+    iter_arxiv_pages,
 )
 from .osf import (
     fetch_osf_preprints,
-    fetch_osf_providers,
+    fetch_osf_preprints_metadata,
     fetch_single_osf_preprint_metadata,
 )
 from .openalex import (
     fetch_openalex_papers,
+    fetch_openalex_papers_metadata,
     fetch_single_openalex_paper_metadata,
+    iter_openalex_papers,
 )
+from .http import close_http_client, get_http_client, set_http_client
+from .paper import Paper, serialize
 
 
-from .providers import get_all_providers, validate_provider, fetch_osf_providers
+from .providers import (
+    get_all_providers,
+    get_osf_providers,
+    get_provider,
+    validate_provider,
+    warm_provider_cache,
+    fetch_osf_providers,
+)
 
 __all__ = [
+    "Paper",
+    "serialize",
     "fetch_arxiv_papers",
+    "fetch_arxiv_papers_metadata",
     "fetch_osf_preprints",
+    "fetch_osf_preprints_metadata",
     "fetch_osf_providers",
     "fetch_single_arxiv_paper_metadata",
     "fetch_single_osf_preprint_metadata",
     "fetch_openalex_papers",
+    "fetch_openalex_papers_metadata",
     "fetch_single_openalex_paper_metadata",
     "get_all_providers",
+    "get_osf_providers",
+    "iter_arxiv_pages",
+    "iter_openalex_papers",
+    "get_provider",
     "validate_provider",
+    "warm_provider_cache",
     "fetch_osf_providers",
+    "get_http_client",
+    "set_http_client",
+    "close_http_client",
 ]
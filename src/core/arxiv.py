@@ -1,35 +1,136 @@
+import io
+import re
 import xml.etree.ElementTree as ET
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from urllib.parse import quote, urlencode
 
-import requests
+import httpx
 
 from utils import sanitize_api_queries
 
+from .http import get_http_client
+from .paper import Paper
+from .retry import retries_of
 
-def fetch_arxiv_papers(
+# IDs per id_list request of a batch lookup
+ARXIV_ID_LIST_BATCH_SIZE = 100
+
+# Entries per search request (the API allows up to 2000, but large pages are slow)
+ARXIV_PAGE_SIZE = 200
+
+# Element tags in ElementTree's {namespace}name form
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_ENTRY = f"{_ATOM}entry"
+_ID = f"{_ATOM}id"
+_TITLE = f"{_ATOM}title"
+_SUMMARY = f"{_ATOM}summary"
+_PUBLISHED = f"{_ATOM}published"
+_UPDATED = f"{_ATOM}updated"
+_AUTHOR = f"{_ATOM}author"
+_NAME = f"{_ATOM}name"
+_CATEGORY = f"{_ATOM}category"
+_LINK = f"{_ATOM}link"
+_DOI = "{http://arxiv.org/schemas/atom}doi"
+_TOTAL_RESULTS = "{http://a9.com/-/spec/opensearch/1.1/}totalResults"
+
+_VERSION_SUFFIX = re.compile(r"v\d+$")
+
+
+async def fetch_arxiv_papers(
     query: Optional[str] = None,
     category: Optional[str] = None,
     author: Optional[str] = None,
     title: Optional[str] = None,
     max_results: int = 100,
     start_index: int = 0,
+    client: Optional[httpx.AsyncClient] = None,
 ) -> Dict[str, Any]:
     """
     Fetch papers from arXiv API using various search parameters.
 
+    Results beyond one page are fetched page by page (see iter_arxiv_pages).
+
     Args:
         query: General search query
         category: arXiv category (e.g., 'cs.AI', 'physics.gen-ph')
         author: Author name to search for
         title: Title keywords to search for
         max_results: Maximum number of results to return (default 100)
-        start_index: Starting index for pagination (default 0)
+        start_index: Starting index for pagination (default 0, or meta.next_start_index of a previous call)
+        client: Optional HTTP client (defaults to the shared client)
 
     Returns:
-        Dictionary containing papers data from arXiv API
+        Dictionary with the papers (list of Paper) under "data" and paging info under "meta"
+    """
+    papers = []
+    meta = {
+        "total_results": 0,
+        "start_index": start_index,
+        "next_start_index": None,
+        "max_results": max_results,
+        "search_query": _build_search_query(query, category, author, title),
+        "retries": 0,
+    }
+    async for page in iter_arxiv_pages(query, category, author, title, max_results, start_index, client):
+        papers.extend(page["data"])
+        meta["total_results"] = page["meta"]["total_results"]
+        meta["next_start_index"] = page["meta"]["next_start_index"]
+        meta["retries"] += page["meta"]["retries"]
+
+    return {"data": papers, "meta": meta}
+
+
+async def iter_arxiv_pages(
+    query: Optional[str] = None,
+    category: Optional[str] = None,
+    author: Optional[str] = None,
+    title: Optional[str] = None,
+    max_results: Optional[int] = 100,
+    start_index: int = 0,
+    client: Optional[httpx.AsyncClient] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield pages of arXiv search results as they arrive.
+
+    Requests ARXIV_PAGE_SIZE entries at a time. The export.arxiv.org rate
+    limit (see config.RATE_LIMITS) spaces the requests 3 seconds apart, as
+    arXiv asks. Each page's meta carries the total from opensearch:totalResults
+    and next_start_index, the start_index to resume from (None after the last
+    result).
+
+    Args:
+        query, category, author, title: Search parameters as for fetch_arxiv_papers
+        max_results: Stop after this many results (None: all results)
+        start_index: Index of the first result
+        client: Optional HTTP client (defaults to the shared client)
     """
-    # Build search query
+    search_query = _build_search_query(query, category, author, title)
+    client = client or get_http_client()
+    remaining = max_results
+
+    while remaining is None or remaining > 0:
+        page_size = ARXIV_PAGE_SIZE if remaining is None else min(remaining, ARXIV_PAGE_SIZE)
+        papers, total, response = await _fetch_arxiv_page(client, search_query, start_index, page_size)
+        start_index += len(papers)
+        # arXiv occasionally returns an empty page before the end, stop instead of looping
+        next_start_index = start_index if papers and start_index < total else None
+        yield {
+            "data": papers,
+            "meta": {
+                "total_results": total,
+                "start_index": start_index - len(papers),
+                "next_start_index": next_start_index,
+                "search_query": search_query,
+                "retries": retries_of(response),
+            },
+        }
+        if next_start_index is None:
+            return
+        if remaining is not None:
+            remaining -= len(papers)
+
+
+def _build_search_query(query: Optional[str], category: Optional[str], author: Optional[str], title: Optional[str]) -> str:
     search_parts = []
 
     if query:
@@ -43,131 +144,186 @@ def fetch_arxiv_papers(
 
     if not search_parts:
         # Default search if no parameters provided
-        search_query = "all:*"
-    else:
-        search_query = " AND ".join(search_parts)
+        return "all:*"
+    return " AND ".join(search_parts)
 
-    # Build API URL
-    base_url = "http://export.arxiv.org/api/query"
-    params = {"search_query": search_query, "start": start_index, "max_results": min(max_results, 20)}
 
-    query_string = urlencode(params, safe=":", quote_via=quote)
-    url = f"{base_url}?{query_string}"
+async def _fetch_arxiv_page(client: httpx.AsyncClient, search_query: str, start: int, size: int) -> Tuple[List[Paper], int, httpx.Response]:
+    """Fetch one page of search results: (papers, opensearch:totalResults, response)."""
+    base_url = "http://export.arxiv.org/api/query"
+    params = {"search_query": search_query, "start": start, "max_results": size}
+    url = f"{base_url}?{urlencode(params, safe=':', quote_via=quote)}"
 
     try:
-        response = requests.get(url, timeout=30)
+        response = await client.get(url, timeout=30)
         response.raise_for_status()
 
-        # Parse XML response
-        root = ET.fromstring(response.content)
-
-        # Extract namespace
-        ns = {"atom": "http://www.w3.org/2005/Atom", "arxiv": "http://arxiv.org/schemas/atom"}
-
-        papers = []
-        for entry in root.findall("atom:entry", ns):
-            paper = _parse_arxiv_entry(entry, ns)
-            papers.append(paper)
-
-        return {
-            "data": papers,
-            "meta": {"total_results": len(papers), "start_index": start_index, "max_results": max_results, "search_query": search_query},
-        }
+        entries, total = _parse_arxiv_feed(response.content)
+        papers = [paper for _, paper in entries]
+        return papers, total if total is not None else start + len(papers), response
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         raise ValueError(f"Request failed: {str(e)}")
-    except ET.ParseError as e:
+    except (ET.ParseError, ValueError) as e:
         raise ValueError(f"Failed to parse arXiv response: {str(e)}")
 
 
-def _parse_arxiv_entry(entry, ns):
-    """Parse a single arXiv entry from XML."""
-    # Extract basic info
-    arxiv_id = entry.find("atom:id", ns).text.split("/")[-1] if entry.find("atom:id", ns) is not None else ""
-    title = entry.find("atom:title", ns).text.strip() if entry.find("atom:title", ns) is not None else ""
-    summary = entry.find("atom:summary", ns).text.strip() if entry.find("atom:summary", ns) is not None else ""
-    published = entry.find("atom:published", ns).text if entry.find("atom:published", ns) is not None else ""
-    updated = entry.find("atom:updated", ns).text if entry.find("atom:updated", ns) is not None else ""
+def _parse_arxiv_feed(content: bytes) -> Tuple[List[Tuple[str, Paper]], Optional[int]]:
+    """
+    Parse an arXiv Atom feed in one streaming pass.
 
-    # Extract authors
+    Returns:
+        ([(atom id, paper), ...], opensearch:totalResults or None)
+    """
+    entries = []
+    total = None
+    root = None
+    for event, element in ET.iterparse(io.BytesIO(content), events=("start", "end")):
+        if root is None:
+            root = element
+        elif event == "start":
+            continue
+        elif element.tag == _ENTRY:
+            entries.append(_parse_arxiv_entry(element))
+            # Drop finished entries so large feeds are not kept in memory
+            root.clear()
+        elif element.tag == _TOTAL_RESULTS and element.text:
+            total = int(element.text)
+    return entries, total
+
+
+def _parse_arxiv_entry(entry: ET.Element) -> Tuple[str, Paper]:
+    """Parse a single arXiv entry from XML, visiting each child once: (atom id, paper)."""
+    entry_id = title = summary = published = updated = pdf_url = abstract_url = doi = ""
     authors = []
-    for author in entry.findall("atom:author", ns):
-        name_elem = author.find("atom:name", ns)
-        if name_elem is not None:
-            authors.append(name_elem.text)
-
-    # Extract categories
     categories = []
-    for category in entry.findall("atom:category", ns):
-        term = category.get("term")
-        if term:
-            categories.append(term)
-
-    # Extract links (PDF, abstract)
-    pdf_url = ""
-    abstract_url = ""
-    for link in entry.findall("atom:link", ns):
-        if link.get("type") == "application/pdf":
-            pdf_url = link.get("href", "")
-        elif link.get("rel") == "alternate":
-            abstract_url = link.get("href", "")
-
-    # Extract DOI if available
-    doi = ""
-    doi_elem = entry.find("arxiv:doi", ns)
-    if doi_elem is not None:
-        doi = doi_elem.text
-
-    return {
-        "id": arxiv_id,
-        "title": title,
-        "summary": summary,
-        "authors": authors,
-        "categories": categories,
-        "published": published,
-        "updated": updated,
-        "pdf_url": pdf_url,
-        "abstract_url": abstract_url,
-        "doi": doi,
-    }
 
-
-def fetch_single_arxiv_paper_metadata(paper_id: str) -> Dict[str, Any]:
+    for child in entry:
+        tag = child.tag
+        if tag == _AUTHOR:
+            for name in child:
+                if name.tag == _NAME:
+                    authors.append(name.text)
+        elif tag == _LINK:
+            # Links (PDF, abstract)
+            if child.get("type") == "application/pdf":
+                pdf_url = child.get("href", "")
+            elif child.get("rel") == "alternate":
+                abstract_url = child.get("href", "")
+        elif tag == _CATEGORY:
+            term = child.get("term")
+            if term:
+                categories.append(term)
+        elif tag == _ID:
+            entry_id = child.text or ""
+        elif tag == _TITLE:
+            title = (child.text or "").strip()
+        elif tag == _SUMMARY:
+            summary = (child.text or "").strip()
+        elif tag == _PUBLISHED:
+            published = child.text or ""
+        elif tag == _UPDATED:
+            updated = child.text or ""
+        elif tag == _DOI:
+            doi = child.text or ""
+
+    arxiv_id = entry_id.split("/")[-1]
+    if pdf_url:
+        # arXiv links are http:// and redirect, go to https:// directly
+        pdf_url = pdf_url.replace("http://", "https://", 1)
+    elif "/abs/" in entry_id:
+        pdf_url = f"https://arxiv.org/pdf/{entry_id.split('/abs/', 1)[1]}"
+
+    return entry_id, Paper(
+        provider="arxiv",
+        id=arxiv_id,
+        title=title,
+        abstract=summary,
+        authors=tuple(authors),
+        published=published,
+        updated=updated,
+        doi=doi,
+        pdf_url=pdf_url,
+        url=abstract_url,
+        subjects=tuple(categories),
+    )
+
+
+async def fetch_single_arxiv_paper_metadata(paper_id: str, client: Optional[httpx.AsyncClient] = None) -> Paper:
     """
     Fetch metadata for a single arXiv paper by ID.
 
     Args:
         paper_id: arXiv paper ID (e.g., '2301.00001' or 'cs.AI/0001001')
+        client: Optional HTTP client (defaults to the shared client)
 
     Returns:
-        Dictionary containing paper metadata
+        The paper
     """
-    # Validate paper exists first
-    pdf_url = f"https://arxiv.org/pdf/{paper_id}"
-    response = requests.head(pdf_url, timeout=10)
-    if response.status_code != 200:
-        raise ValueError(f"arXiv paper not found: {paper_id}")
+    # One export API request: a missing paper simply has no matching entry
+    paper = (await fetch_arxiv_papers_metadata([paper_id], client))[paper_id]
+    if isinstance(paper, Exception):
+        raise paper
+    return paper
+
+
+def _arxiv_id_key(paper_id: str) -> str:
+    """
+    Normalize an arXiv ID for matching requested IDs against returned entries.
+
+    Drops the subject class of old-style IDs, since the API answers
+    "cs.AI/0001001v2" with the entry "cs/0001001v2". The version is kept.
+    """
+    paper_id = paper_id.strip()
+    archive, slash, number = paper_id.rpartition("/")
+    if slash:
+        return f"{archive.split('.')[0]}/{number}"
+    return paper_id
 
-    # Fetch metadata from API
-    try:
-        api_url = f"http://export.arxiv.org/api/query?id_list={paper_id}"
-        response = requests.get(api_url, timeout=30)
-        response.raise_for_status()
 
-        # Parse XML response
-        root = ET.fromstring(response.content)
-        ns = {"atom": "http://www.w3.org/2005/Atom", "arxiv": "http://arxiv.org/schemas/atom"}
+def _arxiv_version(paper_id: str) -> int:
+    match = _VERSION_SUFFIX.search(paper_id)
+    return int(match.group()[1:]) if match else 0
 
-        entry = root.find("atom:entry", ns)
-        if entry is None:
-            raise ValueError(f"No metadata found for paper: {paper_id}")
 
-        metadata = _parse_arxiv_entry(entry, ns)
-        metadata["download_url"] = pdf_url
+async def fetch_arxiv_papers_metadata(paper_ids: List[str], client: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
+    """
+    Fetch metadata for many arXiv papers with id_list requests.
 
-        return metadata
+    Args:
+        paper_ids: arXiv paper IDs
+        client: Optional HTTP client (defaults to the shared client)
 
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Failed to fetch paper metadata: {str(e)}")
-    except ET.ParseError as e:
-        raise ValueError(f"Failed to parse arXiv response: {str(e)}")
\ No newline at end of file
+    Returns:
+        Dictionary mapping each requested ID to its Paper, or to a ValueError if it failed
+    """
+    client = client or get_http_client()
+    results: Dict[str, Any] = {}
+
+    for start in range(0, len(paper_ids), ARXIV_ID_LIST_BATCH_SIZE):
+        batch = paper_ids[start : start + ARXIV_ID_LIST_BATCH_SIZE]
+        params = {"id_list": ",".join(batch), "max_results": len(batch)}
+        url = f"http://export.arxiv.org/api/query?{urlencode(params, safe=',/')}"
+        try:
+            response = await client.get(url, timeout=30)
+            response.raise_for_status()
+            parsed, _ = _parse_arxiv_feed(response.content)
+        except httpx.HTTPError as e:
+            results.update({paper_id: ValueError(f"Failed to fetch paper metadata: {str(e)}") for paper_id in batch})
+            continue
+        except (ET.ParseError, ValueError) as e:
+            results.update({paper_id: ValueError(f"Failed to parse arXiv response: {str(e)}") for paper_id in batch})
+            continue
+
+        # Versioned IDs match their exact entry, unversioned IDs the latest version returned
+        keyed = [(_arxiv_id_key(entry_id.split("/abs/", 1)[1]), paper) for entry_id, paper in parsed if "/abs/" in entry_id]
+        entries = {}
+        for key, paper in sorted(keyed, key=lambda item: _arxiv_version(item[0])):
+            entries[key] = paper
+            entries[_VERSION_SUFFIX.sub("", key)] = paper
+
+        for paper_id in batch:
+            paper = entries.get(_arxiv_id_key(paper_id))
+            results[paper_id] = paper if paper is not None else ValueError(f"arXiv paper not found: {paper_id}")
+
+    return results
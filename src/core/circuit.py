@@ -0,0 +1,182 @@
+"""
+Circuit breakers for upstream hosts.
+
+A host whose requests keep failing (network errors, 5xx) or keep taking longer
+than `slow_call_seconds` is considered degraded. After `failure_threshold`
+such calls in a row its breaker opens and requests to it fail immediately
+instead of waiting for the timeout. After `cooldown` seconds one probe request
+is let through (half-open): success closes the breaker, failure re-opens it.
+
+    closed --(N bad calls in a row)--> open --(cooldown)--> half_open
+      ^                                  ^                      |
+      +------------(probe ok)------------+----(probe failed)----+
+
+Breakers are kept per host in a process-wide registry so their state survives
+event loops and is visible to the tools (provider_status) and to /stats.
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+import httpx
+
+import config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of sending a request to a host whose breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Failure and latency tracking for one upstream host.
+
+    Args:
+        failure_threshold: Consecutive bad calls that open the breaker
+        slow_call_seconds: Calls taking at least this long count as bad
+        cooldown: Seconds the breaker stays open before a probe is allowed
+    """
+
+    def __init__(self, failure_threshold: int, slow_call_seconds: float, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return OPEN
+        return HALF_OPEN
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe may be sent (0 unless open)."""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; claims the probe slot when half-open."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self) -> None:
+        """Give up the probe slot without an outcome (e.g. the caller went away)."""
+        self._probing = False
+
+    def stats(self) -> dict:
+        return {"state": self.state, "failures": self.failures, "retry_in": round(self.retry_in(), 1)}
+
+
+class CircuitBreakerRegistry:
+    """Create and hold one CircuitBreaker per host."""
+
+    def __init__(self, failure_threshold: int, slow_call_seconds: float, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.cooldown = cooldown
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.slow_call_seconds, self.cooldown)
+            self._breakers[host] = breaker
+        return breaker
+
+    def state(self, host: str) -> str:
+        breaker = self._breakers.get(host)
+        return breaker.state if breaker is not None else CLOSED
+
+    def stats(self) -> Dict[str, dict]:
+        return {host: breaker.stats() for host, breaker in self._breakers.items()}
+
+    def reset(self) -> None:
+        self._breakers.clear()
+
+
+_registry: Optional[CircuitBreakerRegistry] = None
+
+
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    """Return the process-wide breaker registry, creating it on first use."""
+    global _registry
+    if _registry is None:
+        _registry = CircuitBreakerRegistry(
+            failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+            slow_call_seconds=config.CIRCUIT_SLOW_CALL_SECONDS,
+            cooldown=config.CIRCUIT_COOLDOWN_SECONDS,
+        )
+    return _registry
+
+
+class CircuitBreakerTransport(httpx.AsyncBaseTransport):
+    """
+    Fail fast for hosts whose breaker is open and record the outcome of every attempt.
+
+    Meant to sit directly above the network transport (below rate limiting,
+    host limits and retries) so each upstream attempt is timed on its own.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, breakers: CircuitBreakerRegistry):
+        self._transport = transport
+        self._breakers = breakers
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        breaker = self._breakers.breaker(host)
+        if not breaker.allow():
+            raise CircuitOpenError(
+                f"{host} is failing, circuit open for another {breaker.retry_in():.0f}s", request=request
+            )
+
+        started = time.monotonic()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError:
+            breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            # A caller giving up on a slow host (e.g. the search deadline) is a slow call
+            if time.monotonic() - started >= breaker.slow_call_seconds:
+                breaker.record_failure()
+            else:
+                breaker.release()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+
+        if response.status_code >= 500 or time.monotonic() - started >= breaker.slow_call_seconds:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,188 @@
+"""
+Shared async HTTP client for all upstream providers.
+
+All provider modules talk to arXiv, OpenAlex and OSF through one long-lived
+httpx.AsyncClient so TCP/TLS connections are pooled and reused across tool calls.
+
+get_http_client()
+    |
+    v
+httpx.AsyncClient (keep-alive, HTTP/2 when the upstream negotiates it)
+    |
+    v
+RetryTransport (backoff + jitter + Retry-After for idempotent requests)
+    |
+    v
+RateLimitTransport (token bucket per upstream host, fair across sessions)
+    |
+    v
+HostLimitTransport (caps concurrent connections per upstream host)
+    |
+    v
+CircuitBreakerTransport (fails fast while an upstream host is degraded)
+    |
+    v
+httpx.AsyncHTTPTransport (connection pool)
+
+The circuit breaker sits below the local rate limit and host queues so it only
+times what the upstream itself takes: waiting for a token or a host slot is
+pacing on our side and must not make a healthy host look slow.
+
+Every provider function accepts an optional `client` argument so tests and
+callers can inject their own client (e.g. one backed by httpx.MockTransport).
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+import httpx
+
+import config
+
+from .circuit import CircuitBreakerTransport, get_circuit_breakers
+from .ratelimit import RateLimitTransport, parse_rate_limits
+from .retry import RetryTransport
+
+USER_AGENT = "paperclip-mcp (+https://github.com/matsjfunke/paperclip)"
+if config.CONTACT_EMAIL:
+    # Identifies us for the OpenAlex polite pool and arXiv API etiquette
+    USER_AGENT = f"paperclip-mcp (+https://github.com/matsjfunke/paperclip; mailto:{config.CONTACT_EMAIL})"
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response stream that releases a host slot once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, semaphore: asyncio.Semaphore):
+        self._stream = stream
+        self._semaphore = semaphore
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._semaphore.release()
+
+
+class HostLimitTransport(httpx.AsyncBaseTransport):
+    """
+    Limit the number of in-flight requests per upstream host.
+
+    httpx.Limits only bounds the pool as a whole, so a burst against one slow
+    host could otherwise take every connection in the pool.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int):
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore_for(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._max_per_host)
+            self._semaphores[host] = semaphore
+        return semaphore
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        semaphore = self._semaphore_for(request.url.host)
+        await semaphore.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, semaphore),
+            extensions=response.extensions,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def create_http_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """
+    Create an AsyncClient configured for upstream provider traffic.
+
+    Args:
+        transport: Optional base transport (defaults to a pooled AsyncHTTPTransport)
+
+    Returns:
+        Configured httpx.AsyncClient
+    """
+    limits = httpx.Limits(
+        max_connections=config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+    )
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(http2=config.HTTP2, limits=limits)
+    transport = CircuitBreakerTransport(transport, get_circuit_breakers())
+    transport = HostLimitTransport(transport, config.HTTP_MAX_CONNECTIONS_PER_HOST)
+    transport = RateLimitTransport(
+        transport,
+        limits=parse_rate_limits(config.RATE_LIMITS),
+        max_queue=config.RATE_LIMIT_MAX_QUEUE,
+    )
+    transport = RetryTransport(
+        transport,
+        max_attempts=config.RETRY_MAX_ATTEMPTS,
+        base_delay=config.RETRY_BASE_DELAY_SECONDS,
+        max_delay=config.RETRY_MAX_DELAY_SECONDS,
+        budget=config.RETRY_BUDGET_SECONDS,
+    )
+
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(config.HTTP_TIMEOUT, connect=config.HTTP_CONNECT_TIMEOUT),
+        follow_redirects=True,
+        headers={"User-Agent": USER_AGENT},
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared AsyncClient, creating it on first use.
+
+    Connections are bound to the event loop they were opened on, so a new client
+    is created if the running loop changed (e.g. between asyncio.run() calls).
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = create_http_client()
+        _client_loop = loop
+    return _client
+
+
+def set_http_client(client: httpx.AsyncClient) -> None:
+    """Install `client` as the shared client for the running event loop (e.g. a mocked client in tests)."""
+    global _client, _client_loop
+
+    _client = client
+    _client_loop = asyncio.get_running_loop()
+
+
+async def close_http_client() -> None:
+    """Close the shared client and its pooled connections."""
+    global _client, _client_loop
+
+    if _client is not None and not _client.is_closed and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+    _client_loop = None
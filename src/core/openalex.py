@@ -1,11 +1,72 @@
-import requests
-from typing import Any, Dict, Optional
+import logging
+
+import httpx
+from typing import Any, AsyncIterator, Dict, List, Optional
 from urllib.parse import urlencode
 
 from utils import sanitize_api_queries
 
+from .http import get_http_client
+from .paper import Paper
+from .retry import retries_of
+
+logger = logging.getLogger(__name__)
+
+# OpenAlex accepts up to 50 values OR-ed with "|" in one filter
+OPENALEX_FILTER_BATCH_SIZE = 50
+
+# Top-level work fields read by _parse_openalex_work. select= only projects
+# top-level fields, but it drops the large ones the parser never reads
+# (referenced_works, related_works, counts_by_year, topics, ...).
+# relevance_score is computed per search rather than stored on the work, so it
+# is not selectable and not part of the parsed paper; projected search results
+# are still ordered by relevance.
+OPENALEX_WORK_FIELDS = (
+    "id",
+    "doi",
+    "title",
+    "display_name",
+    "publication_date",
+    "publication_year",
+    "cited_by_count",
+    "type",
+    "open_access",
+    "primary_location",
+    "locations",
+    "authorships",
+    "concepts",
+    "abstract_inverted_index",
+)
+
+
+def _with_select(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Add select= for the fields the parser reads."""
+    return {**params, "select": ",".join(OPENALEX_WORK_FIELDS)}
+
+
+def _rejects_select(response: httpx.Response) -> bool:
+    """Whether a 400 response complains about the select= list (and not e.g. a malformed filter)."""
+    return response.status_code == 400 and "select" in response.text.lower()
 
-def fetch_openalex_papers(
+
+async def _get_works(client: httpx.AsyncClient, base_url: str, params: Dict[str, Any], safe: str) -> httpx.Response:
+    """
+    GET an OpenAlex works URL with field projection.
+
+    Falls back to full work objects if OpenAlex rejects the select= list, so a
+    renamed field degrades to bigger responses instead of failed lookups. Other
+    400s (bad filters, dates) are raised as they are.
+    """
+    response = await client.get(f"{base_url}?{urlencode(_with_select(params), safe=safe + ',')}", timeout=30)
+    if _rejects_select(response):
+        logger.warning("OpenAlex rejected select=, retrying without field projection: %s", response.text[:200])
+        query_string = urlencode(params, safe=safe)
+        response = await client.get(f"{base_url}?{query_string}" if query_string else base_url, timeout=30)
+    response.raise_for_status()
+    return response
+
+
+async def fetch_openalex_papers(
     query: Optional[str] = None,
     author: Optional[str] = None,
     title: Optional[str] = None,
@@ -15,6 +76,8 @@ def fetch_openalex_papers(
     date_published_gte: Optional[str] = None,
     max_results: int = 20,
     page: int = 1,
+    cursor: Optional[str] = None,
+    client: Optional[httpx.AsyncClient] = None,
 ) -> Dict[str, Any]:
     """
     Fetch papers from the OpenAlex API using various search parameters.
@@ -29,9 +92,12 @@ def fetch_openalex_papers(
         date_published_gte: Published date greater than or equal to (YYYY-MM-DD)
         max_results: Maximum number of results to return (default 20, max 200)
         page: Page number for pagination (default 1)
+        cursor: Cursor for deep pagination, "*" for the first page, then meta.next_cursor.
+            Replaces page, which OpenAlex caps at 10,000 results.
+        client: Optional HTTP client (defaults to the shared client)
 
     Returns:
-        Dictionary containing papers data from OpenAlex API
+        Dictionary with the papers (list of Paper) under "data" and paging info under "meta"
     """
     base_url = "https://api.openalex.org/works"
     filters = {}
@@ -69,13 +135,16 @@ def fetch_openalex_papers(
 
     # Add pagination and results limit
     filters["per_page"] = min(max_results, 200)  # OpenAlex max per_page is 200
-    filters["page"] = page
+    if cursor:
+        filters["cursor"] = cursor
+    else:
+        filters["page"] = page
+
+    client = client or get_http_client()
 
     try:
-        query_string = urlencode(filters, safe=":,") # Allow colons and commas in filter values
-        url = f"{base_url}?{query_string}"
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+        # Allow colons and commas in filter values
+        response = await _get_works(client, base_url, filters, safe=":,")
         data = response.json()
 
         papers = []
@@ -83,22 +152,82 @@ def fetch_openalex_papers(
             paper = _parse_openalex_work(result)
             papers.append(paper)
 
+        meta = {
+            "total_results": data.get("meta", {}).get("count", 0),
+            "page": None if cursor else page,
+            "per_page": filters["per_page"],
+            "search_query": query, # Only include general query for simplicity
+            "retries": retries_of(response),
+        }
+        if cursor:
+            # None on the last page
+            meta["next_cursor"] = data.get("meta", {}).get("next_cursor")
+
         return {
             "data": papers,
-            "meta": {
-                "total_results": data.get("meta", {}).get("count", 0),
-                "page": page,
-                "per_page": filters["per_page"],
-                "search_query": query, # Only include general query for simplicity
-            },
+            "meta": meta,
             "links": data.get("meta", {}).get("next_page", ""),
         }
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         raise ValueError(f"Request failed: {str(e)}")
 
 
-def _parse_openalex_work(work_data: Dict[str, Any]) -> Dict[str, Any]:
+async def iter_openalex_papers(
+    query: Optional[str] = None,
+    author: Optional[str] = None,
+    title: Optional[str] = None,
+    publisher: Optional[str] = None,
+    institution: Optional[str] = None,
+    concepts: Optional[str] = None,
+    date_published_gte: Optional[str] = None,
+    max_results: Optional[int] = None,
+    cursor: str = "*",
+    client: Optional[httpx.AsyncClient] = None,
+) -> AsyncIterator[Paper]:
+    """
+    Yield every paper matching the search, walking OpenAlex with cursor paging.
+
+    Fetches 200 works per request and only holds one page in memory, so it can
+    harvest result sets far beyond the 10,000 result cap of page-based paging.
+    The next page is requested only once the consumer has taken the current one.
+
+    Args:
+        query, author, title, publisher, institution, concepts, date_published_gte:
+            Search parameters as for fetch_openalex_papers
+        max_results: Stop after this many papers (default: all results)
+        cursor: Cursor to resume from (a meta.next_cursor of fetch_openalex_papers)
+        client: Optional HTTP client (defaults to the shared client)
+
+    Yields:
+        Papers as returned in fetch_openalex_papers()["data"]
+    """
+    remaining = max_results
+    while cursor and (remaining is None or remaining > 0):
+        result = await fetch_openalex_papers(
+            query=query,
+            author=author,
+            title=title,
+            publisher=publisher,
+            institution=institution,
+            concepts=concepts,
+            date_published_gte=date_published_gte,
+            max_results=200 if remaining is None else min(remaining, 200),
+            cursor=cursor,
+            client=client,
+        )
+        papers = result["data"]
+        if not papers:
+            return
+        if remaining is not None:
+            papers = papers[:remaining]
+            remaining -= len(papers)
+        for paper in papers:
+            yield paper
+        cursor = result["meta"]["next_cursor"]
+
+
+def _parse_openalex_work(work_data: Dict[str, Any]) -> Paper:
     """Parse a single OpenAlex work entry."""
     # Extract authors
     authors = []
@@ -144,73 +273,157 @@ def _parse_openalex_work(work_data: Dict[str, Any]) -> Dict[str, Any]:
         source = primary_location.get("source") or {}
         primary_source = source.get("display_name", "")
 
-    return {
-        "id": openalex_id,
-        "doi": work_data.get("doi", ""),
-        "title": work_data.get("title", "") or work_data.get("display_name", ""),
-        "abstract": abstract,
-        "authors": authors,
-        "publication_date": work_data.get("publication_date", ""),
-        "publication_year": work_data.get("publication_year"),
-        "cited_by_count": work_data.get("cited_by_count", 0),
-        "concepts": concepts,
-        "primary_location_url": (work_data.get("primary_location") or {}).get("landing_page_url", ""),
-        "primary_source": primary_source,
-        "pdf_url": pdf_url,
-        "open_access_status": (work_data.get("open_access") or {}).get("oa_status", "closed"),
-        "is_open_access": (work_data.get("primary_location") or {}).get("is_oa", False),
-        "type": work_data.get("type", ""),
-        "relevance_score": work_data.get("relevance_score", 0),
-    }
+    return Paper(
+        provider="openalex",
+        id=openalex_id,
+        title=work_data.get("title", "") or work_data.get("display_name", ""),
+        abstract=abstract,
+        authors=tuple(authors),
+        published=work_data.get("publication_date") or "",
+        doi=work_data.get("doi") or "",
+        pdf_url=pdf_url,
+        url=(work_data.get("primary_location") or {}).get("landing_page_url", ""),
+        subjects=tuple(concepts),
+        extra=(
+            ("publication_year", work_data.get("publication_year")),
+            ("cited_by_count", work_data.get("cited_by_count", 0)),
+            ("primary_source", primary_source),
+            ("open_access_status", (work_data.get("open_access") or {}).get("oa_status", "closed")),
+            ("is_open_access", (work_data.get("primary_location") or {}).get("is_oa", False)),
+            ("type", work_data.get("type", "")),
+        ),
+    )
 
 
 def _reconstruct_abstract_from_inverted_index(inverted_index: Dict[str, Any]) -> str:
-    """Reconstruct abstract text from OpenAlex's inverted index format."""
+    """
+    Reconstruct abstract text from OpenAlex's inverted index format.
+
+    Places every word directly into a slot array indexed by position (linear
+    time). Gaps in the positions are skipped; words sharing a position are kept
+    in index order. Unusual indexes (non-integer, negative or very sparse
+    positions) go through the sort-based reconstruction, which gives the same
+    output for all indexes.
+    """
     if not inverted_index:
         return ""
-    
+
+    try:
+        count = 0
+        last = -1
+        for positions in inverted_index.values():
+            if isinstance(positions, list) and positions:
+                if min(positions) < 0:
+                    return _reconstruct_abstract_by_sorting(inverted_index)
+                count += len(positions)
+                last = max(last, max(positions))
+        if last >= 2 * count + 64:
+            return _reconstruct_abstract_by_sorting(inverted_index)
+
+        slots: List[Any] = [None] * (last + 1)
+        shared: Dict[int, List[str]] = {}
+        for word, positions in inverted_index.items():
+            if isinstance(positions, list):
+                for position in positions:
+                    if slots[position] is None:
+                        slots[position] = word
+                    else:
+                        shared.setdefault(position, []).append(word)
+    except (TypeError, IndexError):
+        return _reconstruct_abstract_by_sorting(inverted_index)
+
+    try:
+        if not shared:
+            return " ".join([word for word in slots if word is not None])
+        words = []
+        for position, word in enumerate(slots):
+            if word is not None:
+                words.append(word)
+                words.extend(shared.get(position, ()))
+        return " ".join(words)
+    except Exception:
+        # If reconstruction fails, return empty string
+        return ""
+
+
+def _reconstruct_abstract_by_sorting(inverted_index: Dict[str, Any]) -> str:
+    """Reconstruct abstract text by sorting (position, word) pairs, O(n log n)."""
     try:
         # Create a list to hold words at their positions
         word_positions = []
-        
+
         for word, positions in inverted_index.items():
             if isinstance(positions, list):
                 for position in positions:
                     word_positions.append((position, word))
-        
+
         # Sort by position and reconstruct text
         word_positions.sort(key=lambda x: x[0])
         abstract_words = [word for _, word in word_positions]
-        
+
         return " ".join(abstract_words)
     except Exception:
         # If reconstruction fails, return empty string
         return ""
 
 
-def fetch_single_openalex_paper_metadata(paper_id: str) -> Dict[str, Any]:
+async def fetch_single_openalex_paper_metadata(paper_id: str, client: Optional[httpx.AsyncClient] = None) -> Paper:
     """
     Fetch metadata for a single OpenAlex paper by ID.
 
     Args:
         paper_id: OpenAlex paper ID (e.g., 'W2741809809')
+        client: Optional HTTP client (defaults to the shared client)
 
     Returns:
-        Dictionary containing paper metadata
+        The paper
     """
-    base_url = "https://api.openalex.org/works"
-    url = f"{base_url}/{paper_id}"
+    url = f"https://api.openalex.org/works/{paper_id}"
+    client = client or get_http_client()
 
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+        response = await _get_works(client, url, {}, safe="")
         work_data = response.json()
 
         if not work_data.get("id"):
             raise ValueError(f"No metadata found for paper: {paper_id}")
 
-        metadata = _parse_openalex_work(work_data)
-        return metadata
+        return _parse_openalex_work(work_data)
+
+    except httpx.HTTPError as e:
+        raise ValueError(f"Failed to fetch paper metadata: {str(e)}")
+
+async def fetch_openalex_papers_metadata(paper_ids: List[str], client: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
+    """
+    Fetch metadata for many OpenAlex works with openalex_id filter requests.
+
+    Args:
+        paper_ids: OpenAlex work IDs (e.g., 'W2741809809')
+        client: Optional HTTP client (defaults to the shared client)
+
+    Returns:
+        Dictionary mapping each requested ID to its Paper, or to a ValueError if it failed
+    """
+    client = client or get_http_client()
+    results: Dict[str, Any] = {}
+
+    for start in range(0, len(paper_ids), OPENALEX_FILTER_BATCH_SIZE):
+        batch = paper_ids[start : start + OPENALEX_FILTER_BATCH_SIZE]
+        params = {"filter": f"openalex_id:{'|'.join(batch)}", "per_page": len(batch)}
+        try:
+            response = await _get_works(client, "https://api.openalex.org/works", params, safe=":|")
+            data = response.json()
+        except httpx.HTTPError as e:
+            results.update({paper_id: ValueError(f"Failed to fetch paper metadata: {str(e)}") for paper_id in batch})
+            continue
+
+        works = {}
+        for work_data in data.get("results", []):
+            paper = _parse_openalex_work(work_data)
+            works[paper.id.upper()] = paper
+
+        for paper_id in batch:
+            paper = works.get(paper_id.upper())
+            results[paper_id] = paper if paper is not None else ValueError(f"No metadata found for paper: {paper_id}")
 
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Failed to fetch paper metadata: {str(e)}")
\ No newline at end of file
+    return results
@@ -1,18 +1,25 @@
-from typing import Any, Dict, Optional
+import asyncio
+from typing import Any, Dict, List, Optional, Union
 from urllib.parse import quote, urlencode
 
-import requests
+import httpx
 
+import config
 from utils import sanitize_api_queries
 
-from .providers import fetch_osf_providers, validate_provider
+from .http import get_http_client
+from .paper import Paper
+from .ratelimit import parse_rate_limits
+from .retry import retries_of
+from .providers import get_osf_providers, validate_provider
 
 
-def fetch_osf_preprints(
+async def fetch_osf_preprints(
     provider_id: Optional[str] = None,
     subjects: Optional[str] = None,
     date_published_gte: Optional[str] = None,
     query: Optional[str] = None,
+    client: Optional[httpx.AsyncClient] = None,
 ) -> Dict[str, Any]:
     """
     NOTE: The OSF API only supports a limited set of filters. Many common filters
@@ -25,13 +32,16 @@ def fetch_osf_preprints(
         subjects: Subject filter (e.g., 'psychology', 'neuroscience')
         date_published_gte: Published date greater than or equal to (YYYY-MM-DD)
         query: Text search query for title, author, content (uses trove endpoint)
+        client: Optional HTTP client (defaults to the shared client)
 
     Returns:
-        Dictionary containing preprints data from OSF API or trove search
+        Dictionary with the preprints (list of Paper) under "data", plus the OSF "meta" and "links"
     """
+    client = client or get_http_client()
+
     # If query is provided, use trove search endpoint
     if query:
-        return fetch_osf_preprints_via_trove(query, provider_id)
+        return await fetch_osf_preprints_via_trove(query, provider_id, client=client)
 
     # Build query parameters (only using OSF API supported filters)
     filters = {}
@@ -52,10 +62,12 @@ def fetch_osf_preprints(
         url = base_url
 
     try:
-        response = requests.get(url, timeout=30)
+        response = await client.get(url, timeout=30)
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.HTTPError as e:
+        result = _parse_osf_preprints(response.json())
+        result["meta"]["retries"] = retries_of(response)
+        return result
+    except httpx.HTTPStatusError as e:
         if response.status_code == 400:
             if len(filters) > 1:
                 simple_filters = {}
@@ -66,16 +78,15 @@ def fetch_osf_preprints(
                 simple_url = f"{base_url}?{simple_query}"
 
                 try:
-                    simple_response = requests.get(simple_url, timeout=30)
+                    simple_response = await client.get(simple_url, timeout=30)
                     simple_response.raise_for_status()
-                    result = simple_response.json()
+                    result = _parse_osf_preprints(simple_response.json())
 
                     # Add a note about the simplified search
-                    if "meta" not in result:
-                        result["meta"] = {}
                     result["meta"][
                         "search_note"
                     ] = f"Original search failed (400 error), showing all results for provider '{provider_id}'. You may need to filter results manually."
+                    result["meta"]["retries"] = retries_of(response, simple_response)
                     return result
                 except:
                     pass
@@ -83,16 +94,20 @@ def fetch_osf_preprints(
             raise ValueError(f"Bad request (400) - The search parameters may be invalid. Original error: {str(e)}")
         else:
             raise e
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         raise ValueError(f"Request failed: {str(e)}")
 
 
-def fetch_osf_preprints_via_trove(query: str, provider_id: Optional[str] = None) -> Dict[str, Any]:
+async def fetch_osf_preprints_via_trove(
+    query: str, provider_id: Optional[str] = None, client: Optional[httpx.AsyncClient] = None
+) -> Dict[str, Any]:
     """
-    Fetch preprints using the trove search endpoint and transform to standard format.
+    Fetch preprints using the trove search endpoint, in the same format as fetch_osf_preprints.
     """
     from urllib.parse import quote_plus
 
+    client = client or get_http_client()
+
     # Build trove search URL
     base_url = "https://share.osf.io/trove/index-card-search"
     params = {
@@ -104,8 +119,8 @@ def fetch_osf_preprints_via_trove(query: str, provider_id: Optional[str] = None)
 
     # Validate provider if specified (we'll filter results later)
     if provider_id:
-        if not validate_provider(provider_id):
-            osf_providers = fetch_osf_providers()
+        if not await validate_provider(provider_id, client):
+            osf_providers = await get_osf_providers(client)
             valid_ids = [p["id"] for p in osf_providers]
             raise ValueError(f"Invalid OSF provider: {provider_id}. Valid OSF providers: {valid_ids}")
 
@@ -118,12 +133,11 @@ def fetch_osf_preprints_via_trove(query: str, provider_id: Optional[str] = None)
 
     try:
         headers = {"Accept": "application/json"}
-        response = requests.get(url, headers=headers, timeout=30)
+        response = await client.get(url, headers=headers, timeout=30)
         response.raise_for_status()
         trove_data = response.json()
 
-        # Transform trove format to standard OSF API format
-        transformed_data = []
+        papers = []
         for item in trove_data.get("data", []):
             # Extract OSF ID from @id field
             osf_id = ""
@@ -142,32 +156,32 @@ def fetch_osf_preprints_via_trove(query: str, provider_id: Optional[str] = None)
                 else:
                     continue  # Skip if no publisher info
 
-            # Transform to standard format
-            transformed_item = {
-                "id": osf_id,
-                "type": "preprints",
-                "attributes": {
-                    "title": extract_first_value(item.get("title", [])),
-                    "description": extract_first_value(item.get("description", [])),
-                    "date_created": extract_first_value(item.get("dateCreated", [])),
-                    "date_published": extract_first_value(item.get("dateAccepted", [])),
-                    "date_modified": extract_first_value(item.get("dateModified", [])),
-                    "doi": extract_doi_from_identifiers(item.get("identifier", [])),
-                    "tags": [kw.get("@value", "") for kw in item.get("keyword", [])],
-                    "subjects": [subj.get("prefLabel", [{}])[0].get("@value", "") for subj in item.get("subject", [])],
-                },
-                "relationships": {},
-                "links": {"self": item.get("@id", "")},
-            }
-            transformed_data.append(transformed_item)
-
-        # Return in standard OSF API format
+            papers.append(
+                Paper(
+                    provider="osf",
+                    id=osf_id,
+                    title=extract_first_value(item.get("title", [])),
+                    abstract=extract_first_value(item.get("description", [])),
+                    published=extract_first_value(item.get("dateAccepted", [])),
+                    updated=extract_first_value(item.get("dateModified", [])),
+                    doi=extract_doi_from_identifiers(item.get("identifier", [])),
+                    url=item.get("@id", ""),
+                    subjects=tuple(subj.get("prefLabel", [{}])[0].get("@value", "") for subj in item.get("subject", [])),
+                    extra=(
+                        ("date_created", extract_first_value(item.get("dateCreated", []))),
+                        ("tags", tuple(kw.get("@value", "") for kw in item.get("keyword", []))),
+                    ),
+                )
+            )
+
+        # Same format as fetch_osf_preprints
         return {
-            "data": transformed_data,
+            "data": papers,
             "meta": {
                 "version": "2.0",  # Match OSF API version
-                "total": trove_data.get("meta", {}).get("total", len(transformed_data)),
+                "total": trove_data.get("meta", {}).get("total", len(papers)),
                 "search_note": f"Results from trove search for query: '{query}'",
+                "retries": retries_of(response),
             },
             "links": {
                 "first": trove_data.get("links", {}).get("first", ""),
@@ -178,10 +192,51 @@ def fetch_osf_preprints_via_trove(query: str, provider_id: Optional[str] = None)
             },
         }
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         raise ValueError(f"Trove search failed: {str(e)}")
 
 
+def _parse_osf_preprint(item: Dict[str, Any], pdf_url: str = "") -> Paper:
+    """Build a Paper from an OSF API (JSON:API) preprint resource."""
+    attributes = item.get("attributes") or {}
+    # Subjects are hierarchies: [[{"id": ..., "text": "Psychology"}, {"text": "Social Psychology"}], ...]
+    subjects = []
+    for subject in attributes.get("subjects") or []:
+        for level in subject if isinstance(subject, list) else [subject]:
+            text = level.get("text") if isinstance(level, dict) else level
+            if text and text not in subjects:
+                subjects.append(text)
+
+    return Paper(
+        provider="osf",
+        id=item.get("id", ""),
+        title=attributes.get("title") or "",
+        abstract=attributes.get("description") or "",
+        published=attributes.get("date_published") or "",
+        updated=attributes.get("date_modified") or "",
+        doi=attributes.get("doi") or "",
+        pdf_url=pdf_url,
+        url=(item.get("links") or {}).get("html", ""),
+        subjects=tuple(subjects),
+        extra=(
+            ("date_created", attributes.get("date_created", "")),
+            ("is_published", attributes.get("is_published", False)),
+            ("is_preprint_orphan", attributes.get("is_preprint_orphan", False)),
+            ("license_record", attributes.get("license_record") or {}),
+            ("tags", tuple(attributes.get("tags") or ())),
+        ),
+    )
+
+
+def _parse_osf_preprints(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse an OSF API preprint list, keeping its meta and links."""
+    return {
+        "data": [_parse_osf_preprint(item) for item in document.get("data", [])],
+        "meta": dict(document.get("meta") or {}),
+        "links": document.get("links") or {},
+    }
+
+
 def extract_first_value(field_list):
     """Extract the first @value from a field list."""
     if isinstance(field_list, list) and len(field_list) > 0:
@@ -202,42 +257,85 @@ def extract_doi_from_identifiers(identifiers):
     return ""
 
 
-def fetch_single_osf_preprint_metadata(preprint_id: str) -> Dict[str, Any]:
+async def fetch_single_osf_preprint_metadata(preprint_id: str, client: Optional[httpx.AsyncClient] = None) -> Union[Paper, Dict[str, Any]]:
+    """
+    Fetch metadata for a single OSF preprint, including the download URL of its primary file.
+
+    Returns:
+        The preprint, or an error dict with the preprint under "metadata" if it has no downloadable file
+    """
+    client = client or get_http_client()
+
     try:
         preprint_url = f"https://api.osf.io/v2/preprints/{preprint_id}"
-        response = requests.get(preprint_url, timeout=30)
+        response = await client.get(preprint_url, timeout=30)
         response.raise_for_status()
         preprint_data = response.json()
 
         primary_file_url = preprint_data["data"]["relationships"]["primary_file"]["links"]["related"]["href"]
-        file_response = requests.get(primary_file_url, timeout=30)
+        file_response = await client.get(primary_file_url, timeout=30)
         file_response.raise_for_status()
         file_data = file_response.json()
 
         # Get the download URL
         download_url = file_data["data"]["links"]["download"]
 
-        # Prepare metadata first
-        attributes = preprint_data["data"]["attributes"]
-        metadata = {
-            "id": preprint_id,
-            "title": attributes.get("title", ""),
-            "description": attributes.get("description", ""),
-            "date_created": attributes.get("date_created", ""),
-            "date_published": attributes.get("date_published", ""),
-            "date_modified": attributes.get("date_modified", ""),
-            "is_published": attributes.get("is_published", False),
-            "is_preprint_orphan": attributes.get("is_preprint_orphan", False),
-            "license_record": attributes.get("license_record", {}),
-            "doi": attributes.get("doi", ""),
-            "tags": attributes.get("tags", []),
-            "subjects": attributes.get("subjects", []),
-            "download_url": download_url,
-        }
+        paper = _parse_osf_preprint({**preprint_data["data"], "id": preprint_id}, pdf_url=download_url or "")
 
         if not download_url:
-            return {"status": "error", "message": "Download URL not available", "metadata": metadata}
+            return {"status": "error", "message": "Download URL not available", "metadata": paper}
 
-        return metadata
-    except requests.exceptions.RequestException as e:
+        return paper
+    except httpx.HTTPError as e:
         raise ValueError(f"Failed to fetch preprint metadata: {str(e)}")
+
+
+def _osf_api_burst() -> int:
+    """Number of api.osf.io requests the configured rate limit lets through at once."""
+    _, burst = parse_rate_limits(config.RATE_LIMITS).get("api.osf.io", (0.0, 5))
+    return burst
+
+
+async def fetch_osf_preprints_metadata(
+    preprint_ids: List[str],
+    client: Optional[httpx.AsyncClient] = None,
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Fetch metadata for many OSF preprints concurrently (OSF has no bulk lookup by ID).
+
+    Each preprint takes two rate-limited requests, so large batches can take
+    minutes; lookups still running after `deadline` seconds are cancelled.
+    Only as many preprints as the api.osf.io burst are looked up at once, so each
+    one gets its second request in before the next ones start, instead of every
+    first request queueing ahead of them (and filling the shared rate-limit queue).
+
+    Returns:
+        Dictionary mapping each requested ID to its Paper (or error dict), to a
+        ValueError if it failed, or to a TimeoutError if it missed the deadline
+    """
+    client = client or get_http_client()
+    slots = asyncio.Semaphore(_osf_api_burst())
+
+    async def fetch(preprint_id: str) -> Union[Paper, Dict[str, Any]]:
+        async with slots:
+            return await fetch_single_osf_preprint_metadata(preprint_id, client)
+
+    tasks = {preprint_id: asyncio.create_task(fetch(preprint_id)) for preprint_id in preprint_ids}
+    if not tasks:
+        return {}
+    try:
+        _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    finally:
+        for task in tasks.values():
+            task.cancel()
+
+    results = {}
+    for preprint_id, task in tasks.items():
+        if task in pending:
+            results[preprint_id] = TimeoutError(f"No response within the {deadline:g}s deadline, please retry this ID")
+        elif task.exception() is not None:
+            results[preprint_id] = task.exception()
+        else:
+            results[preprint_id] = task.result()
+    return results
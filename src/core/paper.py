@@ -0,0 +1,107 @@
+"""
+Provider-independent paper record.
+
+Every provider parser builds one Paper per upstream item. Papers are immutable
+and slotted, so search results can be shared between concurrent callers
+(single-flight) and held in large numbers without per-item dicts. They are
+turned into plain dicts only at the tool boundary (to_dict / serialize).
+
+Provider extras may be nested lists and dicts (OSF tags, license records).
+They are frozen into tuples when the Paper is built, so every Paper is
+hashable, and thawed into fresh lists and dicts by to_dict.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+
+class FrozenDict(tuple):
+    """A dict frozen into a tuple of (key, value) items, so it can be told apart from a list."""
+
+    __slots__ = ()
+
+
+def freeze(value: Any) -> Any:
+    """Recursively turn lists into tuples and dicts into FrozenDicts."""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, FrozenDict):
+        return {key: _thaw(item) for key, item in value}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class Paper:
+    """
+    One paper or preprint from any provider.
+
+    Attributes:
+        provider: Provider the record came from ('arxiv', 'openalex', 'osf')
+        id: Provider ID (e.g. '1706.03762v7', 'W2741809809', 'abcde')
+        title: Title
+        abstract: Abstract (arXiv summary, OSF description)
+        authors: Author display names
+        published: Publication date as returned by the provider
+        updated: Last modification date, if the provider has one
+        doi: DOI (bare or as URL, as returned by the provider)
+        pdf_url: URL to download the PDF from ('' if unknown)
+        url: Landing page URL
+        subjects: Categories, concepts or subjects
+        extra: Provider-specific fields as (name, value) pairs (values are frozen)
+    """
+
+    provider: str
+    id: str
+    title: str = ""
+    abstract: str = ""
+    authors: Tuple[str, ...] = ()
+    published: str = ""
+    updated: str = ""
+    doi: str = ""
+    pdf_url: str = ""
+    url: str = ""
+    subjects: Tuple[str, ...] = ()
+    extra: Tuple[Tuple[str, Any], ...] = ()
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "extra", tuple((name, freeze(value)) for name, value in self.extra))
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        """Identity for caching and deduplication."""
+        return (self.provider, self.id)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "id": self.id,
+            "title": self.title,
+            "abstract": self.abstract,
+            "authors": list(self.authors),
+            "published": self.published,
+            "updated": self.updated,
+            "doi": self.doi,
+            "pdf_url": self.pdf_url,
+            "url": self.url,
+            "subjects": list(self.subjects),
+            **{name: _thaw(value) for name, value in self.extra},
+        }
+
+
+def serialize(value: Any) -> Any:
+    """Convert Papers nested in tool results (dicts, lists) to dicts, leaving the input untouched."""
+    if isinstance(value, Paper):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: serialize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [serialize(item) for item in value]
+    return value
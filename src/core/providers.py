@@ -1,12 +1,19 @@
-from typing import Any, Dict, List
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
 
-import requests
+import httpx
 
+import config
 
-def fetch_osf_providers() -> List[Dict[str, Any]]:
+from .http import get_http_client
+
+
+async def fetch_osf_providers(client: Optional[httpx.AsyncClient] = None) -> List[Dict[str, Any]]:
     """Fetch current list of valid OSF preprint providers from API"""
+    client = client or get_http_client()
     url = "https://api.osf.io/v2/preprint_providers/"
-    response = requests.get(url)
+    response = await client.get(url)
     response.raise_for_status()
     data = response.json()
 
@@ -41,15 +48,107 @@ def get_external_providers() -> List[Dict[str, Any]]:
     ]
 
 
-def get_all_providers() -> List[Dict[str, Any]]:
+class ProviderCache:
+    """
+    In-process cache of the provider list with stale-while-revalidate.
+
+    - younger than `ttl`: served from memory
+    - older than `ttl` but younger than `max_stale`: served from memory while one
+      background task refreshes it
+    - empty or older than `max_stale`: callers wait for a (shared) refresh
+    """
+
+    def __init__(self, ttl: float, max_stale: float):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._osf_providers: List[Dict[str, Any]] = []
+        self._all_providers: List[Dict[str, Any]] = []
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _age(self) -> float:
+        return float("inf") if self._fetched_at is None else time.monotonic() - self._fetched_at
+
+    async def _refresh(self, client: Optional[httpx.AsyncClient]) -> None:
+        osf_providers = await fetch_osf_providers(client)
+        all_providers = sorted(osf_providers + get_external_providers(), key=lambda p: p["id"].lower())
+
+        self._osf_providers = osf_providers
+        self._all_providers = all_providers
+        self._index = {p["id"]: p for p in all_providers}
+        self._fetched_at = time.monotonic()
+
+    def _start_refresh(self, client: Optional[httpx.AsyncClient]) -> asyncio.Task:
+        """Return the in-flight refresh task, starting one if none is running on this loop."""
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(self._refresh(client))
+            # Background refresh failures keep serving the stale list
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._refresh_task = task
+        return task
+
+    async def ensure_fresh(self, client: Optional[httpx.AsyncClient] = None) -> None:
+        """Make sure the cache holds a usable provider list, refreshing as needed."""
+        age = self._age()
+        if age < self.ttl:
+            return
+        task = self._start_refresh(client)
+        if age >= self.max_stale:
+            await asyncio.shield(task)
+
+    async def osf_providers(self, client: Optional[httpx.AsyncClient] = None) -> List[Dict[str, Any]]:
+        await self.ensure_fresh(client)
+        return list(self._osf_providers)
+
+    async def all_providers(self, client: Optional[httpx.AsyncClient] = None) -> List[Dict[str, Any]]:
+        await self.ensure_fresh(client)
+        return list(self._all_providers)
+
+    async def get(self, provider_id: str, client: Optional[httpx.AsyncClient] = None) -> Optional[Dict[str, Any]]:
+        # Standalone providers are not part of the OSF list, so an OSF outage must not hide them
+        for provider in get_external_providers():
+            if provider["id"] == provider_id:
+                return provider
+        await self.ensure_fresh(client)
+        return self._index.get(provider_id)
+
+    def clear(self) -> None:
+        self._osf_providers = []
+        self._all_providers = []
+        self._index = {}
+        self._fetched_at = None
+        self._refresh_task = None
+
+
+_provider_cache = ProviderCache(ttl=config.PROVIDER_CACHE_TTL_SECONDS, max_stale=config.PROVIDER_CACHE_MAX_STALE_SECONDS)
+
+
+async def get_osf_providers(client: Optional[httpx.AsyncClient] = None) -> List[Dict[str, Any]]:
+    """Get the (cached) list of OSF preprint providers"""
+    return await _provider_cache.osf_providers(client)
+
+
+async def get_all_providers(client: Optional[httpx.AsyncClient] = None) -> List[Dict[str, Any]]:
     """Get combined list of all available providers"""
-    osf_providers = fetch_osf_providers()
-    external_providers = get_external_providers()
-    all_providers = osf_providers + external_providers
-    return sorted(all_providers, key=lambda p: p["id"].lower())
+    return await _provider_cache.all_providers(client)
+
+
+async def get_provider(provider_id: str, client: Optional[httpx.AsyncClient] = None) -> Optional[Dict[str, Any]]:
+    """Look up a provider by ID, returns None if it does not exist"""
+    return await _provider_cache.get(provider_id, client)
 
 
-def validate_provider(provider_id: str) -> bool:
+async def validate_provider(provider_id: str, client: Optional[httpx.AsyncClient] = None) -> bool:
     """Validate if a provider ID exists in the given providers list"""
-    valid_ids = [p["id"] for p in get_all_providers()]
-    return provider_id in valid_ids
+    return await get_provider(provider_id, client) is not None
+
+
+async def warm_provider_cache(client: Optional[httpx.AsyncClient] = None) -> bool:
+    """Populate the provider cache ahead of the first request, returns False if OSF was unreachable"""
+    try:
+        await _provider_cache.ensure_fresh(client)
+    except httpx.HTTPError:
+        return False
+    return True
@@ -0,0 +1,143 @@
+"""
+Per-host rate limiting for upstream providers.
+
+Each upstream host gets a token bucket (`rate` requests per second, up to
+`burst` at once). Requests that find the bucket empty wait in a per-session
+queue and are released round-robin across MCP sessions, so one agent issuing
+hundreds of calls cannot starve the others.
+
+    request --> bucket has token and nobody queued? --yes--> send
+                   |
+                   no
+                   v
+               queue[session] --(round-robin as tokens refill)--> send
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import Deque, Dict, Optional, Tuple
+
+import httpx
+
+# MCP session the current request belongs to (set by the server middleware)
+current_session: ContextVar[str] = ContextVar("paperclip_session", default="default")
+
+
+class RateLimitQueueFull(httpx.TransportError):
+    """Raised when too many requests are already waiting for one host."""
+
+
+class FairTokenBucket:
+    """
+    Token bucket with round-robin queueing across sessions.
+
+    Args:
+        rate: Tokens added per second
+        burst: Maximum number of tokens the bucket holds
+        max_queue: Maximum number of waiting requests
+    """
+
+    def __init__(self, rate: float, burst: int, max_queue: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for queue in self._queues.values() for waiter in queue if not waiter.done())
+
+    async def acquire(self, session: str = "default") -> None:
+        """Wait until a request for `session` may be sent."""
+        self._refill()
+        if not self._queues and self._tokens >= 1:
+            self._tokens -= 1
+            return
+
+        if self.queued >= self.max_queue:
+            raise RateLimitQueueFull(f"Too many requests queued ({self.max_queue}), please retry later")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(session, deque()).append(waiter)
+        self._ensure_dispatcher()
+        # A cancelled waiter stays in its queue and is skipped by the dispatcher
+        await waiter
+
+    def _ensure_dispatcher(self) -> None:
+        task = self._dispatcher
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        """Pop the next live waiter, rotating through sessions."""
+        while self._queues:
+            session, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            if queue:
+                self._queues.move_to_end(session)
+            else:
+                del self._queues[session]
+            if not waiter.done():
+                return waiter
+        return None
+
+    async def _dispatch(self) -> None:
+        while self._queues:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                continue
+            waiter = self._next_waiter()
+            if waiter is not None:
+                self._tokens -= 1
+                waiter.set_result(None)
+
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[float, int]]:
+    """
+    Parse "host=rate[:burst],..." (rate in requests per second).
+
+    Example: "export.arxiv.org=0.333:1,api.openalex.org=10:10"
+    """
+    limits = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, value = item.partition("=")
+        rate, _, burst = value.partition(":")
+        limits[host.strip()] = (float(rate), int(burst) if burst else 1)
+    return limits
+
+
+class RateLimitTransport(httpx.AsyncBaseTransport):
+    """Apply a FairTokenBucket per upstream host before sending each request."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, limits: Dict[str, Tuple[float, int]], max_queue: int):
+        self._transport = transport
+        self._buckets = {host: FairTokenBucket(rate, burst, max_queue) for host, (rate, burst) in limits.items()}
+
+    def bucket(self, host: str) -> Optional[FairTokenBucket]:
+        return self._buckets.get(host)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        bucket = self._buckets.get(request.url.host)
+        if bucket is not None:
+            try:
+                await bucket.acquire(current_session.get())
+            except RateLimitQueueFull as e:
+                raise RateLimitQueueFull(f"{request.url.host}: {e}", request=request) from None
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,105 @@
+"""
+Retry policy for idempotent upstream requests.
+
+GET and HEAD requests that fail with a transient error (timeout, connection
+error, 429 or 5xx) are retried with capped exponential backoff and full
+jitter. A Retry-After header from the upstream overrides the computed delay.
+All attempts of one request share a total time budget; once the next delay
+would exceed it, the last response (or error) is returned to the caller.
+
+The number of retries is stored in response.extensions["retries"] so
+providers can report it in their response meta.
+"""
+
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+RETRYABLE_METHODS = frozenset({"GET", "HEAD"})
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+RETRYABLE_ERRORS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def retries_of(*responses: httpx.Response) -> int:
+    """Total number of retries it took to obtain the given responses."""
+    return sum(response.extensions.get("retries", 0) for response in responses)
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """
+    Retry transient failures of idempotent requests within a time budget.
+
+    Args:
+        transport: Transport to send attempts through
+        max_attempts: Maximum number of attempts per request (including the first)
+        base_delay: Backoff delay before the first retry in seconds
+        max_delay: Cap for a single backoff delay in seconds
+        budget: Total seconds all attempts of one request may take
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        budget: float,
+    ):
+        self._transport = transport
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+    def _backoff(self, retry: int) -> float:
+        # Full jitter: spreads retries of many clients over the whole window
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method not in RETRYABLE_METHODS:
+            return await self._transport.handle_async_request(request)
+
+        deadline = time.monotonic() + self.budget
+        retry = 0
+        while True:
+            last_attempt = retry + 1 >= self.max_attempts
+            try:
+                response = await self._transport.handle_async_request(request)
+            except RETRYABLE_ERRORS:
+                delay = self._backoff(retry)
+                if last_attempt or time.monotonic() + delay > deadline:
+                    raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    response.extensions["retries"] = retry
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                delay = retry_after if retry_after is not None else self._backoff(retry)
+                if last_attempt or time.monotonic() + delay > deadline:
+                    response.extensions["retries"] = retry
+                    return response
+                await response.aclose()
+
+            await asyncio.sleep(delay)
+            retry += 1
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -2,6 +2,9 @@ from typing import Annotated
 import asyncio
 
 from fastmcp import FastMCP
+from fastmcp.server.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
 from core import (
     fetch_arxiv_papers,
@@ -12,8 +15,13 @@ from core import (
     fetch_single_osf_preprint_metadata,
     fetch_osf_providers,
     get_all_providers,
+    close_http_client,
+    warm_provider_cache,
 )
+from core.circuit import get_circuit_breakers
+from core.ratelimit import current_session
 from utils.pdf2md import download_pdf_and_parse_to_markdown, download_paper_and_parse_to_markdown, extract_pdf_to_markdown
+from utils.markdown_cache import get_markdown_cache
 from prompts import prompt_mcp
 from tools import tools_mcp
 
@@ -28,11 +36,43 @@ mcp = FastMCP(
 )
 
 
+class SessionContextMiddleware(Middleware):
+    """Tag upstream requests with the calling MCP session so rate limiting is fair across sessions."""
+
+    async def on_call_tool(self, context, call_next):
+        if context.fastmcp_context is None:
+            return await call_next(context)
+        token = current_session.set(context.fastmcp_context.session_id)
+        try:
+            return await call_next(context)
+        finally:
+            current_session.reset(token)
+
+
+mcp.add_middleware(SessionContextMiddleware())
+
+
+@mcp.custom_route("/stats", methods=["GET"])
+async def stats(request: Request) -> JSONResponse:
+    """Expose cache counters and circuit breaker states for monitoring."""
+    return JSONResponse(
+        {
+            "markdown_cache": get_markdown_cache().stats(),
+            "circuit_breakers": get_circuit_breakers().stats(),
+        }
+    )
+
+
 # Import subservers
 async def setup():
     await mcp.import_server(prompt_mcp, prefix="prompt")
     await mcp.import_server(tools_mcp, prefix="tools")
 
+    # Warm the provider cache so the first search does not pay for the OSF provider list
+    await warm_provider_cache()
+    # setup() runs on its own event loop, the server opens fresh connections on its loop
+    await close_http_client()
+
 if __name__ == "__main__":
     asyncio.run(setup())
     mcp.run(transport="http", host="0.0.0.0", port=8000)
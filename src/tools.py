@@ -1,22 +1,152 @@
 
-from typing import Annotated
+import asyncio
+import time
+from typing import Annotated, Awaitable
 
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
+
+import config
 
 from core import (
     fetch_arxiv_papers,
+    fetch_arxiv_papers_metadata,
     fetch_openalex_papers,
+    fetch_openalex_papers_metadata,
     fetch_osf_preprints,
+    fetch_osf_preprints_metadata,
     fetch_single_arxiv_paper_metadata,
     fetch_single_openalex_paper_metadata,
     fetch_single_osf_preprint_metadata,
-    fetch_osf_providers,
     get_all_providers,
+    get_provider,
+    serialize,
 )
+from core.circuit import OPEN, get_circuit_breakers
 from utils.pdf2md import download_pdf_and_parse_to_markdown, download_paper_and_parse_to_markdown
+from utils.progress import ProgressCallback
+from utils.singleflight import SingleFlight
 
 tools_mcp = FastMCP()
 
+# Upper bound for max_results of one arXiv search_papers call (at most 5 paced requests)
+ARXIV_MAX_RESULTS = 1000
+
+# Concurrent identical metadata lookups and searches share one upstream call
+_inflight = SingleFlight()
+
+# Upstream hosts each provider search depends on (for circuit breaker state)
+_PROVIDER_HOSTS = {
+    "arxiv": ("export.arxiv.org",),
+    "openalex": ("api.openalex.org",),
+    "osf": ("api.osf.io", "share.osf.io"),
+}
+
+
+def _progress_callback(ctx: Context | None) -> ProgressCallback | None:
+    """
+    Bind progress notifications to the calling request.
+
+    Context.report_progress looks the request up when called, which inside a
+    shared single-flight task would always be the first caller's request.
+    """
+    if ctx is None or ctx.request_context.meta is None or ctx.request_context.meta.progressToken is None:
+        return None
+    session, request_id = ctx.session, ctx.request_id
+    progress_token = ctx.request_context.meta.progressToken
+
+    async def report(progress: float, total: float | None, message: str | None) -> None:
+        await session.send_progress_notification(
+            progress_token=progress_token,
+            progress=progress,
+            total=total,
+            message=message,
+            related_request_id=request_id,
+        )
+
+    return report
+
+
+def _normalize(text: str | None) -> str | None:
+    """Normalize free text so requests differing only in whitespace share a key."""
+    return " ".join(text.split()) if text else text
+
+
+async def _timed(search: Awaitable[dict]) -> tuple[dict, int]:
+    """Await a provider search and return its result with the elapsed milliseconds."""
+    started = time.perf_counter()
+    result = await search
+    return result, round((time.perf_counter() - started) * 1000)
+
+
+async def _search_all_providers(query: str | None, subjects: str | None, date_published_gte: str | None) -> dict:
+    """
+    Search arXiv, OpenAlex and OSF concurrently under one overall deadline.
+
+    Providers that fail or miss the deadline are reported in `provider_status`
+    instead of failing the whole call. Providers with an open circuit breaker
+    are skipped without being called.
+    """
+    breakers = get_circuit_breakers()
+
+    searches = {
+        "arxiv": fetch_arxiv_papers(query=query, category=subjects, max_results=20),
+        "openalex": fetch_openalex_papers(
+            query=query,
+            concepts=subjects,
+            date_published_gte=date_published_gte,
+        ),
+        "osf": fetch_osf_preprints(
+            provider_id="osf",
+            subjects=subjects,
+            date_published_gte=date_published_gte,
+            query=query,
+        ),
+    }
+    provider_status = {}
+    for name, hosts in _PROVIDER_HOSTS.items():
+        if any(breakers.state(host) == OPEN for host in hosts):
+            searches.pop(name).close()
+            provider_status[name] = {"status": "skipped", "message": "Circuit breaker open, provider is failing"}
+
+    tasks = {name: asyncio.create_task(_timed(search)) for name, search in searches.items()}
+    pending = set()
+    if tasks:  # asyncio.wait rejects an empty set (every provider skipped)
+        try:
+            _, pending = await asyncio.wait(tasks.values(), timeout=config.SEARCH_DEADLINE_SECONDS)
+        finally:
+            # No-op for finished searches; stops stragglers past the deadline
+            for task in tasks.values():
+                task.cancel()
+
+    all_results = []
+    for name, task in tasks.items():
+        if task in pending:
+            provider_status[name] = {
+                "status": "timeout",
+                "message": f"No response within {config.SEARCH_DEADLINE_SECONDS}s deadline",
+            }
+        elif task.exception() is not None:
+            provider_status[name] = {"status": "error", "message": str(task.exception())}
+        else:
+            result, elapsed_ms = task.result()
+            # The result may be shared with other callers, so do not modify it
+            all_results.append({**result, "provider": name})
+            provider_status[name] = {
+                "status": "ok",
+                "elapsed_ms": elapsed_ms,
+                "retries": result.get("meta", {}).get("retries", 0),
+            }
+
+    for name, hosts in _PROVIDER_HOSTS.items():
+        provider_status[name]["circuit"] = {host: breakers.state(host) for host in hosts}
+
+    return {
+        "papers": all_results,
+        "total_count": len(all_results),
+        "providers_searched": list(tasks),
+        "provider_status": provider_status,
+    }
+
 @tools_mcp.tool(
     name="list_providers",
     description="Get the complete list of all available academic paper providers. Includes preprint servers (ArXiv, Open Science Framework (OSF) discipline-specific servers). Returns provider IDs for use with search_papers.",
@@ -26,7 +156,7 @@ async def list_providers() -> dict:
     Call the osf api and hardcode other supported providers.
 
     """
-    providers = get_all_providers()
+    providers = await get_all_providers()
 
     return {
         "providers": providers,
@@ -36,101 +166,129 @@ async def list_providers() -> dict:
 
 @tools_mcp.tool(
     name="search_papers",
-    description="Find papers using supported filters. And retrieve their metadata.",
+    description=f"Find papers using supported filters. And retrieve their metadata. With provider='arxiv', max_results can be up to {ARXIV_MAX_RESULTS}; continue with start_index=meta.next_start_index. To walk through large OpenAlex result sets, set provider='openalex' and cursor='*', then pass the returned meta.next_cursor as cursor until it is null (200 papers per call).",
 )
 async def search_papers(
     query: Annotated[str | None, "Text search query for title, author, content"] = None,
     provider: Annotated[str | None, "Provider ID to filter preprints (e.g., psyarxiv, socarxiv, arxiv, openalex, osf)"] = None,
     subjects: Annotated[str | None, "Subject categories to filter by (e.g., psychology, neuroscience)"] = None,
     date_published_gte: Annotated[str | None, "Filter preprints published on or after this date (e.g., 2024-01-01)"] = None,
+    cursor: Annotated[str | None, "OpenAlex only: '*' to start cursor paging, then the meta.next_cursor of the previous call"] = None,
+    max_results: Annotated[int, f"arXiv only: number of results to return (up to {ARXIV_MAX_RESULTS})"] = 20,
+    start_index: Annotated[int, "arXiv only: index of the first result (meta.next_start_index of the previous call)"] = 0,
 ) -> dict:
-    if provider and provider not in [p["id"] for p in get_all_providers()]:
+    key = ("search", provider, _normalize(query), _normalize(subjects), date_published_gte, cursor, max_results, start_index)
+    result = await _inflight.do(
+        key, _search_papers, query, provider, subjects, date_published_gte, cursor, max_results, start_index
+    )
+    return serialize(result)
+
+
+async def _search_papers(
+    query: str | None,
+    provider: str | None,
+    subjects: str | None,
+    date_published_gte: str | None,
+    cursor: str | None = None,
+    max_results: int = 20,
+    start_index: int = 0,
+) -> dict:
+    if cursor and provider != "openalex":
+        return {"error": "cursor paging is only supported with provider='openalex'."}
+    if (max_results != 20 or start_index) and provider != "arxiv":
+        return {"error": "max_results and start_index are only supported with provider='arxiv'."}
+    if not 1 <= max_results <= ARXIV_MAX_RESULTS or start_index < 0:
+        return {"error": f"max_results must be between 1 and {ARXIV_MAX_RESULTS}, start_index must not be negative."}
+    provider_info = await get_provider(provider) if provider else None
+    if provider and provider_info is None:
         return {
             "error": f"Provider: {provider} not found. Please use list_preprint_providers to get the complete list of all available providers.",
         }
     if not provider:
-        all_results = []
-        
-        arxiv_results = fetch_arxiv_papers(query=query, category=subjects)
-        all_results.append(arxiv_results)
-    
-        openalex_results = fetch_openalex_papers(
-            query=query, 
-            concepts=subjects, 
-            date_published_gte=date_published_gte
-        )
-        all_results.append(openalex_results)
-    
-        osf_results = fetch_osf_preprints(
-            provider_id="osf",
-            subjects=subjects,
-            date_published_gte=date_published_gte,
-            query=query,
-        )
-        all_results.append(osf_results)
-        
-        return {
-            "papers": all_results,
-            "total_count": len(all_results),
-            "providers_searched": ["arxiv", "openalex", "osf"],
-        }
-    if provider == "osf" or provider in [p["id"] for p in fetch_osf_providers()]:
-        return fetch_osf_preprints( provider_id=provider,
+        return await _search_all_providers(query, subjects, date_published_gte)
+    if provider == "osf" or provider_info["type"] == "osf":
+        return await fetch_osf_preprints( provider_id=provider,
             subjects=subjects,
             date_published_gte=date_published_gte,
             query=query,
         )
     elif provider == "arxiv":
-        return fetch_arxiv_papers(
+        return await fetch_arxiv_papers(
             query=query,
             category=subjects,
+            max_results=max_results,
+            start_index=start_index,
         )
     elif provider == "openalex":
-        return fetch_openalex_papers(
+        return await fetch_openalex_papers(
             query=query,
             concepts=subjects,
             date_published_gte=date_published_gte,
+            max_results=200 if cursor else 20,
+            cursor=cursor,
         )
 
 
+_METADATA_FETCHERS = {
+    "arxiv": fetch_single_arxiv_paper_metadata,
+    "openalex": fetch_single_openalex_paper_metadata,
+    "osf": fetch_single_osf_preprint_metadata,
+}
+
+
+def _provider_for_id(paper_id: str) -> str:
+    """Guess the provider of a paper ID from its format."""
+    # OpenAlex paper ID format (e.g., "W4385245566")
+    if paper_id.startswith("W") and paper_id[1:].isdigit():
+        return "openalex"
+    # arXiv paper ID format (e.g., "2407.06405v1" or "cs.AI/0001001")
+    if "." in paper_id and ("v" in paper_id or len(paper_id.split(".")[0]) == 4):
+        return "arxiv"
+    # Anything else is treated as an OSF preprint ID
+    return "osf"
+
+
+def _chunk_error(cursor: int, max_chars: int | None) -> str | None:
+    """Validate chunked reading arguments; a negative window would make next_cursor move backwards."""
+    if cursor < 0 or (max_chars is not None and max_chars < 1):
+        return "cursor must not be negative and max_chars must be at least 1."
+    return None
+
+
+async def _fetch_metadata(paper_id: str):
+    """Look up one paper's metadata, sharing concurrent identical lookups."""
+    provider = _provider_for_id(paper_id)
+    return await _inflight.do(("metadata", provider, paper_id), _METADATA_FETCHERS[provider], paper_id)
+
+
 @tools_mcp.tool(
     name="get_paper_by_id",
-    description="Download and convert an academic paper to markdown format by its ID. Returns full paper content including title, abstract, sections, and references. Supports ArXiv (e.g., '2407.06405v1'), OpenAlex (e.g., 'W4385245566'), and OSF IDs.",
+    description="Download and convert an academic paper to markdown format by its ID. Returns full paper content including title, abstract, sections, and references. Supports ArXiv (e.g., '2407.06405v1'), OpenAlex (e.g., 'W4385245566'), and OSF IDs. Use pages (e.g. '1-3') to convert only some pages, and max_chars with the returned next_cursor as cursor to read long papers in chunks.",
 )
-async def get_paper_by_id(paper_id: str) -> dict:
+async def get_paper_by_id(
+    paper_id: str,
+    cursor: Annotated[int, "Character offset to start reading from (next_cursor of the previous chunk)"] = 0,
+    max_chars: Annotated[int | None, "Maximum number of characters to return (default: whole paper)"] = None,
+    pages: Annotated[str | None, "Pages to convert, 1-based (e.g. '1-3', '1,4-6', '10-' for page 10 to the end)"] = None,
+    ctx: Context | None = None,
+) -> dict:
+    if error := _chunk_error(cursor, max_chars):
+        return {"status": "error", "message": error, "metadata": {}}
     try:
-        # Check if it's an OpenAlex paper ID (starts with 'W' followed by numbers)
-        if paper_id.startswith("W") and paper_id[1:].isdigit():
-            # OpenAlex paper ID format (e.g., "W4385245566")
-            metadata = fetch_single_openalex_paper_metadata(paper_id)
-            return await download_paper_and_parse_to_markdown(
-                metadata=metadata,
-                pdf_url_field="pdf_url",
-                paper_id=paper_id,
-                write_images=False
-            )
-        # Check if it's an arXiv paper ID (contains 'v' followed by version number or matches arXiv format)
-        elif "." in paper_id and ("v" in paper_id or len(paper_id.split(".")[0]) == 4):
-            # arXiv paper ID format (e.g., "2407.06405v1" or "cs.AI/0001001")
-            metadata = fetch_single_arxiv_paper_metadata(paper_id)
-            return await download_paper_and_parse_to_markdown(
-                metadata=metadata,
-                pdf_url_field="download_url",
-                paper_id=paper_id,
-                write_images=False
-            )
-        else:
-            # OSF paper ID format
-            metadata = fetch_single_osf_preprint_metadata(paper_id)
-            # Handle error case from OSF metadata function
-            if isinstance(metadata, dict) and metadata.get("status") == "error":
-                return metadata
-            return await download_paper_and_parse_to_markdown(
-                metadata=metadata,
-                pdf_url_field="download_url",
-                paper_id=paper_id,
-                write_images=False
-            )
+        metadata = await _fetch_metadata(paper_id)
+        # Handle error case from OSF metadata function
+        if isinstance(metadata, dict) and metadata.get("status") == "error":
+            return serialize(metadata)
+        return await download_paper_and_parse_to_markdown(
+            metadata=metadata.to_dict(),
+            pdf_url_field="pdf_url",
+            paper_id=paper_id,
+            write_images=False,
+            cursor=cursor,
+            max_chars=max_chars,
+            pages=pages,
+            progress=_progress_callback(ctx),
+        )
     except ValueError as e:
         return {"status": "error", "message": str(e), "metadata": {}}
 
@@ -140,22 +298,93 @@ async def get_paper_by_id(paper_id: str) -> dict:
     description="Get metadata for an academic paper by its ID without downloading full content. Returns title, authors, abstract, publication date, journal info, and download URLs. Supports ArXiv, OpenAlex, and OSF IDs.",
 )
 async def get_paper_metadata_by_id(preprint_id: str) -> dict:
-    # Check if it's an OpenAlex paper ID (starts with 'W' followed by numbers)
-    if preprint_id.startswith("W") and preprint_id[1:].isdigit():
-        # OpenAlex paper ID format (e.g., "W4385245566")
-        return fetch_single_openalex_paper_metadata(preprint_id)
-    # Check if it's an arXiv paper ID (contains 'v' followed by version number or matches arXiv format)
-    elif "." in preprint_id and ("v" in preprint_id or len(preprint_id.split(".")[0]) == 4):
-        # arXiv paper ID format (e.g., "2407.06405v1" or "cs.AI/0001001")
-        return fetch_single_arxiv_paper_metadata(preprint_id)
-    else:
-        # OSF paper ID format
-        return fetch_single_osf_preprint_metadata(preprint_id)
+    return serialize(await _fetch_metadata(preprint_id))
+
+
+# Upper bound for the number of IDs in one get_papers_metadata_batch call
+BATCH_METADATA_MAX_IDS = 200
+
+_BATCH_FETCHERS = {
+    "arxiv": fetch_arxiv_papers_metadata,
+    "openalex": fetch_openalex_papers_metadata,
+    "osf": fetch_osf_preprints_metadata,
+}
+
+
+def _fetch_batch(provider: str, paper_ids: list[str]) -> Awaitable[dict]:
+    if provider == "osf":
+        # Two paced requests per OSF ID: bound that part of the batch, late IDs are reported as timeouts
+        return fetch_osf_preprints_metadata(paper_ids, deadline=config.BATCH_METADATA_OSF_DEADLINE_SECONDS)
+    return _BATCH_FETCHERS[provider](paper_ids)
+
+
+@tools_mcp.tool(
+    name="get_papers_metadata_batch",
+    description=f"Get metadata for many papers at once (up to {BATCH_METADATA_MAX_IDS} IDs, any mix of ArXiv, OpenAlex and OSF IDs, of which at most {config.BATCH_METADATA_MAX_OSF_IDS} OSF IDs since OSF has no bulk lookup). Much faster than calling get_paper_metadata_by_id per paper. Results are returned in input order, each with its own status ('success', 'error', or 'timeout' for OSF IDs that did not finish in time and can be retried).",
+)
+async def get_papers_metadata_batch(paper_ids: list[str]) -> dict:
+    paper_ids = [paper_id.strip() for paper_id in paper_ids]
+    if len(paper_ids) > BATCH_METADATA_MAX_IDS:
+        return {"error": f"Too many IDs: {len(paper_ids)} (maximum is {BATCH_METADATA_MAX_IDS})"}
+
+    # Group the unique IDs by provider, one bulk lookup per provider
+    groups: dict[str, list[str]] = {}
+    for paper_id in dict.fromkeys(paper_ids):
+        if paper_id:
+            groups.setdefault(_provider_for_id(paper_id), []).append(paper_id)
+    osf_count = len(groups.get("osf", []))
+    if osf_count > config.BATCH_METADATA_MAX_OSF_IDS:
+        return {"error": f"Too many OSF IDs: {osf_count} (maximum is {config.BATCH_METADATA_MAX_OSF_IDS})"}
+
+    providers = list(groups)
+    outcomes = await asyncio.gather(
+        *(_fetch_batch(provider, groups[provider]) for provider in providers),
+        return_exceptions=True,
+    )
+    found: dict[str, object] = {}
+    for provider, outcome in zip(providers, outcomes):
+        if isinstance(outcome, BaseException):
+            found.update(dict.fromkeys(groups[provider], outcome))
+        else:
+            found.update(outcome)
+
+    results = []
+    for paper_id in paper_ids:
+        metadata = found.get(paper_id, ValueError("Empty paper ID"))
+        if isinstance(metadata, TimeoutError):
+            results.append({"id": paper_id, "status": "timeout", "message": str(metadata)})
+        elif isinstance(metadata, BaseException):
+            results.append({"id": paper_id, "status": "error", "message": str(metadata)})
+        elif isinstance(metadata, dict):
+            # OSF preprint without a downloadable file
+            results.append({"id": paper_id, **serialize(metadata)})
+        else:
+            results.append({"id": paper_id, "status": "success", "metadata": metadata.to_dict()})
+
+    return {
+        "results": results,
+        "total_count": len(results),
+        "error_count": sum(result["status"] != "success" for result in results),
+    }
 
 
 @tools_mcp.tool(
     name="get_paper_content_by_url",
-    description="Download and convert the PDF of a paper to markdown format from a direct PDF URL. Returns full paper content parsed from the PDF including title, abstract, sections, and references.",
+    description="Download and convert the PDF of a paper to markdown format from a direct PDF URL. Returns full paper content parsed from the PDF including title, abstract, sections, and references. Use pages (e.g. '1-3') to convert only some pages, and max_chars with the returned next_cursor as cursor to read long papers in chunks.",
 )
-async def get_paper_content_by_url(pdf_url: str) -> dict:
-    return await download_pdf_and_parse_to_markdown(pdf_url)
\ No newline at end of file
+async def get_paper_content_by_url(
+    pdf_url: str,
+    cursor: Annotated[int, "Character offset to start reading from (next_cursor of the previous chunk)"] = 0,
+    max_chars: Annotated[int | None, "Maximum number of characters to return (default: whole paper)"] = None,
+    pages: Annotated[str | None, "Pages to convert, 1-based (e.g. '1-3', '1,4-6', '10-' for page 10 to the end)"] = None,
+    ctx: Context | None = None,
+) -> dict:
+    if error := _chunk_error(cursor, max_chars):
+        return {"status": "error", "message": error, "pdf_url": pdf_url}
+    return await download_pdf_and_parse_to_markdown(
+        pdf_url,
+        cursor=cursor,
+        max_chars=max_chars,
+        pages=pages,
+        progress=_progress_callback(ctx),
+    )
\ No newline at end of file
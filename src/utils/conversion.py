@@ -0,0 +1,204 @@
+"""
+Process pool for CPU-bound PDF to markdown conversion.
+
+pymupdf4llm holds the GIL for most of a conversion, so running it in threads
+still competes with the event loop. ConversionService runs jobs in a
+ProcessPoolExecutor instead, so conversions scale across cores.
+
+    convert(func, *args)
+        |
+        v
+    free slot? (workers + queue size) --no--> ConversionQueueFull
+        |
+        v
+    ProcessPoolExecutor.submit()  --exceeds timeout--> TimeoutError
+        |
+        v
+    result
+
+A slot is only released once its job has really finished. A job that is still
+running when its caller times out would hold its worker and slot for as long as
+it hangs, so the pool it runs in is discarded and its worker processes are
+terminated; other jobs caught in that pool are retried like after a crash.
+
+A caller that splits one document into several jobs reserves their slots up
+front (reserve / convert_reserved), so its batches cannot be rejected halfway.
+
+A worker that dies (pymupdf crashing on a hostile PDF, the OOM killer) breaks
+the whole ProcessPoolExecutor and fails every job in it. The broken pool is
+replaced for later jobs, and each affected job is retried once in a private
+single-worker pool, so a PDF that crashes its worker again only fails itself.
+"""
+
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+import config
+
+
+class ConversionQueueFull(RuntimeError):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class ConversionService:
+    """
+    Bounded ProcessPoolExecutor front-end with per-job timeouts.
+
+    Args:
+        max_workers: Number of worker processes (0 runs jobs in a thread of this process)
+        max_queue: Number of jobs allowed to wait for a free worker
+        timeout: Seconds a caller waits for a single job
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, timeout: float):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def capacity(self) -> int:
+        return max(self.max_workers, 1) + self.max_queue
+
+    def reserve(self, slots: int) -> bool:
+        """
+        Claim `slots` queue slots at once, for jobs run with convert_reserved.
+
+        Each reserved slot is freed when the job run on it finishes; slots that
+        end up unused must be given back with release().
+
+        Returns:
+            False (claiming nothing) if fewer than `slots` slots are free
+        """
+        if self._pending + slots > self.capacity:
+            return False
+        self._pending += slots
+        return True
+
+    def release(self, slots: int) -> None:
+        """Give back reserved slots that were not used for a job."""
+        self._pending -= slots
+
+    def _new_executor(self, max_workers: int) -> Executor:
+        # spawn instead of fork: the server process runs threads (event loop helpers, executors)
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.max_workers > 0:
+                self._executor = self._new_executor(self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf2md")
+        return self._executor
+
+    def _discard(self, executor: Executor) -> None:
+        """Drop a broken executor so the next job starts a fresh pool."""
+        if self._executor is executor:
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _kill(self, executor: Executor) -> None:
+        """Discard an executor and terminate its workers, freeing the slot of a job that never returns."""
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        self._discard(executor)
+        for process in processes:
+            process.terminate()
+
+    def _release(self, future: asyncio.Future) -> None:
+        self._pending -= 1
+        if not future.cancelled():
+            future.exception()  # Mark as retrieved when the caller already timed out
+
+    async def convert(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) on a worker.
+
+        func and its arguments must be picklable (module-level function, plain data).
+
+        Raises:
+            ConversionQueueFull: If all workers are busy and the queue is full
+            TimeoutError: If the job takes longer than the configured timeout
+            RuntimeError: If the job's worker process died on both attempts
+        """
+        if self._pending >= self.capacity:
+            raise ConversionQueueFull(
+                f"PDF conversion queue is full ({self._pending} jobs pending), please retry later"
+            )
+        self._pending += 1
+        return await self._convert(functools.partial(func, *args, **kwargs))
+
+    async def convert_reserved(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Like convert(), but runs on a slot claimed earlier with reserve() instead of a free one."""
+        return await self._convert(functools.partial(func, *args, **kwargs))
+
+    async def _convert(self, call: Callable[[], Any]) -> Any:
+        # The caller has already claimed a slot for the first attempt
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        try:
+            executor = self._get_executor()
+        except BaseException:
+            self._pending -= 1
+            raise
+        try:
+            return await self._run(executor, call, deadline, claimed=True)
+        except BrokenProcessPool:
+            self._discard(executor)
+
+        # A worker died, maybe while running another job: retry alone so a crash can only fail this job
+        isolated = self._new_executor(1)
+        try:
+            return await self._run(isolated, call, deadline)
+        except BrokenProcessPool:
+            raise RuntimeError("PDF conversion worker crashed, the PDF may be malformed") from None
+        finally:
+            isolated.shutdown(wait=False)
+
+    async def _run(self, executor: Executor, call: Callable[[], Any], deadline: float, claimed: bool = False) -> Any:
+        if not claimed:
+            self._pending += 1
+        try:
+            job = executor.submit(call)
+        except BaseException:
+            self._pending -= 1
+            raise
+        result = asyncio.wrap_future(job)
+        result.add_done_callback(self._release)
+
+        timeout = max(0.0, deadline - asyncio.get_running_loop().time())
+        try:
+            return await asyncio.wait_for(asyncio.shield(result), timeout=timeout)
+        except asyncio.TimeoutError:
+            # A job that has not started is just dequeued, a running one can only be stopped with its worker
+            if not job.cancel() and isinstance(executor, ProcessPoolExecutor):
+                self._kill(executor)
+            raise TimeoutError(f"PDF conversion timed out after {self.timeout:g}s")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_conversion_service: Optional[ConversionService] = None
+
+
+def get_conversion_service() -> ConversionService:
+    """Return the process-wide conversion service configured from config.py."""
+    global _conversion_service
+
+    if _conversion_service is None:
+        _conversion_service = ConversionService(
+            max_workers=config.PDF_CONVERSION_WORKERS,
+            max_queue=config.PDF_CONVERSION_QUEUE_SIZE,
+            timeout=config.PDF_CONVERSION_TIMEOUT_SECONDS,
+        )
+    return _conversion_service
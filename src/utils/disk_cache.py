@@ -0,0 +1,176 @@
+"""
+Size-bounded on-disk blob store shared by the PDF and markdown caches.
+
+Entries are files named by their key (usually a hex digest) and sharded into
+two-character subdirectories. Writes go to a temp file in the same directory
+and are moved into place with os.replace(), so readers never see partial files.
+Reads bump the file's mtime, which eviction uses as the LRU order.
+
+The total size is tracked in memory (one directory walk on first use, then
+adjusted on every write and delete), so writes only walk the tree when the
+cache is over budget. Eviction then frees down to a low-water mark below
+`max_bytes`, so a full cache is not rescanned on every following write.
+"""
+
+import os
+import tempfile
+import threading
+from typing import List, Optional
+
+# Eviction frees space down to this fraction of max_bytes
+EVICT_LOW_WATER = 0.9
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Write data to path atomically (temp file + rename in the same directory)."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class DiskCache:
+    """
+    Key/value blob store on disk with LRU eviction once `max_bytes` is exceeded.
+
+    Args:
+        directory: Directory holding the cache entries
+        max_bytes: Upper bound for the total size of all entries (0 disables the cache)
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # Total size of all entries, None until the directory has been scanned once
+        self._total: Optional[int] = None
+        # Writes come from worker threads (asyncio.to_thread)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get_path(self, key: str) -> Optional[str]:
+        """Return the path of an existing entry and mark it as recently used."""
+        if not self.enabled:
+            return None
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def read(self, key: str) -> Optional[bytes]:
+        path = self.get_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _file_size(path: str) -> int:
+        try:
+            return os.stat(path).st_size
+        except OSError:
+            return 0
+
+    def _track(self, delta: int) -> None:
+        with self._lock:
+            if self._total is None:
+                self._total = self.size()
+            else:
+                self._total += delta
+
+    def write(self, key: str, data: bytes, evict: bool = True) -> str:
+        """Store data under key; pass evict=False when writing a batch and call evict() once after."""
+        path = self.path(key)
+        if not self.enabled:
+            return path
+        replaced = self._file_size(path)
+        atomic_write(path, data)
+        self._track(len(data) - replaced)
+        if evict:
+            self.evict()
+        return path
+
+    def move_in(self, key: str, temp_path: str, evict: bool = True) -> str:
+        """Move a finished temp file (on the same filesystem) into place as key."""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        replaced = self._file_size(path)
+        os.replace(temp_path, path)
+        self._track(self._file_size(path) - replaced)
+        if evict:
+            self.evict()
+        return path
+
+    def delete(self, key: str) -> None:
+        path = self.path(key)
+        size = self._file_size(path)
+        try:
+            os.unlink(path)
+        except OSError:
+            return
+        self._track(-size)
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.startswith(".tmp-"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self) -> int:
+        """Total size of all entries, measured on disk."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> List[str]:
+        """
+        Remove least recently used entries once the cache exceeds max_bytes.
+
+        Returns:
+            Keys of the removed entries
+        """
+        if self._total is not None and self._total <= self.max_bytes:
+            return []
+        with self._lock:
+            # Over budget (or not scanned yet): measure on disk, which also corrects any drift
+            entries = self._entries()
+            self._total = sum(size for _, size, _ in entries)
+            if self._total <= self.max_bytes:
+                return []
+            removed = []
+            low_water = self.max_bytes * EVICT_LOW_WATER
+            for _, size, path in sorted(entries):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                self._total -= size
+                removed.append(os.path.basename(path))
+                if self._total <= low_water:
+                    break
+            return removed
@@ -0,0 +1,101 @@
+"""
+Persistent cache of PDF to markdown conversions.
+
+Entries are keyed by (PDF sha256, write_images, converter version) and stored
+gzip-compressed in a size-bounded DiskCache, so identical PDFs are only ever
+converted once per converter release. Page-range conversions store one entry
+per page (the page number is part of the key).
+"""
+
+import gzip
+import hashlib
+import os
+from typing import Any, Dict, List, Optional
+
+import pymupdf
+import pymupdf4llm as pdfmd
+
+import config
+
+from .disk_cache import DiskCache
+
+CONVERTER_VERSION = f"pymupdf4llm-{pdfmd.__version__}/pymupdf-{pymupdf.VersionBind}"
+
+
+class MarkdownCache:
+    """
+    Compressed markdown conversions keyed by PDF content hash and options.
+
+    Args:
+        directory: Directory holding the compressed markdown files
+        max_bytes: Size bound for stored (compressed) markdown (0 disables the cache)
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.store = DiskCache(directory, max_bytes)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(pdf_sha256: str, write_images: bool, page: Optional[int] = None) -> str:
+        name = f"{pdf_sha256}:{int(write_images)}:{CONVERTER_VERSION}"
+        if page is not None:
+            name += f":page={page}"
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()
+        return f"{digest}.md.gz"
+
+    def get(self, pdf_sha256: str, write_images: bool = False, page: Optional[int] = None) -> Optional[str]:
+        key = self.key(pdf_sha256, write_images, page)
+        data = self.store.read(key)
+        if data is None:
+            self.misses += 1
+            return None
+        try:
+            markdown = gzip.decompress(data).decode("utf-8")
+        except (OSError, EOFError, UnicodeDecodeError):
+            # Corrupt entry, drop it and convert again
+            self.store.delete(key)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return markdown
+
+    def put(self, pdf_sha256: str, markdown: str, write_images: bool = False, page: Optional[int] = None) -> None:
+        self.store.write(self.key(pdf_sha256, write_images, page), gzip.compress(markdown.encode("utf-8")))
+
+    def get_pages(self, pdf_sha256: str, pages: List[int], write_images: bool = False) -> Dict[int, str]:
+        """Return the cached markdown of those pages that are in the cache."""
+        cached = {}
+        for page in pages:
+            markdown = self.get(pdf_sha256, write_images, page)
+            if markdown is not None:
+                cached[page] = markdown
+        return cached
+
+    def put_pages(self, pdf_sha256: str, pages: Dict[int, str], write_images: bool = False) -> None:
+        if not self.store.enabled:
+            return
+        for page, markdown in pages.items():
+            self.store.write(self.key(pdf_sha256, write_images, page), gzip.compress(markdown.encode("utf-8")), evict=False)
+        self.store.evict()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "converter_version": CONVERTER_VERSION,
+        }
+
+
+_markdown_cache: Optional[MarkdownCache] = None
+
+
+def get_markdown_cache() -> MarkdownCache:
+    """Return the process-wide markdown cache configured from config.py."""
+    global _markdown_cache
+
+    if _markdown_cache is None:
+        _markdown_cache = MarkdownCache(os.path.join(config.CACHE_DIR, "markdown"), config.MARKDOWN_CACHE_MAX_BYTES)
+    return _markdown_cache
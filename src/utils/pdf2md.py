@@ -5,18 +5,29 @@ download_paper_and_parse_to_markdown()     download_pdf_and_parse_to_markdown()
 (with metadata)                            (direct URL)
     |                                         |
     v                                         v
-Extract PDF URL from metadata          Generate filename from URL
+Extract PDF URL from metadata                 |
     |                                         |
     +-------------------+---------------------+
                         |
                         v
             _download_and_parse_pdf_core()
+    (single-flight per normalized PDF URL + pages)
                         |
                         v
-                requests.get(pdf_url)
+              _downloaded_pdf(pdf_url)
+        (on-disk PDF cache, conditional GET via
+       the shared httpx client on miss; the body
+       is streamed to disk after Content-Type,
+         size and %PDF magic bytes checks)
                         |
                         v
-            extract_pdf_to_markdown()
+    markdown cache (sha256, write_images, version,
+         page number when pages are selected)
+                        |  miss
+                        v
+               _convert_document()
+     (page batches in parallel across the pool
+       for documents above the page threshold)
                         |
                         v
         Return (content, size, message)
@@ -29,16 +40,104 @@ Extract PDF URL from metadata          Generate filename from URL
 
 The shared core logic eliminates code duplication while maintaining 
 distinct interfaces for metadata-based vs direct URL workflows.
+
+Download and conversion progress (bytes downloaded, pages converted) is sent
+to every caller waiting on the same PDF, see utils/progress.py.
 """
 
+import asyncio
+import hashlib
 import os
-from typing import Optional
-import tempfile
+from contextlib import asynccontextmanager
+from typing import Dict, Hashable, Optional
 import httpx
-import requests
 
+import pymupdf
 import pymupdf4llm as pdfmd
 
+import config
+
+from .conversion import ConversionQueueFull, ConversionService, get_conversion_service
+from .markdown_cache import get_markdown_cache
+from .pdf_cache import get_pdf_cache
+from .progress import ProgressCallback, ProgressReporter, current_progress, report_progress
+from .singleflight import SingleFlight
+
+# Concurrent requests for the same PDF share one download and one conversion
+_inflight = SingleFlight()
+# Progress of each in-flight pipeline, shared by every caller waiting on it
+_progress_reporters: Dict[Hashable, ProgressReporter] = {}
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+PDF_MAGIC_WINDOW = 1024
+# Share of the reported progress (percent) spent downloading, the rest is conversion
+DOWNLOAD_PROGRESS = 30.0
+
+
+class InvalidPdfError(ValueError):
+    """Raised when a download is not a PDF or exceeds the size limit."""
+
+
+class PageRangeError(ValueError):
+    """Raised for a page selection that is malformed or outside the document."""
+
+
+def parse_page_range(spec: str, page_count: int) -> list[int]:
+    """
+    Parse a 1-based page selection such as "1-3,7,10-" into sorted 0-based page numbers.
+
+    "N-" selects page N to the last page.
+    """
+    pages = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, dash, last = part.partition("-")
+        try:
+            start = int(first)
+            end = (int(last) if last.strip() else page_count) if dash else start
+        except ValueError:
+            raise PageRangeError(f"Invalid page range '{part}', use e.g. '1-3,7,10-'") from None
+        if start < 1 or end < start:
+            raise PageRangeError(f"Invalid page range '{part}', use e.g. '1-3,7,10-'")
+        if start > page_count:
+            raise PageRangeError(f"Page {start} is out of range, the document has {page_count} pages")
+        pages.update(range(start - 1, min(end, page_count)))
+    if not pages:
+        raise PageRangeError(f"No pages selected by '{spec}'")
+    return sorted(pages)
+
+
+def _convert_file(path: str, write_images: bool) -> str:
+    """Convert a PDF file (runs in a conversion worker process)."""
+    return pdfmd.to_markdown(path, write_images=write_images)
+
+
+def _convert_pages(path: str, pages: list[int], write_images: bool, hdr_info=None) -> list[str]:
+    """Convert selected pages of a PDF file, one markdown string per page (runs in a conversion worker process)."""
+    with pymupdf.open(path) as doc:
+        chunks = pdfmd.to_markdown(doc, pages=pages, page_chunks=True, write_images=write_images, hdr_info=hdr_info)
+    return [chunk["text"] for chunk in chunks]
+
+
+def _identify_headers(path: str) -> "pdfmd.IdentifyHeaders":
+    """Scan font sizes of the whole document once so parallel batches agree on header levels."""
+    with pymupdf.open(path) as doc:
+        return pdfmd.IdentifyHeaders(doc)
+
+
+def _page_count(path: str) -> int:
+    with pymupdf.open(path) as doc:
+        return doc.page_count
+
+
+def _convert_bytes(content: bytes, filename: str, write_images: bool) -> str:
+    """Convert PDF bytes from memory (runs in a conversion worker process)."""
+    with pymupdf.open(stream=content, filetype="pdf") as doc:
+        # filename only names extracted images, no file is written for the PDF itself
+        return pdfmd.to_markdown(doc, write_images=write_images, filename=filename)
+
 
 async def extract_pdf_to_markdown(file_input, filename: Optional[str] = None, write_images: bool = False) -> str:
     """
@@ -47,92 +146,357 @@ async def extract_pdf_to_markdown(file_input, filename: Optional[str] = None, wr
     Args:
         file_input: Can be either:
                    - A file path (str) to an existing PDF
-                   - File bytes/content (bytes) that will be written to temp file
+                   - File bytes/content (bytes), parsed from memory
                    - A file object with .read() method (for async file handling)
-        filename: Optional filename to use for temp file (only used when file_input is bytes/file object)
+        filename: Optional name used for extracted images (only used when file_input is bytes/file object)
         write_images: Whether to extract and write images (default: False)
 
     Returns:
         Markdown content as string
     """
-    temp_path = None
+    # Handle different input types
+    if isinstance(file_input, str) and os.path.exists(file_input):
+        # Direct file path
+        return await get_conversion_service().convert(_convert_file, file_input, write_images)
 
-    try:
-        # Handle different input types
-        if isinstance(file_input, str) and os.path.exists(file_input):
-            # Direct file path
-            md = pdfmd.to_markdown(file_input, write_images=write_images)
-            return md
-
-        elif isinstance(file_input, bytes):
-            # File bytes - write to temp file
-            temp_filename = filename or "temp_pdf.pdf"
-            temp_path = f"/tmp/{temp_filename}"
-            with open(temp_path, "wb") as f:
-                f.write(file_input)
-            md = pdfmd.to_markdown(temp_path, write_images=write_images)
-            return md
-
-        elif hasattr(file_input, "read"):
-            # File object (like FastAPI UploadFile)
-            temp_filename = filename or getattr(file_input, "filename", "temp_pdf.pdf")
-            temp_path = f"/tmp/{temp_filename}"
-
-            # Handle both sync and async file objects
-            if hasattr(file_input, "__aiter__") or hasattr(file_input.read, "__call__"):
-                try:
-                    # Try async read first
-                    content = await file_input.read()
-                except TypeError:
-                    # Fall back to sync read
-                    content = file_input.read()
-            else:
+    elif isinstance(file_input, bytes):
+        return await get_conversion_service().convert(_convert_bytes, file_input, filename or "paper.pdf", write_images)
+
+    elif hasattr(file_input, "read"):
+        # File object (like FastAPI UploadFile)
+        filename = filename or getattr(file_input, "filename", "paper.pdf")
+
+        # Handle both sync and async file objects
+        if hasattr(file_input, "__aiter__") or hasattr(file_input.read, "__call__"):
+            try:
+                # Try async read first
+                content = await file_input.read()
+            except TypeError:
+                # Fall back to sync read
                 content = file_input.read()
+        else:
+            content = file_input.read()
+
+        return await get_conversion_service().convert(_convert_bytes, content, filename, write_images)
+
+    else:
+        raise ValueError(f"Unsupported file_input type: {type(file_input)}")
+
+
+def _is_pdf_content_type(content_type: str) -> bool:
+    """Reject responses that announce themselves as documents other than a PDF (e.g. landing pages)."""
+    media_type = content_type.split(";")[0].strip().lower()
+    return not (media_type.startswith("text/") or media_type.endswith(("html", "xml", "json")))
+
+
+async def _spool_pdf(response: httpx.Response, pdf_url: str, cache) -> tuple[str, str, int, bool]:
+    """
+    Stream a PDF response into a temp file and hand it to the PDF cache.
+
+    Only one chunk is held in memory at a time. The Content-Type, the declared
+    size and the %PDF magic bytes are checked before the body is written.
+
+    Returns:
+        Tuple of (path, sha256, size, whether the path is a temp file the caller must delete)
+    """
+    content_type = response.headers.get("content-type", "")
+    if not _is_pdf_content_type(content_type):
+        raise InvalidPdfError(f"Expected a PDF from {pdf_url} but got {content_type}")
+
+    max_bytes = config.PDF_MAX_DOWNLOAD_BYTES
+    declared_size = response.headers.get("content-length", "")
+    if declared_size.isdigit() and int(declared_size) > max_bytes:
+        raise InvalidPdfError(f"PDF at {pdf_url} is {declared_size} bytes, the limit is {max_bytes}")
+
+    fd, temp_path = await asyncio.to_thread(cache.spool_file)
+    try:
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise InvalidPdfError(f"PDF at {pdf_url} exceeds the {max_bytes} byte limit")
+                if head is not None:
+                    # Hold back the first bytes until the magic bytes can be checked
+                    head += chunk
+                    if len(head) < PDF_MAGIC_WINDOW:
+                        continue
+                    _check_pdf_magic(head, pdf_url)
+                    chunk, head = head, None
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+                await _report_download(size, int(declared_size) if declared_size.isdigit() else None)
+            if head is not None:
+                _check_pdf_magic(head, pdf_url)
+                digest.update(head)
+                await asyncio.to_thread(f.write, head)
+
+        sha256 = digest.hexdigest()
+        try:
+            path = await asyncio.to_thread(cache.store_file, pdf_url, temp_path, sha256, size, response.headers)
+        except OSError:
+            # A full or read-only cache directory must not fail the download
+            path = None
+    except BaseException:
+        _remove_file(temp_path)
+        raise
+
+    if path is None:
+        return temp_path, sha256, size, True
+    return path, sha256, size, False
+
+
+async def _report_download(size: int, total: Optional[int]) -> None:
+    if total:
+        await report_progress(DOWNLOAD_PROGRESS * size / total, f"Downloaded {size} of {total} bytes")
+    else:
+        # Unknown length: approach the download share without reaching it
+        await report_progress(DOWNLOAD_PROGRESS * size / (size + 1024**2), f"Downloaded {size} bytes")
+
+
+def _check_pdf_magic(head: bytes, pdf_url: str) -> None:
+    # The PDF header may be preceded by junk, readers accept it within the first 1024 bytes
+    if b"%PDF-" not in head[:PDF_MAGIC_WINDOW]:
+        raise InvalidPdfError(f"Response from {pdf_url} is not a PDF")
 
-            with open(temp_path, "wb") as f:
-                f.write(content)
-            md = pdfmd.to_markdown(temp_path, write_images=write_images)
-            return md
 
+def _remove_file(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+async def _fetch_pdf(pdf_url: str, client: httpx.AsyncClient, cache, entry: Optional[dict]) -> tuple[str, str, int, bool]:
+    """Download pdf_url, revalidating entry with a conditional GET when given."""
+    headers = cache.validators(entry) if entry else {}
+    async with client.stream("GET", pdf_url, headers=headers, timeout=60) as response:
+        if response.status_code == 304 and entry:
+            path = await asyncio.to_thread(cache.blob_path, entry)
+            if path is not None:
+                await asyncio.to_thread(cache.mark_revalidated, pdf_url, entry)
+                return path, entry["sha256"], entry["size"], False
         else:
-            raise ValueError(f"Unsupported file_input type: {type(file_input)}")
+            response.raise_for_status()
+            return await _spool_pdf(response, pdf_url, cache)
+
+    # Blob vanished between lookup and revalidation, fetch unconditionally
+    return await _fetch_pdf(pdf_url, client, cache, None)
+
+
+@asynccontextmanager
+async def _downloaded_pdf(pdf_url: str, client: Optional[httpx.AsyncClient] = None):
+    """
+    Download a PDF through the on-disk PDF cache.
 
+    Yields:
+        Tuple of (path to the PDF on disk, sha256 of the PDF, size in bytes);
+        the path is only valid inside the with block
+    """
+    from core.http import get_http_client
+
+    cache = get_pdf_cache()
+    entry = await asyncio.to_thread(cache.lookup, pdf_url)
+    if entry and cache.is_fresh(entry):
+        path = await asyncio.to_thread(cache.blob_path, entry)
+        if path is not None:
+            yield path, entry["sha256"], entry["size"]
+            return
+
+    client = client or get_http_client()
+    path, sha256, size, temporary = await _fetch_pdf(pdf_url, client, cache, entry)
+    try:
+        yield path, sha256, size
     finally:
-        # Clean up temporary file
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-            except Exception:
-                pass  # Ignore cleanup errors
+        if temporary:
+            await asyncio.to_thread(_remove_file, path)
 
 
 async def _download_and_parse_pdf_core(
     pdf_url: str, 
-    filename: str = "paper.pdf",
-    write_images: bool = False
+    write_images: bool = False,
+    client: Optional[httpx.AsyncClient] = None,
+    pages: Optional[str] = None,
+    progress: Optional[ProgressCallback] = None,
 ) -> tuple[str, int, str]:
-    # Download PDF
-    pdf_response = requests.get(pdf_url, timeout=60)
-    pdf_response.raise_for_status()
-    
-    # Parse PDF to markdown
-    markdown_content = await extract_pdf_to_markdown(
-        pdf_response.content, 
-        filename=filename, 
-        write_images=write_images
-    )
+    key = (str(httpx.URL(pdf_url)), write_images, pages)
+    reporter = _progress_reporters.get(key)
+    if reporter is None:
+        reporter = _progress_reporters[key] = ProgressReporter()
+    reporter.add(progress)
+    try:
+        return await _inflight.do(key, _run_with_progress, key, reporter, pdf_url, write_images, client, pages)
+    finally:
+        reporter.remove(progress)
+
+
+async def _run_with_progress(key: Hashable, reporter: ProgressReporter, *args) -> tuple[str, int, str]:
+    # Runs as the shared single-flight task, so this only affects the pipeline below
+    current_progress.set(reporter)
+    try:
+        return await _fetch_and_convert_pdf(*args)
+    finally:
+        if _progress_reporters.get(key) is reporter:
+            del _progress_reporters[key]
+
+
+async def _fetch_and_convert_pdf(
+    pdf_url: str,
+    write_images: bool,
+    client: Optional[httpx.AsyncClient],
+    pages: Optional[str] = None,
+) -> tuple[str, int, str]:
+    # Download PDF to disk (served from the on-disk cache when possible)
+    async with _downloaded_pdf(pdf_url, client) as (path, sha256, file_size):
+        await report_progress(DOWNLOAD_PROGRESS, f"Downloaded PDF ({file_size} bytes), converting to markdown")
+        if pages is not None:
+            markdown_content, page_count = await _convert_page_range(path, sha256, pages, write_images)
+            await report_progress(100, f"Converted pages {pages}")
+            return markdown_content, file_size, f"Successfully parsed pages {pages} of {page_count} ({file_size} bytes)"
+
+        # Parse PDF to markdown, identical PDFs are only converted once
+        markdown_cache = get_markdown_cache()
+        markdown_content = await asyncio.to_thread(markdown_cache.get, sha256, write_images)
+        if markdown_content is None:
+            markdown_content = await _convert_document(path, sha256, write_images)
+            try:
+                await asyncio.to_thread(markdown_cache.put, sha256, markdown_content, write_images)
+            except OSError:
+                pass  # Caching is best effort
+    await report_progress(100, "Converted PDF to markdown")
     
-    file_size = len(pdf_response.content)
     message = f"Successfully parsed PDF content ({file_size} bytes)"
     
     return markdown_content, file_size, message
 
 
+def _page_batches(page_count: int, workers: int) -> list[list[int]]:
+    """Split a document into one contiguous page batch per worker, or a single batch below the threshold (0: never split)."""
+    threshold = config.PDF_PARALLEL_PAGE_THRESHOLD
+    if workers < 2 or threshold < 1 or page_count < threshold:
+        return [list(range(page_count))]
+    batch_size = -(-page_count // workers)
+    return [list(range(start, min(start + batch_size, page_count))) for start in range(0, page_count, batch_size)]
+
+
+async def _convert_document(path: str, sha256: str, write_images: bool) -> str:
+    """
+    Convert a whole document, in parallel page batches for long documents.
+
+    Batches run on separate workers and are joined in page order. The pages of
+    a parallel conversion are also stored in the per-page cache. When the
+    conversion queue has no room for every batch, the document is converted
+    as one job instead.
+    """
+    service = get_conversion_service()
+    batches = None
+    if service.max_workers > 1 and config.PDF_PARALLEL_PAGE_THRESHOLD > 0:
+        page_count = await asyncio.to_thread(_page_count, path)
+        batches = _page_batches(page_count, service.max_workers)
+    if batches is None or len(batches) == 1:
+        return await extract_pdf_to_markdown(path, write_images=write_images)
+
+    hdr_info = await service.convert(_identify_headers, path)
+    # Claim a slot per batch up front: a batch rejected by a full queue halfway
+    # through would fail the request while its siblings keep the workers busy
+    if not service.reserve(len(batches)):
+        results = [await service.convert(_convert_pages, path, list(range(page_count)), write_images, hdr_info)]
+    else:
+        results = await _convert_reserved_batches(service, path, batches, page_count, write_images, hdr_info)
+    texts = [text for batch_texts in results for text in batch_texts]
+    try:
+        await asyncio.to_thread(get_markdown_cache().put_pages, sha256, dict(enumerate(texts)), write_images)
+    except OSError:
+        pass  # Caching is best effort
+    return "".join(texts)
+
+
+async def _convert_reserved_batches(
+    service: ConversionService, path: str, batches: list[list[int]], page_count: int, write_images: bool, hdr_info
+) -> list[list[str]]:
+    """Convert page batches in parallel on slots reserved for them, reporting progress as batches finish."""
+    unused_slots = len(batches)
+    converted_pages = 0
+
+    async def convert_batch(batch: list[int]) -> list[str]:
+        nonlocal converted_pages, unused_slots
+        unused_slots -= 1
+        texts = await service.convert_reserved(_convert_pages, path, batch, write_images, hdr_info)
+        converted_pages += len(batch)
+        await report_progress(
+            DOWNLOAD_PROGRESS + (100 - DOWNLOAD_PROGRESS) * converted_pages / page_count,
+            f"Converted {converted_pages} of {page_count} pages",
+        )
+        return texts
+
+    try:
+        return await asyncio.gather(*(convert_batch(batch) for batch in batches))
+    finally:
+        # Batches that never started (the request was cancelled) give their slots back
+        service.release(unused_slots)
+
+
+async def _convert_page_range(path: str, sha256: str, pages: str, write_images: bool) -> tuple[str, int]:
+    """
+    Convert the selected pages, reusing pages already in the markdown cache.
+
+    Returns:
+        Tuple of (markdown of the selected pages in order, page count of the document)
+    """
+    page_count = await asyncio.to_thread(_page_count, path)
+    page_numbers = parse_page_range(pages, page_count)
+
+    markdown_cache = get_markdown_cache()
+    converted = await asyncio.to_thread(markdown_cache.get_pages, sha256, page_numbers, write_images)
+    missing = [page for page in page_numbers if page not in converted]
+    if missing:
+        texts = await get_conversion_service().convert(_convert_pages, path, missing, write_images)
+        new_pages = dict(zip(missing, texts))
+        converted.update(new_pages)
+        try:
+            await asyncio.to_thread(markdown_cache.put_pages, sha256, new_pages, write_images)
+        except OSError:
+            pass  # Caching is best effort
+
+    return "".join(converted[page] for page in page_numbers), page_count
+
+
+def _paginate(markdown: str, cursor: int = 0, max_chars: Optional[int] = None) -> dict:
+    """
+    Slice converted markdown into a chunk starting at `cursor`.
+
+    Chunks end at a paragraph break when one falls in the second half of the
+    window, so follow-up chunks start on a clean boundary. `next_cursor` is
+    None once the end of the document is reached.
+    """
+    if cursor < 0 or (max_chars is not None and max_chars < 1):
+        raise ValueError("cursor must not be negative and max_chars must be at least 1")
+    total_chars = len(markdown)
+    cursor = min(cursor, total_chars)
+    end = total_chars if not max_chars else min(total_chars, cursor + max_chars)
+    if end < total_chars:
+        paragraph_end = markdown.rfind("\n\n", cursor + max_chars // 2, end)
+        if paragraph_end != -1:
+            end = paragraph_end + 2
+    return {
+        "content": markdown[cursor:end],
+        "cursor": cursor,
+        "next_cursor": end if end < total_chars else None,
+        "total_chars": total_chars,
+    }
+
+
 async def download_paper_and_parse_to_markdown(
     metadata: dict, 
-    pdf_url_field: str = "download_url",
+    pdf_url_field: str = "pdf_url",
     paper_id: str = "",
-    write_images: bool = False
+    write_images: bool = False,
+    cursor: int = 0,
+    max_chars: Optional[int] = None,
+    pages: Optional[str] = None,
+    progress: Optional[ProgressCallback] = None,
 ) -> dict:
     # Extract PDF URL from metadata
     pdf_url = metadata.get(pdf_url_field)
@@ -144,25 +508,28 @@ async def download_paper_and_parse_to_markdown(
         }
 
     try:
-        filename = f"{paper_id}.pdf" if paper_id else "paper.pdf"
-        markdown_content, file_size, message = await _download_and_parse_pdf_core(
-            pdf_url, filename, write_images
-        )
+        markdown_content, file_size, message = await _download_and_parse_pdf_core(pdf_url, write_images, pages=pages, progress=progress)
         
         return {
             "status": "success",
             "metadata": metadata,
-            "content": markdown_content,
+            **_paginate(markdown_content, cursor, max_chars),
             "file_size": file_size,
             "message": message,
         }
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         return {
             "status": "error", 
             "message": f"Network error: {str(e)}", 
             "metadata": metadata
         }
+    except (ConversionQueueFull, InvalidPdfError, PageRangeError) as e:
+        return {
+            "status": "error", 
+            "message": str(e), 
+            "metadata": metadata
+        }
     except Exception as e:
         return {
             "status": "error", 
@@ -171,30 +538,37 @@ async def download_paper_and_parse_to_markdown(
         }
 
 
-async def download_pdf_and_parse_to_markdown(pdf_url: str, write_images: bool = False) -> dict:
+async def download_pdf_and_parse_to_markdown(
+    pdf_url: str,
+    write_images: bool = False,
+    cursor: int = 0,
+    max_chars: Optional[int] = None,
+    pages: Optional[str] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> dict:
     try:
-        filename = pdf_url.split('/')[-1] if '/' in pdf_url else "paper.pdf"
-        if not filename.endswith('.pdf'):
-            filename = "paper.pdf"
-            
-        markdown_content, file_size, message = await _download_and_parse_pdf_core(
-            pdf_url, filename, write_images
-        )
+        markdown_content, file_size, message = await _download_and_parse_pdf_core(pdf_url, write_images, pages=pages, progress=progress)
         
         return {
             "status": "success",
-            "content": markdown_content,
+            **_paginate(markdown_content, cursor, max_chars),
             "file_size": file_size,
             "pdf_url": pdf_url,
             "message": message,
         }
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         return {
             "status": "error", 
             "message": f"Network error downloading PDF: {str(e)}", 
             "pdf_url": pdf_url
         }
+    except (ConversionQueueFull, InvalidPdfError, PageRangeError) as e:
+        return {
+            "status": "error", 
+            "message": str(e), 
+            "pdf_url": pdf_url
+        }
     except Exception as e:
         return {
             "status": "error", 
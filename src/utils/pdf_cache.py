@@ -0,0 +1,201 @@
+"""
+Content-addressed on-disk cache for downloaded PDFs.
+
+pdf_url --sha256(url)--> url entry (json) --sha256(content)--> PDF blob
+
+URL entries record the content hash plus the ETag / Last-Modified validators
+returned by the upstream. PDF blobs are stored once per content hash, so the
+same paper reached through different URLs is kept only once.
+
+A URL entry younger than `fresh_seconds` is served straight from disk. Older
+entries are revalidated with a conditional GET when validators are available.
+
+Downloads are spooled into a temp file next to the blobs and moved into place
+with store_file(), so a PDF never has to be held in memory as a whole.
+
+Whenever blobs are evicted, URL entries pointing at them are pruned as well,
+so the urls/ tree does not grow without bound.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Mapping, Optional
+
+import config
+
+from .disk_cache import DiskCache, atomic_write
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class PdfCache:
+    """
+    Downloaded PDFs keyed by URL and by content hash.
+
+    Args:
+        directory: Root directory of the PDF cache
+        max_bytes: Size bound for stored PDFs (0 disables the cache)
+        fresh_seconds: How long a URL entry is served without revalidation
+    """
+
+    def __init__(self, directory: str, max_bytes: int, fresh_seconds: float):
+        self.blobs = DiskCache(os.path.join(directory, "blobs"), max_bytes)
+        self.urls_dir = os.path.join(directory, "urls")
+        self.fresh_seconds = fresh_seconds
+
+    @property
+    def enabled(self) -> bool:
+        return self.blobs.enabled
+
+    def _url_entry_path(self, url: str) -> str:
+        key = sha256_hex(url.encode("utf-8"))
+        return os.path.join(self.urls_dir, key[:2], f"{key}.json")
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for url, or None if it (or its blob) is missing."""
+        if not self.enabled:
+            return None
+        path = self._url_entry_path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.blobs.get_path(f"{entry['sha256']}.pdf") is None:
+            # Blob was evicted, the entry is useless without it
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            return None
+        return entry
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry.get("checked_at", 0) < self.fresh_seconds
+
+    @staticmethod
+    def validators(entry: Dict[str, Any]) -> Dict[str, str]:
+        """Conditional request headers for revalidating entry."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def read(self, entry: Dict[str, Any]) -> Optional[bytes]:
+        return self.blobs.read(f"{entry['sha256']}.pdf")
+
+    def blob_path(self, entry: Dict[str, Any]) -> Optional[str]:
+        return self.blobs.get_path(f"{entry['sha256']}.pdf")
+
+    def _evict(self) -> None:
+        if self.blobs.evict():
+            self._prune_url_entries()
+
+    def _prune_url_entries(self) -> None:
+        """Remove URL entries whose blob is gone (evicted) or that cannot be read."""
+        for root, _, files in os.walk(self.urls_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        sha256 = json.load(f)["sha256"]
+                except OSError:
+                    continue
+                except (ValueError, KeyError, TypeError):
+                    sha256 = None
+                if sha256 is None or not os.path.exists(self.blobs.path(f"{sha256}.pdf")):
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+
+    def _write_entry(self, url: str, entry: Dict[str, Any]) -> None:
+        atomic_write(self._url_entry_path(url), json.dumps(entry).encode("utf-8"))
+
+    @staticmethod
+    def _entry(url: str, sha256: str, size: int, headers: Mapping[str, str]) -> Dict[str, Any]:
+        return {
+            "url": url,
+            "sha256": sha256,
+            "size": size,
+            "etag": headers.get("etag", ""),
+            "last_modified": headers.get("last-modified", ""),
+            "checked_at": time.time(),
+        }
+
+    def mark_revalidated(self, url: str, entry: Dict[str, Any]) -> None:
+        """Record a 304 Not Modified for url."""
+        entry = {**entry, "checked_at": time.time()}
+        self._write_entry(url, entry)
+
+    def store(self, url: str, content: bytes, headers: Optional[Mapping[str, str]] = None) -> str:
+        """Store content for url and return its sha256."""
+        sha256 = sha256_hex(content)
+        if not self.enabled:
+            return sha256
+        headers = headers or {}
+        if self.blobs.get_path(f"{sha256}.pdf") is None:
+            self.blobs.write(f"{sha256}.pdf", content, evict=False)
+        self._write_entry(url, self._entry(url, sha256, len(content), headers))
+        self._evict()
+        return sha256
+
+    def spool_file(self) -> tuple[int, str]:
+        """
+        Open a temp file for an in-progress download.
+
+        Returns:
+            Tuple of (file descriptor, path); the path is on the cache's filesystem
+            when possible so store_file() can rename instead of copy.
+        """
+        if self.enabled:
+            try:
+                os.makedirs(self.blobs.directory, exist_ok=True)
+                return tempfile.mkstemp(dir=self.blobs.directory, prefix=".tmp-", suffix=".pdf")
+            except OSError:
+                pass  # Read-only cache directory, spool to the system temp dir instead
+        return tempfile.mkstemp(prefix="paperclip-", suffix=".pdf")
+
+    def store_file(self, url: str, temp_path: str, sha256: str, size: int, headers: Optional[Mapping[str, str]] = None) -> Optional[str]:
+        """
+        Move a fully downloaded temp file into the cache.
+
+        Returns:
+            Path of the cached blob, or None if the PDF is not cached (temp_path is left in place)
+        """
+        if not self.enabled or size > self.blobs.max_bytes:
+            return None
+        key = f"{sha256}.pdf"
+        path = self.blobs.get_path(key)
+        if path is None:
+            path = self.blobs.move_in(key, temp_path, evict=False)
+        else:
+            os.unlink(temp_path)
+        self._write_entry(url, self._entry(url, sha256, size, headers or {}))
+        self._evict()
+        return path
+
+
+_pdf_cache: Optional[PdfCache] = None
+
+
+def get_pdf_cache() -> PdfCache:
+    """Return the process-wide PDF cache configured from config.py."""
+    global _pdf_cache
+
+    if _pdf_cache is None:
+        _pdf_cache = PdfCache(
+            os.path.join(config.CACHE_DIR, "pdf"),
+            max_bytes=config.PDF_CACHE_MAX_BYTES,
+            fresh_seconds=config.PDF_CACHE_FRESH_SECONDS,
+        )
+    return _pdf_cache
@@ -0,0 +1,63 @@
+"""
+Progress reporting for long-running PDF tool calls.
+
+The PDF pipeline reports progress as a percentage (downloading 0-30, converting
+30-100) through report_progress(). The reporter for the running pipeline is
+taken from a ContextVar, so the pipeline functions do not need a progress
+argument. Because identical requests share one pipeline (single-flight), a
+ProgressReporter fans every update out to all callers waiting on it, e.g. a
+client that timed out and retried the same call.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Callable, List, Optional
+
+# Same signature as fastmcp.Context.report_progress(progress, total, message)
+ProgressCallback = Callable[[float, Optional[float], Optional[str]], Awaitable[None]]
+
+
+class ProgressReporter:
+    """
+    Fan out monotonically increasing progress to a set of listeners.
+
+    Args:
+        min_interval: Minimum seconds between two updates (the final update is always sent)
+    """
+
+    def __init__(self, min_interval: float = 0.25):
+        self.min_interval = min_interval
+        self._listeners: List[ProgressCallback] = []
+        self._progress = -1.0
+        self._sent_at = 0.0
+
+    def add(self, listener: Optional[ProgressCallback]) -> None:
+        if listener is not None:
+            self._listeners.append(listener)
+
+    def remove(self, listener: Optional[ProgressCallback]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def report(self, progress: float, message: str) -> None:
+        progress = round(min(progress, 100.0), 1)
+        now = time.monotonic()
+        if progress <= self._progress or (progress < 100 and now - self._sent_at < self.min_interval):
+            return
+        self._progress = progress
+        self._sent_at = now
+        for listener in list(self._listeners):
+            try:
+                await listener(progress, 100.0, message)
+            except Exception:
+                pass  # A client that went away must not fail the shared work
+
+
+current_progress: ContextVar[Optional[ProgressReporter]] = ContextVar("paperclip_progress", default=None)
+
+
+async def report_progress(progress: float, message: str) -> None:
+    """Report progress (0-100) of the current pipeline, if anyone is listening."""
+    reporter = current_progress.get()
+    if reporter is not None:
+        await reporter.report(progress, message)
@@ -0,0 +1,41 @@
+"""
+Request coalescing for identical in-flight calls.
+
+When several MCP sessions ask for the same thing at the same time, only the
+first caller starts the upstream work. Every other caller with the same key
+awaits that same task and receives the same result (or exception).
+Callers must treat shared results as read-only.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers using the same key."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # Mark as retrieved in case every caller went away
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Await func(*args, **kwargs), joining an identical call that is already running.
+
+        The shared call is shielded, so one caller being cancelled does not cancel
+        the work for the others.
+        """
+        task = self._calls.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(func(*args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
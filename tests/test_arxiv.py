@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the arXiv client (offline, against a mocked upstream).
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+import time
+import xml.etree.ElementTree as ET
+from unittest import mock
+from urllib.parse import parse_qs
+
+import httpx
+
+# Add src to path to import server modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import config
+from core import Paper, fetch_arxiv_papers, iter_arxiv_pages
+from core.arxiv import _parse_arxiv_feed
+from core.http import create_http_client
+
+FULL_ENTRY_FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">
+  <title type="html">ArXiv Query: search_query=all:attention</title>
+  <opensearch:totalResults>12345</opensearch:totalResults>
+  <entry>
+    <id>http://arxiv.org/abs/1706.03762v7</id>
+    <updated>2023-08-02T00:41:18Z</updated>
+    <published>2017-06-12T17:57:34Z</published>
+    <title>Attention Is All You
+  Need</title>
+    <summary>  The dominant sequence transduction models are based on complex recurrent networks.
+</summary>
+    <author><name>Ashish Vaswani</name></author>
+    <author><name>Noam Shazeer</name><arxiv:affiliation xmlns:arxiv="http://arxiv.org/schemas/atom">Google</arxiv:affiliation></author>
+    <arxiv:doi xmlns:arxiv="http://arxiv.org/schemas/atom">10.48550/arXiv.1706.03762</arxiv:doi>
+    <link href="http://arxiv.org/abs/1706.03762v7" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/1706.03762v7" rel="related" type="application/pdf"/>
+    <arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+  <entry>
+    <id>http://arxiv.org/abs/cs/0001001v1</id>
+    <title>Old-style ID</title>
+  </entry>
+</feed>"""
+
+
+def search_feed(total, start, size):
+    entries = "".join(
+        f"""
+  <entry>
+    <id>http://arxiv.org/abs/2401.{n:05d}v1</id>
+    <title>Paper {n}</title>
+  </entry>"""
+        for n in range(start, min(start + size, total))
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">
+  <opensearch:totalResults>{total}</opensearch:totalResults>
+  <opensearch:startIndex>{start}</opensearch:startIndex>{entries}
+</feed>"""
+
+
+class SearchResults:
+    """Mock arXiv search API with `total` matching papers."""
+
+    def __init__(self, total):
+        self.total = total
+        self.requests = []
+        self.sent_at = []
+
+    def __call__(self, request):
+        params = parse_qs(request.url.query.decode())
+        self.requests.append((int(params["start"][0]), int(params["max_results"][0])))
+        self.sent_at.append(time.monotonic())
+        return httpx.Response(200, text=search_feed(self.total, *self.requests[-1]))
+
+
+class TestArxivPagination(unittest.TestCase):
+    """Test class for multi-page arXiv searches."""
+
+    def search(self, upstream, call):
+        async def run():
+            async with create_http_client(transport=httpx.MockTransport(upstream)) as client:
+                return await call(client)
+
+        # Fast pacing for the test, the default is one request per 3 seconds
+        with mock.patch.object(config, "RATE_LIMITS", "export.arxiv.org=20:1"):
+            return asyncio.run(run())
+
+    def test_fetches_pages_up_to_max_results(self):
+        """Test that max_results beyond one page is fetched in paced pages with the true total."""
+        upstream = SearchResults(1000)
+
+        result = self.search(upstream, lambda client: fetch_arxiv_papers(query="graphs", max_results=450, client=client))
+
+        self.assertEqual(upstream.requests, [(0, 200), (200, 200), (400, 50)])
+        self.assertEqual(len(result["data"]), 450)
+        self.assertEqual(result["data"][449].title, "Paper 449")
+        self.assertEqual(result["meta"]["total_results"], 1000)
+        self.assertEqual(result["meta"]["next_start_index"], 450)
+        gaps = [b - a for a, b in zip(upstream.sent_at, upstream.sent_at[1:])]
+        self.assertTrue(all(gap >= 0.04 for gap in gaps), gaps)
+
+    def test_resumes_from_start_index_until_the_end(self):
+        """Test that a search resumed at start_index stops at the last result."""
+        upstream = SearchResults(230)
+
+        result = self.search(upstream, lambda client: fetch_arxiv_papers(query="graphs", max_results=500, start_index=100, client=client))
+
+        self.assertEqual(upstream.requests, [(100, 200)])
+        self.assertEqual(len(result["data"]), 130)
+        self.assertEqual(result["meta"]["start_index"], 100)
+        self.assertIsNone(result["meta"]["next_start_index"])
+
+    def test_pages_are_yielded_as_they_arrive(self):
+        """Test that iter_arxiv_pages yields each page before requesting the next one."""
+        upstream = SearchResults(500)
+
+        async def call(client):
+            seen = []
+            async for page in iter_arxiv_pages(query="graphs", max_results=None, client=client):
+                seen.append((len(upstream.requests), len(page["data"]), page["meta"]["next_start_index"]))
+            return seen
+
+        pages = self.search(upstream, call)
+
+        self.assertEqual(pages, [(1, 200, 200), (2, 200, 400), (3, 100, None)])
+
+
+class TestArxivParser(unittest.TestCase):
+    """Test class for the streaming Atom feed parser."""
+
+    def test_parses_every_field(self):
+        """Test that the single-pass parser extracts all fields and the total."""
+        entries, total = _parse_arxiv_feed(FULL_ENTRY_FEED)
+
+        self.assertEqual(total, 12345)
+        self.assertEqual([entry_id for entry_id, _ in entries], ["http://arxiv.org/abs/1706.03762v7", "http://arxiv.org/abs/cs/0001001v1"])
+        self.assertEqual(entries[0][1], Paper(
+            provider="arxiv",
+            id="1706.03762v7",
+            title="Attention Is All You\n  Need",
+            abstract="The dominant sequence transduction models are based on complex recurrent networks.",
+            authors=("Ashish Vaswani", "Noam Shazeer"),
+            published="2017-06-12T17:57:34Z",
+            updated="2023-08-02T00:41:18Z",
+            doi="10.48550/arXiv.1706.03762",
+            pdf_url="https://arxiv.org/pdf/1706.03762v7",
+            url="http://arxiv.org/abs/1706.03762v7",
+            subjects=("cs.CL", "cs.LG"),
+        ))
+        # Missing fields default to empty values, the PDF URL is derived from the ID
+        self.assertEqual(entries[1][1].pdf_url, "https://arxiv.org/pdf/cs/0001001v1")
+        self.assertEqual(entries[1][1].abstract, "")
+        self.assertEqual(entries[1][1].authors, ())
+
+    def test_malformed_feed_raises(self):
+        """Test that a truncated feed raises a parse error."""
+        with self.assertRaises(ET.ParseError):
+            _parse_arxiv_feed(FULL_ENTRY_FEED[:500])
+
+
+if __name__ == "__main__":
+    unittest.main()
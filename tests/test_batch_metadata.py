@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Unit tests for batch metadata lookups (get_papers_metadata_batch).
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+from unittest import mock
+from urllib.parse import parse_qs
+
+import httpx
+from fastmcp import Client
+
+# Add src to path to import server modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core import fetch_arxiv_papers_metadata, fetch_openalex_papers_metadata, fetch_single_arxiv_paper_metadata
+from core.http import create_http_client, set_http_client, close_http_client
+from tools import tools_mcp
+
+OSF_LATENCY = 0.2
+
+
+def arxiv_feed(entry_ids):
+    entries = "".join(
+        f"""
+  <entry>
+    <id>http://arxiv.org/abs/{entry_id}</id>
+    <title>Paper {entry_id}</title>
+    <link title="pdf" href="http://arxiv.org/pdf/{entry_id}" rel="related" type="application/pdf"/>
+  </entry>"""
+        for entry_id in entry_ids
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">{entries}
+</feed>"""
+
+
+class MockUpstreams:
+    """Mock arXiv, OpenAlex and OSF upstreams that know a fixed set of papers."""
+
+    arxiv_papers = {"1706.03762v1", "1706.03762v7", "2407.06405v1", "cs/0001001v1"}
+    openalex_papers = {"W1", "W2", "W3"}
+
+    def __init__(self):
+        self.requests = []
+        self.osf_in_flight = 0
+        self.osf_max_in_flight = 0
+
+    async def __call__(self, request):
+        self.requests.append(request)
+        params = parse_qs(request.url.query.decode())
+        if request.url.host == "export.arxiv.org":
+            requested = params["id_list"][0].split(",")
+            known = [p for p in self.arxiv_papers if p.split("v")[0] in {r.split("v")[0].replace("cs.AI/", "cs/") for r in requested}]
+            return httpx.Response(200, text=arxiv_feed(known))
+        if request.url.host == "api.openalex.org":
+            requested = params["filter"][0].removeprefix("openalex_id:").split("|")
+            works = [{"id": f"https://openalex.org/{w}", "title": f"Paper {w}"} for w in requested if w in self.openalex_papers]
+            return httpx.Response(200, json={"results": works, "meta": {"count": len(works)}})
+        return await self.osf(request)
+
+    async def osf(self, request):
+        self.osf_in_flight += 1
+        self.osf_max_in_flight = max(self.osf_max_in_flight, self.osf_in_flight)
+        try:
+            await asyncio.sleep(OSF_LATENCY)
+        finally:
+            self.osf_in_flight -= 1
+        if request.url.path.endswith("/files"):
+            return httpx.Response(200, json={"data": {"links": {"download": "https://osf.io/download/abcde"}}})
+        preprint_id = request.url.path.rstrip("/").rsplit("/", 1)[-1]
+        if preprint_id == "missing":
+            return httpx.Response(404, json={"errors": [{"detail": "Not found."}]})
+        return httpx.Response(200, json={
+            "data": {
+                "attributes": {"title": f"Preprint {preprint_id}"},
+                "relationships": {"primary_file": {"links": {"related": {"href": f"https://api.osf.io/v2/preprints/{preprint_id}/files"}}}},
+            }
+        })
+
+
+def call_batch(upstreams, paper_ids):
+    async def run():
+        set_http_client(create_http_client(transport=httpx.MockTransport(upstreams)))
+        try:
+            async with Client(tools_mcp) as client:
+                result = await client.call_tool("get_papers_metadata_batch", {"paper_ids": paper_ids})
+                return result.data
+        finally:
+            await close_http_client()
+
+    return asyncio.run(run())
+
+
+class TestBatchMetadata(unittest.TestCase):
+    """Test class for bulk metadata lookups."""
+
+    def test_results_are_returned_in_input_order(self):
+        """Test that mixed-provider results come back in input order with per-ID errors."""
+        upstreams = MockUpstreams()
+        paper_ids = ["W2", "2407.06405v1", "abcde", "W404", "1706.03762v7", "missing", "9999.99999v1", "W1"]
+
+        data = call_batch(upstreams, paper_ids)
+
+        self.assertEqual([r["id"] for r in data["results"]], paper_ids)
+        self.assertEqual(
+            [r["status"] for r in data["results"]],
+            ["success", "success", "success", "error", "success", "error", "error", "success"],
+        )
+        self.assertEqual(data["total_count"], 8)
+        self.assertEqual(data["error_count"], 3)
+        self.assertEqual(data["results"][0]["metadata"]["title"], "Paper W2")
+        self.assertEqual(data["results"][1]["metadata"]["pdf_url"], "https://arxiv.org/pdf/2407.06405v1")
+        self.assertEqual(data["results"][2]["metadata"]["title"], "Preprint abcde")
+        self.assertIn("W404", data["results"][3]["message"])
+
+    def test_arxiv_and_openalex_ids_use_one_bulk_request(self):
+        """Test that arXiv and OpenAlex IDs are fetched with one request per provider."""
+        upstreams = MockUpstreams()
+
+        data = call_batch(upstreams, ["W1", "1706.03762v7", "W2", "2407.06405v1", "W3", "W1"])
+
+        hosts = [request.url.host for request in upstreams.requests]
+        self.assertEqual(hosts.count("export.arxiv.org"), 1)
+        self.assertEqual(hosts.count("api.openalex.org"), 1)
+        self.assertEqual(data["error_count"], 0)
+        # Duplicate IDs are looked up once but reported at every position
+        self.assertEqual(data["results"][5]["metadata"]["id"], "W1")
+
+    def test_osf_ids_are_fetched_concurrently(self):
+        """Test that OSF preprints, which have no bulk endpoint, are fetched in parallel."""
+        upstreams = MockUpstreams()
+
+        data = call_batch(upstreams, ["aaaaa", "bbbbb"])
+
+        self.assertEqual(data["error_count"], 0)
+        self.assertEqual(upstreams.osf_max_in_flight, 2)
+
+    def test_osf_lookups_are_bounded_by_the_host_burst(self):
+        """Test that OSF IDs are looked up a burst at a time, each finishing both requests, and that the OSF share is capped."""
+        upstreams = MockUpstreams()
+        paper_ids = [f"osf{n:02d}" for n in range(12)]
+
+        with mock.patch("config.RATE_LIMITS", "api.osf.io=100:3"):
+            data = call_batch(upstreams, paper_ids)
+        with mock.patch("config.BATCH_METADATA_MAX_OSF_IDS", 11):
+            rejected = call_batch(upstreams, paper_ids)
+
+        self.assertEqual(data["error_count"], 0)
+        self.assertEqual(upstreams.osf_max_in_flight, 3)
+        self.assertIn("Too many OSF IDs: 12", rejected["error"])
+
+    def test_slow_osf_ids_time_out_per_id(self):
+        """Test that OSF lookups past the batch deadline are reported per ID while the rest succeed."""
+        upstreams = MockUpstreams()
+        osf = upstreams.osf
+
+        async def slow_osf(request):
+            if "slow" in request.url.path:
+                await asyncio.sleep(5)
+            return await osf(request)
+
+        upstreams.osf = slow_osf
+
+        with mock.patch("config.BATCH_METADATA_OSF_DEADLINE_SECONDS", 1.0):
+            data = call_batch(upstreams, ["aaaaa", "slow1", "W1", "slow2"])
+
+        self.assertEqual([r["status"] for r in data["results"]], ["success", "timeout", "success", "timeout"])
+        self.assertIn("retry", data["results"][1]["message"])
+        self.assertEqual(data["error_count"], 2)
+
+    def test_bulk_fetchers_split_large_batches(self):
+        """Test that the bulk fetchers stay within the upstream per-request ID limits."""
+        upstreams = MockUpstreams()
+        openalex_ids = [f"W{n}" for n in range(1, 121)]
+        arxiv_ids = [f"2401.{n:05d}" for n in range(150)] + ["cs.AI/0001001"]
+
+        async def run():
+            async with create_http_client(transport=httpx.MockTransport(upstreams)) as client:
+                return (
+                    await fetch_openalex_papers_metadata(openalex_ids, client),
+                    await fetch_arxiv_papers_metadata(arxiv_ids, client),
+                )
+
+        openalex, arxiv = asyncio.run(run())
+
+        hosts = [request.url.host for request in upstreams.requests]
+        self.assertEqual(hosts.count("api.openalex.org"), 3)
+        self.assertEqual(hosts.count("export.arxiv.org"), 2)
+        self.assertEqual(openalex["W3"].title, "Paper W3")
+        self.assertIsInstance(openalex["W120"], ValueError)
+        # Old-style IDs match entries without the subject class
+        self.assertEqual(arxiv["cs.AI/0001001"].title, "Paper cs/0001001v1")
+        self.assertIsInstance(arxiv["2401.00000"], ValueError)
+
+    def test_arxiv_versions_are_matched_exactly(self):
+        """Test that versioned arXiv IDs get their own version and unversioned IDs the latest one."""
+        upstreams = MockUpstreams()
+
+        async def run():
+            async with create_http_client(transport=httpx.MockTransport(upstreams)) as client:
+                return await fetch_arxiv_papers_metadata(["1706.03762v1", "1706.03762v7", "1706.03762", "1706.03762v3"], client)
+
+        arxiv = asyncio.run(run())
+
+        self.assertEqual(arxiv["1706.03762v1"].id, "1706.03762v1")
+        self.assertEqual(arxiv["1706.03762v7"].id, "1706.03762v7")
+        self.assertEqual(arxiv["1706.03762"].id, "1706.03762v7")
+        self.assertIsInstance(arxiv["1706.03762v3"], ValueError)
+
+    def test_single_arxiv_lookup_is_one_request(self):
+        """Test that an arXiv metadata lookup needs only the export API request, no PDF probe."""
+        upstreams = MockUpstreams()
+
+        async def run():
+            async with create_http_client(transport=httpx.MockTransport(upstreams)) as client:
+                found = await fetch_single_arxiv_paper_metadata("1706.03762", client)
+                with self.assertRaisesRegex(ValueError, "not found"):
+                    await fetch_single_arxiv_paper_metadata("9999.99999", client)
+                return found
+
+        metadata = asyncio.run(run())
+
+        self.assertEqual(metadata.title, "Paper 1706.03762v7")
+        self.assertEqual(metadata.pdf_url, "https://arxiv.org/pdf/1706.03762v7")
+        self.assertEqual([(r.method, r.url.host) for r in upstreams.requests], [("GET", "export.arxiv.org")] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the in-process and on-disk caches.
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+import tempfile
+import time
+from unittest import mock
+
+import httpx
+import pymupdf
+from fastmcp import Client
+
+# Add src to path to import server modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import config
+from core.http import create_http_client, set_http_client, close_http_client
+from core.providers import ProviderCache
+from utils.conversion import ConversionService
+from utils.markdown_cache import MarkdownCache
+from utils.pdf2md import (
+    InvalidPdfError,
+    PageRangeError,
+    _convert_pages,
+    _download_and_parse_pdf_core,
+    _downloaded_pdf,
+    parse_page_range,
+)
+from utils.pdf_cache import PdfCache, sha256_hex
+from tools import tools_mcp
+
+
+def osf_provider_list(*provider_ids):
+    """Build a minimal OSF preprint_providers response."""
+    related = {"links": {"related": {"href": "https://api.osf.io/v2/"}}}
+    return {
+        "data": [
+            {
+                "id": provider_id,
+                "attributes": {"description": f"{provider_id} preprints"},
+                "relationships": {"taxonomies": related, "preprints": related},
+            }
+            for provider_id in provider_ids
+        ]
+    }
+
+
+class TestProviderCache(unittest.TestCase):
+    """Test class for the OSF provider list cache."""
+
+    def setUp(self):
+        """Set up a mocked OSF API that counts provider list fetches."""
+        self.fetches = 0
+        self.provider_ids = ["osf", "psyarxiv"]
+
+        async def handler(request):
+            self.fetches += 1
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json=osf_provider_list(*self.provider_ids))
+
+        self.handler = handler
+
+    def test_concurrent_lookups_share_one_fetch(self):
+        """Test that a cold cache is filled by a single upstream request."""
+        cache = ProviderCache(ttl=60, max_stale=3600)
+
+        async def run():
+            async with create_http_client(transport=httpx.MockTransport(self.handler)) as client:
+                return await asyncio.gather(
+                    cache.all_providers(client),
+                    cache.get("psyarxiv", client),
+                    cache.get("arxiv", client),
+                    cache.get("unknown", client),
+                )
+
+        all_providers, psyarxiv, arxiv, unknown = asyncio.run(run())
+
+        self.assertEqual(self.fetches, 1)
+        self.assertEqual([p["id"] for p in all_providers], ["arxiv", "openalex", "osf", "psyarxiv"])
+        self.assertEqual(psyarxiv["type"], "osf")
+        self.assertEqual(arxiv["type"], "standalone")
+        self.assertIsNone(unknown)
+
+    def test_stale_list_is_served_while_refreshing(self):
+        """Test that an expired entry is returned immediately and refreshed in the background."""
+        cache = ProviderCache(ttl=0, max_stale=3600)
+
+        async def run():
+            async with create_http_client(transport=httpx.MockTransport(self.handler)) as client:
+                await cache.all_providers(client)
+                self.provider_ids = ["osf", "psyarxiv", "socarxiv"]
+
+                stale = await cache.get("socarxiv", client)
+                await asyncio.sleep(0.05)
+                fresh = await cache.get("socarxiv", client)
+                return stale, fresh
+
+        stale, fresh = asyncio.run(run())
+
+        self.assertIsNone(stale)
+        self.assertEqual(fresh["id"], "socarxiv")
+
+    def test_standalone_providers_do_not_need_osf(self):
+        """Test that arXiv and OpenAlex searches work while the OSF provider list cannot be fetched."""
+        hosts = []
+
+        async def handler(request):
+            hosts.append(request.url.host)
+            if request.url.host == "api.osf.io":
+                return httpx.Response(503)
+            if request.url.host == "export.arxiv.org":
+                return httpx.Response(200, text='<feed xmlns="http://www.w3.org/2005/Atom"></feed>')
+            return httpx.Response(200, json={"results": [], "meta": {"count": 0}})
+
+        async def run():
+            set_http_client(create_http_client(transport=httpx.MockTransport(handler)))
+            try:
+                async with Client(tools_mcp) as client:
+                    return [
+                        (await client.call_tool("search_papers", {"provider": provider})).data
+                        for provider in ("arxiv", "openalex")
+                    ]
+            finally:
+                await close_http_client()
+
+        with mock.patch("core.providers._provider_cache", ProviderCache(ttl=60, max_stale=3600)):
+            arxiv, openalex = asyncio.run(run())
+
+        self.assertEqual(arxiv["data"], [])
+        self.assertEqual(openalex["data"], [])
+        self.assertNotIn("api.osf.io", hosts)
+
+    def test_fresh_list_is_not_refetched(self):
+        """Test that lookups within the TTL never hit the upstream again."""
+        cache = ProviderCache(ttl=60, max_stale=3600)
+
+        async def run():
+            async with create_http_client(transport=httpx.MockTransport(self.handler)) as client:
+                for _ in range(5):
+                    await cache.get("osf", client)
+
+        asyncio.run(run())
+        self.assertEqual(self.fetches, 1)
+
+
+class TestPdfCache(unittest.TestCase):
+    """Test class for the on-disk PDF cache."""
+
+    def setUp(self):
+        """Set up a PDF cache in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = PdfCache(self.temp_dir.name, max_bytes=10_000, fresh_seconds=3600)
+        self.pdf = b"%PDF-1.7 paper"
+        self.requests = []
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def download(self, url, handler):
+        async def run():
+            async with create_http_client(transport=httpx.MockTransport(handler)) as client:
+                async with _downloaded_pdf(url, client) as (path, sha256, _):
+                    with open(path, "rb") as f:
+                        return f.read(), sha256
+
+        with mock.patch("utils.pdf2md.get_pdf_cache", return_value=self.cache):
+            return asyncio.run(run())
+
+    def handler(self, request):
+        self.requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=self.pdf, headers={"ETag": '"v1"'})
+
+    def test_repeat_fetch_is_served_from_disk(self):
+        """Test that a fresh entry is returned without touching the network."""
+        first = self.download("https://arxiv.org/pdf/1706.03762", self.handler)
+        second = self.download("https://arxiv.org/pdf/1706.03762", self.handler)
+
+        self.assertEqual(first, (self.pdf, sha256_hex(self.pdf)))
+        self.assertEqual(second, first)
+        self.assertEqual(len(self.requests), 1)
+
+    def test_stale_entry_is_revalidated_with_etag(self):
+        """Test that an expired entry sends If-None-Match and reuses the blob on 304."""
+        self.cache.fresh_seconds = 0
+        self.download("https://arxiv.org/pdf/1706.03762", self.handler)
+        content, _ = self.download("https://arxiv.org/pdf/1706.03762", self.handler)
+
+        self.assertEqual(content, self.pdf)
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.requests[1].headers["If-None-Match"], '"v1"')
+
+    def test_identical_content_is_stored_once(self):
+        """Test that two URLs serving the same bytes share one blob."""
+        self.cache.store("https://arxiv.org/pdf/1706.03762", self.pdf)
+        self.cache.store("https://export.arxiv.org/pdf/1706.03762", self.pdf)
+
+        self.assertEqual(self.cache.blobs.size(), len(self.pdf))
+        self.assertIsNotNone(self.cache.lookup("https://export.arxiv.org/pdf/1706.03762"))
+
+    def test_least_recently_used_pdf_is_evicted(self):
+        """Test that exceeding max_bytes evicts the least recently used PDF."""
+        self.cache.blobs.max_bytes = 2500
+        for name in ("a", "b"):
+            self.cache.store(f"https://example.org/{name}.pdf", name.encode() * 1000)
+            time.sleep(0.01)
+        # Touch "a" so "b" becomes the least recently used entry
+        self.cache.read(self.cache.lookup("https://example.org/a.pdf"))
+        time.sleep(0.01)
+        self.cache.store("https://example.org/c.pdf", b"c" * 1000)
+
+        self.assertIsNotNone(self.cache.lookup("https://example.org/a.pdf"))
+        self.assertIsNone(self.cache.lookup("https://example.org/b.pdf"))
+        self.assertIsNotNone(self.cache.lookup("https://example.org/c.pdf"))
+        self.assertLessEqual(self.cache.blobs.size(), 2500)
+
+    def test_url_entries_of_evicted_pdfs_are_pruned(self):
+        """Test that URL entries are removed together with the blob they point at."""
+        self.cache.blobs.max_bytes = 2500
+        for name in ("a", "b", "c"):
+            self.cache.store(f"https://example.org/{name}.pdf", name.encode() * 1000)
+            time.sleep(0.01)
+
+        url_entries = [name for _, _, files in os.walk(self.cache.urls_dir) for name in files]
+        self.assertEqual(len(url_entries), 2)
+        self.assertIsNone(self.cache.lookup("https://example.org/a.pdf"))
+
+    def test_writes_below_budget_do_not_scan_the_cache(self):
+        """Test that the cache size is tracked in memory instead of walking the tree on every write."""
+        self.cache.blobs.max_bytes = 1_000_000
+        self.cache.store("https://example.org/first.pdf", b"0" * 1000)
+
+        with mock.patch("utils.disk_cache.os.walk", wraps=os.walk) as walk:
+            for n in range(20):
+                self.cache.store(f"https://example.org/{n}.pdf", str(n).encode() * 1000)
+
+        self.assertEqual(walk.call_count, 0)
+        self.assertEqual(self.cache.blobs._total, self.cache.blobs.size())
+
+
+class TestPdfDownload(unittest.TestCase):
+    """Test class for streaming PDF downloads."""
+
+    def setUp(self):
+        """Set up a PDF cache in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = PdfCache(self.temp_dir.name, max_bytes=100_000, fresh_seconds=3600)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def download(self, response):
+        async def run():
+            async with create_http_client(transport=httpx.MockTransport(lambda request: response)) as client:
+                async with _downloaded_pdf("https://example.org/paper.pdf", client) as (path, _, size):
+                    return path, size, os.path.exists(path)
+
+        with mock.patch("utils.pdf2md.get_pdf_cache", return_value=self.cache):
+            return asyncio.run(run())
+
+    def spooled_files(self):
+        return [name for _, _, files in os.walk(self.temp_dir.name) for name in files if name.startswith(".tmp-")]
+
+    def test_large_pdf_is_streamed_into_the_cache(self):
+        """Test that a multi-chunk PDF ends up as a cache blob without leftover temp files."""
+        pdf = b"%PDF-1.7\n" + b"x" * 200_000
+        self.cache.blobs.max_bytes = 1_000_000
+        path, size, existed = self.download(httpx.Response(200, content=pdf, headers={"Content-Type": "application/pdf"}))
+
+        self.assertEqual(size, len(pdf))
+        self.assertTrue(existed)
+        self.assertTrue(path.startswith(self.cache.blobs.directory))
+        self.assertEqual(self.spooled_files(), [])
+
+    def test_html_landing_page_is_rejected(self):
+        """Test that an HTML response is rejected from its Content-Type."""
+        with self.assertRaisesRegex(InvalidPdfError, "text/html"):
+            self.download(httpx.Response(200, text="<html>Landing page</html>", headers={"Content-Type": "text/html"}))
+
+    def test_non_pdf_bytes_are_rejected(self):
+        """Test that a body without the %PDF magic bytes is rejected and nothing is cached."""
+        with self.assertRaisesRegex(InvalidPdfError, "not a PDF"):
+            self.download(httpx.Response(200, content=b"PK\x03\x04" + b"z" * 5000))
+
+        self.assertIsNone(self.cache.lookup("https://example.org/paper.pdf"))
+        self.assertEqual(self.spooled_files(), [])
+
+    def test_size_limit_is_enforced(self):
+        """Test that downloads above the limit abort, whether or not Content-Length is sent."""
+        async def chunks():
+            for _ in range(10):
+                yield b"%PDF-" + b"x" * 1000
+
+        with mock.patch.object(config, "PDF_MAX_DOWNLOAD_BYTES", 5000):
+            with self.assertRaisesRegex(InvalidPdfError, "limit"):
+                self.download(httpx.Response(200, content=b"%PDF-" + b"x" * 6000))
+            with self.assertRaisesRegex(InvalidPdfError, "limit"):
+                self.download(httpx.Response(200, content=chunks()))
+
+        self.assertEqual(self.spooled_files(), [])
+
+    def test_uncached_pdf_is_removed_after_use(self):
+        """Test that a PDF too large for the cache is served from a temp file that is deleted afterwards."""
+        self.cache.blobs.max_bytes = 10
+        path, _, existed = self.download(httpx.Response(200, content=b"%PDF-1.7 paper"))
+
+        self.assertTrue(existed)
+        self.assertFalse(os.path.exists(path))
+
+
+class TestMarkdownCache(unittest.TestCase):
+    """Test class for the persistent markdown conversion cache."""
+
+    def setUp(self):
+        """Set up PDF and markdown caches in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pdf_cache = PdfCache(os.path.join(self.temp_dir.name, "pdf"), max_bytes=10_000, fresh_seconds=3600)
+        self.markdown_cache = MarkdownCache(os.path.join(self.temp_dir.name, "markdown"), max_bytes=10_000)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def parse(self, url):
+        async def run():
+            handler = lambda request: httpx.Response(200, content=b"%PDF-1.7 paper")
+            async with create_http_client(transport=httpx.MockTransport(handler)) as client:
+                return await _download_and_parse_pdf_core(url, client=client)
+
+        return asyncio.run(run())
+
+    def test_repeat_conversion_is_skipped(self):
+        """Test that identical PDFs are converted once and then served from the cache."""
+        with mock.patch("utils.pdf2md.get_pdf_cache", return_value=self.pdf_cache), \
+                mock.patch("utils.pdf2md.get_markdown_cache", return_value=self.markdown_cache), \
+                mock.patch("utils.pdf2md.get_conversion_service", return_value=ConversionService(0, 1, 30)), \
+                mock.patch("utils.pdf2md.pdfmd.to_markdown", return_value="# Paper") as to_markdown:
+            first = self.parse("https://arxiv.org/pdf/1706.03762")
+            second = self.parse("https://arxiv.org/pdf/1706.03762v7")
+
+        self.assertEqual(first[0], "# Paper")
+        self.assertEqual(second[0], "# Paper")
+        self.assertEqual(to_markdown.call_count, 1)
+        self.assertEqual(self.markdown_cache.stats()["hits"], 1)
+        self.assertEqual(self.markdown_cache.stats()["misses"], 1)
+
+    def test_entries_are_compressed_and_keyed_by_options(self):
+        """Test that entries are stored compressed and write_images is part of the key."""
+        markdown = "## Section\n" * 500
+        self.markdown_cache.put("abc", markdown, write_images=False)
+
+        self.assertEqual(self.markdown_cache.get("abc", write_images=False), markdown)
+        self.assertIsNone(self.markdown_cache.get("abc", write_images=True))
+        self.assertLess(self.markdown_cache.store.size(), len(markdown) // 10)
+
+    def test_corrupt_entry_counts_as_miss(self):
+        """Test that an unreadable entry is dropped instead of returned."""
+        self.markdown_cache.store.write(MarkdownCache.key("abc", False), b"not gzip")
+
+        self.assertIsNone(self.markdown_cache.get("abc"))
+        self.assertEqual(self.markdown_cache.misses, 1)
+
+    def test_chunks_are_served_from_one_conversion(self):
+        """Test that reading a paper chunk by chunk downloads and converts it once."""
+        markdown = "".join(f"## Section {i}\n\n" + "word " * 50 + "\n\n" for i in range(20))
+        downloads = []
+
+        def handler(request):
+            downloads.append(request)
+            return httpx.Response(200, content=b"%PDF-1.7 thesis")
+
+        async def run():
+            set_http_client(create_http_client(transport=httpx.MockTransport(handler)))
+            chunks = []
+            cursor = 0
+            try:
+                async with Client(tools_mcp) as client:
+                    while cursor is not None:
+                        result = await client.call_tool(
+                            "get_paper_content_by_url",
+                            {"pdf_url": "https://thesiscommons.org/download/x.pdf", "cursor": cursor, "max_chars": 1000},
+                        )
+                        chunks.append(result.data)
+                        cursor = result.data["next_cursor"]
+            finally:
+                await close_http_client()
+            return chunks
+
+        with mock.patch("utils.pdf2md.get_pdf_cache", return_value=self.pdf_cache), \
+                mock.patch("utils.pdf2md.get_markdown_cache", return_value=self.markdown_cache), \
+                mock.patch("utils.pdf2md.get_conversion_service", return_value=ConversionService(0, 1, 30)), \
+                mock.patch("utils.pdf2md.pdfmd.to_markdown", return_value=markdown) as to_markdown:
+            chunks = asyncio.run(run())
+
+        self.assertGreater(len(chunks), 5)
+        self.assertTrue(all(len(chunk["content"]) <= 1000 for chunk in chunks))
+        self.assertTrue(all(chunk["content"].endswith("\n\n") for chunk in chunks))
+        self.assertEqual("".join(chunk["content"] for chunk in chunks), markdown)
+        self.assertEqual(chunks[0]["total_chars"], len(markdown))
+        self.assertEqual(len(downloads), 1)
+        self.assertEqual(to_markdown.call_count, 1)
+
+    def test_invalid_chunk_arguments_are_rejected(self):
+        """Test that a negative cursor or a non-positive max_chars is an error, not a backwards next_cursor."""
+        downloads = []
+
+        def handler(request):
+            downloads.append(request)
+            return httpx.Response(200, content=b"%PDF-1.7 thesis")
+
+        async def run():
+            set_http_client(create_http_client(transport=httpx.MockTransport(handler)))
+            try:
+                async with Client(tools_mcp) as client:
+                    return [
+                        (await client.call_tool(tool, {**arguments, **chunking})).data
+                        for tool, arguments in (
+                            ("get_paper_content_by_url", {"pdf_url": "https://thesiscommons.org/download/x.pdf"}),
+                            ("get_paper_by_id", {"paper_id": "1706.03762v7"}),
+                        )
+                        for chunking in ({"cursor": 50, "max_chars": -10}, {"max_chars": 0}, {"cursor": -1})
+                    ]
+            finally:
+                await close_http_client()
+
+        results = asyncio.run(run())
+
+        self.assertEqual([result["status"] for result in results], ["error"] * 6)
+        self.assertTrue(all("max_chars" in result["message"] for result in results))
+        self.assertEqual(downloads, [])
+
+
+class TestPageRanges(unittest.TestCase):
+    """Test class for converting selected pages with per-page caching."""
+
+    def setUp(self):
+        """Set up caches in a temporary directory and a six page PDF."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pdf_cache = PdfCache(os.path.join(self.temp_dir.name, "pdf"), max_bytes=100_000, fresh_seconds=3600)
+        self.markdown_cache = MarkdownCache(os.path.join(self.temp_dir.name, "markdown"), max_bytes=100_000)
+        document = pymupdf.open()
+        for page_number in range(1, 7):
+            document.new_page().insert_text((72, 72), f"Text of page {page_number}")
+        self.pdf = document.tobytes()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def parse(self, pages):
+        async def run():
+            handler = lambda request: httpx.Response(200, content=self.pdf)
+            async with create_http_client(transport=httpx.MockTransport(handler)) as client:
+                return await _download_and_parse_pdf_core("https://osf.io/download/thesis", client=client, pages=pages)
+
+        return asyncio.run(run())
+
+    def test_only_missing_pages_are_converted(self):
+        """Test that a second page range converts just the pages not converted before."""
+        with mock.patch("utils.pdf2md.get_pdf_cache", return_value=self.pdf_cache), \
+                mock.patch("utils.pdf2md.get_markdown_cache", return_value=self.markdown_cache), \
+                mock.patch("utils.pdf2md.get_conversion_service", return_value=ConversionService(0, 1, 30)), \
+                mock.patch("utils.pdf2md._convert_pages", wraps=_convert_pages) as convert_pages:
+            first, _, message = self.parse("1-2")
+            second, _, _ = self.parse("2-4")
+
+        self.assertIn("Text of page 1", first)
+        self.assertNotIn("Text of page 3", first)
+        self.assertIn("of 6", message)
+        self.assertLess(second.index("Text of page 2"), second.index("Text of page 4"))
+        self.assertNotIn("Text of page 1", second)
+        self.assertEqual([call.args[1] for call in convert_pages.call_args_list], [[0, 1], [2, 3]])
+
+    def test_parse_page_range(self):
+        """Test the 1-based page selection format."""
+        self.assertEqual(parse_page_range("1-3, 5", 10), [0, 1, 2, 4])
+        self.assertEqual(parse_page_range("9-", 10), [8, 9])
+        self.assertEqual(parse_page_range("2,2,1", 10), [0, 1])
+        self.assertEqual(parse_page_range("8-20", 10), [7, 8, 9])
+        for spec in ("0", "3-1", "abc", "11", ""):
+            with self.assertRaises(PageRangeError):
+                parse_page_range(spec, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the per-host circuit breakers.
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+import time
+from unittest import mock
+
+import httpx
+from fastmcp import Client
+
+# Add src to path to import server modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import core.circuit
+from core.circuit import CircuitBreakerRegistry, CircuitBreakerTransport, CircuitOpenError
+from core.http import create_http_client, set_http_client, close_http_client
+from tools import tools_mcp
+
+ARXIV_FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <id>http://arxiv.org/abs/1706.03762v7</id>
+    <title>Attention Is All You Need</title>
+  </entry>
+</feed>"""
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test class for the circuit breaker transport."""
+
+    def setUp(self):
+        """Set up a registry with a short cool-down and an upstream that fails until told otherwise."""
+        self.breakers = CircuitBreakerRegistry(failure_threshold=3, slow_call_seconds=0.2, cooldown=0.3)
+        self.healthy = False
+        self.delay = 0.0
+        self.attempts = 0
+
+        async def handler(request):
+            self.attempts += 1
+            await asyncio.sleep(self.delay)
+            return httpx.Response(200 if self.healthy else 503)
+
+        self.handler = handler
+
+    def client(self):
+        return httpx.AsyncClient(transport=CircuitBreakerTransport(httpx.MockTransport(self.handler), self.breakers))
+
+    def test_repeated_failures_open_the_circuit(self):
+        """Test that the breaker opens after the threshold and then fails fast."""
+        async def run():
+            async with self.client() as client:
+                for _ in range(3):
+                    await client.get("https://api.osf.io/v2/preprints/")
+                with self.assertRaises(CircuitOpenError):
+                    await client.get("https://api.osf.io/v2/preprints/")
+                # Other hosts are unaffected
+                await client.get("https://api.openalex.org/works")
+
+        asyncio.run(run())
+        self.assertEqual(self.attempts, 4)
+        self.assertEqual(self.breakers.state("api.osf.io"), "open")
+        self.assertEqual(self.breakers.state("api.openalex.org"), "closed")
+
+    def test_slow_calls_open_the_circuit(self):
+        """Test that successful but slow responses count as failures."""
+        self.healthy = True
+        self.delay = 0.25
+
+        async def run():
+            async with self.client() as client:
+                for _ in range(3):
+                    await client.get("https://share.osf.io/trove/index-card-search")
+
+        asyncio.run(run())
+        self.assertEqual(self.breakers.state("share.osf.io"), "open")
+
+    def test_cancelled_slow_call_counts_as_failure(self):
+        """Test that a caller abandoning a hanging host (search deadline) is recorded."""
+        self.delay = 10
+
+        async def run():
+            async with self.client() as client:
+                with self.assertRaises(TimeoutError):
+                    await asyncio.wait_for(client.get("https://api.osf.io/v2/preprints/"), 0.25)
+
+        asyncio.run(run())
+        self.assertEqual(self.breakers.breaker("api.osf.io").failures, 1)
+
+    def test_half_open_probe_closes_or_reopens(self):
+        """Test that one probe is allowed after the cool-down and decides the next state."""
+        async def run():
+            async with self.client() as client:
+                for _ in range(3):
+                    await client.get("https://api.osf.io/v2/")
+                await asyncio.sleep(0.35)
+                self.assertEqual(self.breakers.state("api.osf.io"), "half_open")
+
+                # A failed probe re-opens the breaker for another cool-down
+                await client.get("https://api.osf.io/v2/")
+                self.assertEqual(self.breakers.state("api.osf.io"), "open")
+                await asyncio.sleep(0.35)
+
+                # Only one probe at a time while half-open
+                self.healthy = True
+                self.delay = 0.05
+                results = await asyncio.gather(
+                    client.get("https://api.osf.io/v2/"), client.get("https://api.osf.io/v2/"), return_exceptions=True
+                )
+                return results
+
+        results = asyncio.run(run())
+        self.assertEqual(sum(isinstance(result, httpx.Response) for result in results), 1)
+        self.assertEqual(sum(isinstance(result, CircuitOpenError) for result in results), 1)
+        self.assertEqual(self.breakers.state("api.osf.io"), "closed")
+
+    def test_rate_limit_queueing_does_not_open_the_circuit(self):
+        """Test that requests waiting for a local rate-limit token are not counted as slow calls."""
+        self.healthy = True
+
+        async def run():
+            async with create_http_client(transport=httpx.MockTransport(self.handler)) as client:
+                responses = await asyncio.gather(*(client.get("https://api.osf.io/v2/preprints/") for _ in range(10)))
+                # A caller giving up while still queued never reached the host
+                with self.assertRaises(TimeoutError):
+                    await asyncio.gather(
+                        *(asyncio.wait_for(client.get("https://api.osf.io/v2/preprints/"), 0.3) for _ in range(10))
+                    )
+                return responses
+
+        with mock.patch.object(core.circuit, "_registry", self.breakers), \
+                mock.patch("config.RATE_LIMITS", "api.osf.io=20:1"):
+            started = time.monotonic()
+            responses = asyncio.run(run())
+
+        # 10 requests at 20/s queue for longer than the 0.2s slow-call threshold
+        self.assertGreater(time.monotonic() - started, 0.4)
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertEqual(self.breakers.state("api.osf.io"), "closed")
+        self.assertEqual(self.breakers.breaker("api.osf.io").failures, 0)
+
+    def test_search_skips_provider_with_open_circuit(self):
+        """Test that search_papers skips a failing provider instead of waiting on it."""
+        requested_hosts = []
+
+        def handler(request):
+            requested_hosts.append(request.url.host)
+            if request.url.host == "export.arxiv.org":
+                return httpx.Response(200, text=ARXIV_FEED)
+            return httpx.Response(200, json={"results": [], "meta": {"count": 0}})
+
+        breaker = self.breakers.breaker("share.osf.io")
+        breaker.opened_at = time.monotonic()
+
+        async def run():
+            set_http_client(create_http_client(transport=httpx.MockTransport(handler)))
+            try:
+                async with Client(tools_mcp) as client:
+                    result = await client.call_tool("search_papers", {"query": "attention"})
+                    return result.data
+            finally:
+                await close_http_client()
+
+        with mock.patch.object(core.circuit, "_registry", self.breakers):
+            result = asyncio.run(run())
+
+        self.assertNotIn("share.osf.io", requested_hosts)
+        self.assertEqual(result["provider_status"]["osf"]["status"], "skipped")
+        self.assertEqual(result["provider_status"]["osf"]["circuit"]["share.osf.io"], "open")
+        self.assertEqual(result["provider_status"]["arxiv"]["circuit"], {"export.arxiv.org": "closed"})
+
+    def test_search_with_every_circuit_open_reports_status(self):
+        """Test that search_papers still answers when every provider is skipped."""
+        requested_hosts = []
+
+        def handler(request):
+            requested_hosts.append(request.url.host)
+            return httpx.Response(200)
+
+        for host in ("export.arxiv.org", "api.openalex.org", "share.osf.io"):
+            self.breakers.breaker(host).opened_at = time.monotonic()
+
+        async def run():
+            set_http_client(create_http_client(transport=httpx.MockTransport(handler)))
+            try:
+                async with Client(tools_mcp) as client:
+                    result = await client.call_tool("search_papers", {"query": "attention"})
+                    return result.data
+            finally:
+                await close_http_client()
+
+        with mock.patch.object(core.circuit, "_registry", self.breakers):
+            result = asyncio.run(run())
+
+        self.assertEqual(requested_hosts, [])
+        self.assertEqual(result["papers"], [])
+        self.assertEqual(result["providers_searched"], [])
+        self.assertEqual({status["status"] for status in result["provider_status"].values()}, {"skipped"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Unit tests verifying that tool calls do not block each other.
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+import tempfile
+import time
+from unittest import mock
+
+import httpx
+import pymupdf
+from fastmcp import Client
+
+# Add src to path to import server modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import config
+from core.http import create_http_client, set_http_client, close_http_client
+from tools import tools_mcp
+from utils.conversion import ConversionService
+from utils.markdown_cache import MarkdownCache
+from utils.pdf2md import _download_and_parse_pdf_core, extract_pdf_to_markdown
+from utils.pdf_cache import PdfCache
+
+UPSTREAM_LATENCY = 0.3
+
+
+async def slow_openalex_handler(request):
+    """Mock OpenAlex upstream that takes UPSTREAM_LATENCY seconds per request."""
+    await asyncio.sleep(UPSTREAM_LATENCY)
+    work_id = request.url.path.rsplit("/", 1)[-1]
+    return httpx.Response(200, json={"id": f"https://openalex.org/{work_id}", "title": f"Paper {work_id}"})
+
+
+ARXIV_FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <id>http://arxiv.org/abs/1706.03762v7</id>
+    <title>Attention Is All You Need</title>
+  </entry>
+</feed>"""
+
+
+async def mixed_latency_handler(request):
+    """Mock upstreams where arXiv and OpenAlex answer quickly and every OSF host hangs."""
+    if request.url.host == "export.arxiv.org":
+        return httpx.Response(200, text=ARXIV_FEED)
+    if request.url.host == "api.openalex.org":
+        return httpx.Response(200, json={"results": [{"id": "https://openalex.org/W1", "title": "Mocked"}], "meta": {"count": 1}})
+    await asyncio.sleep(UPSTREAM_LATENCY * 10)
+    return httpx.Response(200, json={"data": []})
+
+
+class TestConcurrency(unittest.TestCase):
+    """Test class for non-blocking tool handlers."""
+
+    def test_slow_upstream_calls_run_concurrently(self):
+        """Test that N concurrent tool calls take about one upstream latency, not N."""
+        paper_ids = [f"W{i}" for i in range(1, 6)]
+
+        async def run():
+            set_http_client(create_http_client(transport=httpx.MockTransport(slow_openalex_handler)))
+            try:
+                async with Client(tools_mcp) as client:
+                    started = time.perf_counter()
+                    results = await asyncio.gather(
+                        *(client.call_tool("get_paper_metadata_by_id", {"preprint_id": paper_id}) for paper_id in paper_ids)
+                    )
+                    return results, time.perf_counter() - started
+            finally:
+                await close_http_client()
+
+        results, elapsed = asyncio.run(run())
+
+        self.assertEqual([r.data["id"] for r in results], paper_ids)
+        self.assertLess(elapsed, UPSTREAM_LATENCY * 2)
+
+    def test_identical_concurrent_metadata_requests_share_one_fetch(self):
+        """Test that concurrent lookups of the same paper ID make one upstream request."""
+        requests = []
+
+        async def counting_handler(request):
+            requests.append(request)
+            return await slow_openalex_handler(request)
+
+        async def run():
+            set_http_client(create_http_client(transport=httpx.MockTransport(counting_handler)))
+            try:
+                async with Client(tools_mcp) as client:
+                    return await asyncio.gather(
+                        *(client.call_tool("get_paper_metadata_by_id", {"preprint_id": "W42"}) for _ in range(5))
+                    )
+            finally:
+                await close_http_client()
+
+        results = asyncio.run(run())
+
+        self.assertEqual(len(requests), 1)
+        self.assertTrue(all(r.data["id"] == "W42" for r in results))
+
+    def test_identical_concurrent_pdf_requests_share_one_conversion(self):
+        """Test that concurrent requests for the same PDF download and convert it once."""
+        downloads = []
+
+        async def pdf_handler(request):
+            downloads.append(request)
+            await asyncio.sleep(UPSTREAM_LATENCY)
+            return httpx.Response(200, content=b"%PDF-1.7 paper")
+
+        async def run():
+            async with create_http_client(transport=httpx.MockTransport(pdf_handler)) as client:
+                return await asyncio.gather(
+                    *(_download_and_parse_pdf_core("https://arxiv.org/pdf/1706.03762", client=client) for _ in range(4))
+                )
+
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                mock.patch("utils.pdf2md.get_pdf_cache", return_value=PdfCache(os.path.join(cache_dir, "pdf"), 10_000, 3600)), \
+                mock.patch("utils.pdf2md.get_markdown_cache", return_value=MarkdownCache(os.path.join(cache_dir, "markdown"), 10_000)), \
+                mock.patch("utils.pdf2md.get_conversion_service", return_value=ConversionService(0, 4, 30)), \
+                mock.patch("utils.pdf2md.pdfmd.to_markdown", return_value="# Paper") as to_markdown:
+            results = asyncio.run(run())
+
+        self.assertEqual(len(downloads), 1)
+        self.assertEqual(to_markdown.call_count, 1)
+        self.assertTrue(all(result[0] == "# Paper" for result in results))
+
+    def test_progress_is_reported_to_every_waiting_caller(self):
+        """Test that callers sharing one PDF download both receive monotonic progress up to 100%."""
+        pdf = b"%PDF-1.7\n" + b"x" * 300_000
+
+        async def pdf_handler(request):
+            await asyncio.sleep(UPSTREAM_LATENCY)
+            return httpx.Response(200, content=pdf, headers={"Content-Type": "application/pdf"})
+
+        async def run():
+            updates = {"first": [], "second": []}
+
+            def handler_for(name):
+                async def handler(progress, total, message):
+                    updates[name].append((progress, total, message))
+                return handler
+
+            set_http_client(create_http_client(transport=httpx.MockTransport(pdf_handler)))
+            try:
+                async with Client(tools_mcp) as client:
+                    await asyncio.gather(
+                        *(
+                            client.call_tool(
+                                "get_paper_content_by_url",
+                                {"pdf_url": "https://osf.io/download/thesis.pdf"},
+                                progress_handler=handler_for(name),
+                            )
+                            for name in updates
+                        )
+                    )
+            finally:
+                await close_http_client()
+            return updates
+
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                mock.patch("utils.pdf2md.get_pdf_cache", return_value=PdfCache(os.path.join(cache_dir, "pdf"), 1_000_000, 3600)), \
+                mock.patch("utils.pdf2md.get_markdown_cache", return_value=MarkdownCache(os.path.join(cache_dir, "markdown"), 10_000)), \
+                mock.patch("utils.pdf2md.get_conversion_service", return_value=ConversionService(0, 4, 30)), \
+                mock.patch("utils.pdf2md.pdfmd.to_markdown", return_value="# Thesis"):
+            updates = asyncio.run(run())
+
+        for name, received in updates.items():
+            progress = [update[0] for update in received]
+            self.assertEqual(progress, sorted(set(progress)), name)
+            self.assertEqual(received[-1][:2], (100.0, 100.0), name)
+        self.assertTrue(updates["first"][0][2].startswith("Downloaded"))
+
+    def test_search_without_provider_returns_partial_results_at_deadline(self):
+        """Test that a hanging provider is reported as timed out while the others return."""
+        async def run():
+            set_http_client(create_http_client(transport=httpx.MockTransport(mixed_latency_handler)))
+            try:
+                async with Client(tools_mcp) as client:
+                    started = time.perf_counter()
+                    result = await client.call_tool("search_papers", {"query": "attention"})
+                    return result.data, time.perf_counter() - started
+            finally:
+                await close_http_client()
+
+        with mock.patch.object(config, "SEARCH_DEADLINE_SECONDS", UPSTREAM_LATENCY):
+            result, elapsed = asyncio.run(run())
+
+        self.assertLess(elapsed, UPSTREAM_LATENCY * 3)
+        self.assertEqual([r["provider"] for r in result["papers"]], ["arxiv", "openalex"])
+        self.assertEqual(result["provider_status"]["arxiv"]["status"], "ok")
+        self.assertEqual(result["provider_status"]["openalex"]["status"], "ok")
+        self.assertEqual(result["provider_status"]["osf"]["status"], "timeout")
+
+    def test_pdf_conversion_runs_off_the_event_loop(self):
+        """Test that PDF conversions leave the event loop responsive."""
+        document = pymupdf.open()
+        for page_number in range(20):
+            document.new_page().insert_text((72, 72), f"Page {page_number} " * 40)
+        pdf_bytes = document.tobytes()
+
+        async def heartbeat(ticks):
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        async def run():
+            ticks = []
+            beat = asyncio.create_task(heartbeat(ticks))
+            results = await asyncio.gather(
+                *(extract_pdf_to_markdown(pdf_bytes, filename=f"paper-{i}.pdf") for i in range(3))
+            )
+            beat.cancel()
+            return results, ticks
+
+        results, ticks = asyncio.run(run())
+
+        self.assertTrue(all("Page 19" in markdown for markdown in results))
+        self.assertLess(max(b - a for a, b in zip(ticks, ticks[1:])), 0.25)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the PDF conversion process pool.
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+import tempfile
+import time
+from unittest import mock
+
+import pymupdf
+
+# Add src to path to import server modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.conversion import ConversionQueueFull, ConversionService
+import config
+from utils.markdown_cache import MarkdownCache
+from utils.pdf2md import _convert_document, _page_batches, extract_pdf_to_markdown
+
+
+class TestConversionService(unittest.TestCase):
+    """Test class for the process-pool backed conversion service."""
+
+    def setUp(self):
+        """Set up a two-worker service."""
+        self.service = ConversionService(max_workers=2, max_queue=1, timeout=5)
+
+    def tearDown(self):
+        self.service.shutdown()
+
+    def test_jobs_run_in_parallel_across_workers(self):
+        """Test that two jobs on two workers take about one job duration."""
+        async def run():
+            # Start both worker processes before measuring
+            await asyncio.gather(self.service.convert(time.sleep, 0), self.service.convert(time.sleep, 0))
+            started = time.perf_counter()
+            await asyncio.gather(self.service.convert(time.sleep, 0.5), self.service.convert(time.sleep, 0.5))
+            return time.perf_counter() - started
+
+        self.assertLess(asyncio.run(run()), 0.9)
+
+    def test_full_queue_rejects_new_jobs(self):
+        """Test that jobs beyond workers + queue size are rejected immediately."""
+        async def run():
+            running = [asyncio.create_task(self.service.convert(time.sleep, 0.3)) for _ in range(3)]
+            await asyncio.sleep(0)
+            with self.assertRaises(ConversionQueueFull):
+                await self.service.convert(time.sleep, 0)
+            await asyncio.gather(*running)
+            return self.service.pending
+
+        self.assertEqual(asyncio.run(run()), 0)
+
+    def test_stuck_job_timeout_frees_worker_and_slot(self):
+        """Test that a job running past its timeout is killed, so its slot and worker serve the next job."""
+        self.service.timeout = 0.5
+
+        async def run():
+            with self.assertRaises(TimeoutError):
+                await self.service.convert(time.sleep, 3600)
+            await asyncio.sleep(0.5)
+            pending_after_timeout = self.service.pending
+            started = time.perf_counter()
+            result = await self.service.convert(sum, [1, 2])
+            return pending_after_timeout, result, time.perf_counter() - started, self.service.pending
+
+        pending_after_timeout, result, elapsed, pending = asyncio.run(run())
+        self.assertEqual(pending_after_timeout, 0)
+        self.assertEqual(result, 3)
+        self.assertLess(elapsed, 5)
+        self.assertEqual(pending, 0)
+
+    def test_crashed_worker_fails_only_its_job(self):
+        """Test that a worker dying breaks neither concurrent jobs nor later conversions."""
+        async def run():
+            # Start both worker processes before crashing one
+            await asyncio.gather(self.service.convert(time.sleep, 0), self.service.convert(time.sleep, 0))
+            innocent = asyncio.create_task(self.service.convert(time.sleep, 0.5))
+            await asyncio.sleep(0.1)
+            with self.assertRaisesRegex(RuntimeError, "worker crashed"):
+                await self.service.convert(os._exit, 1)
+            await innocent
+            return await self.service.convert(sum, [1, 2]), self.service.pending
+
+        self.assertEqual(asyncio.run(run()), (3, 0))
+
+    def test_concurrent_conversions_with_same_filename_stay_separate(self):
+        """Test that PDFs sharing a paper ID are parsed from memory without clobbering each other."""
+        def make_pdf(text):
+            document = pymupdf.open()
+            document.new_page().insert_text((72, 72), text)
+            return document.tobytes()
+
+        pdfs = [make_pdf(f"Version {i} of the paper") for i in range(4)]
+        self.service.max_queue = 2
+
+        async def run():
+            return await asyncio.gather(*(extract_pdf_to_markdown(pdf, filename="2401.00001.pdf") for pdf in pdfs))
+
+        with mock.patch("utils.pdf2md.get_conversion_service", return_value=self.service):
+            results = asyncio.run(run())
+
+        for i, markdown in enumerate(results):
+            self.assertIn(f"Version {i} of the paper", markdown)
+        self.assertFalse(os.path.exists("/tmp/2401.00001.pdf"))
+
+    def test_parallel_page_batches_match_serial_conversion(self):
+        """Test that a long document converted in page batches equals the serial conversion."""
+        document = pymupdf.open()
+        for page_number in range(1, 9):
+            page = document.new_page()
+            page.insert_text((72, 72), f"Chapter {page_number}", fontsize=20)
+            page.insert_text((72, 110), f"Body text of chapter {page_number}.", fontsize=10)
+
+        async def convert(path, threshold):
+            with mock.patch.object(config, "PDF_PARALLEL_PAGE_THRESHOLD", threshold):
+                return await _convert_document(path, "sha", write_images=False)
+
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                mock.patch("utils.pdf2md.get_conversion_service", return_value=self.service), \
+                mock.patch("utils.pdf2md.get_markdown_cache", return_value=MarkdownCache(temp_dir, 100_000)) as cache:
+            path = os.path.join(temp_dir, "thesis.pdf")
+            document.save(path)
+            serial = asyncio.run(convert(path, 100))
+            parallel = asyncio.run(convert(path, 4))
+            cached_page = cache.return_value.get("sha", False, page=7)
+
+        self.assertEqual(parallel, serial)
+        self.assertLess(serial.index("Chapter 1"), serial.index("Chapter 8"))
+        self.assertIn("Chapter 8", cached_page)
+
+    def test_busy_queue_converts_document_as_one_job(self):
+        """Test that a long document falls back to one job instead of failing when batches do not fit the queue."""
+        document = pymupdf.open()
+        for page_number in range(1, 9):
+            document.new_page().insert_text((72, 72), f"Chapter {page_number}", fontsize=20)
+
+        async def run(path):
+            # Other requests hold two of the three slots: enough for one job, not for two batches
+            self.service.reserve(2)
+            with mock.patch.object(config, "PDF_PARALLEL_PAGE_THRESHOLD", 4), \
+                    mock.patch.object(self.service, "convert_reserved", wraps=self.service.convert_reserved) as reserved:
+                markdown = await _convert_document(path, "sha", write_images=False)
+            self.service.release(2)
+            return markdown, reserved.call_count, self.service.pending
+
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                mock.patch("utils.pdf2md.get_conversion_service", return_value=self.service), \
+                mock.patch("utils.pdf2md.get_markdown_cache", return_value=MarkdownCache(temp_dir, 100_000)):
+            path = os.path.join(temp_dir, "thesis.pdf")
+            document.save(path)
+            markdown, batch_jobs, pending = asyncio.run(run(path))
+
+        self.assertLess(markdown.index("Chapter 1"), markdown.index("Chapter 8"))
+        self.assertEqual(batch_jobs, 0)
+        self.assertEqual(pending, 0)
+
+    def test_reserved_slots_are_not_given_to_other_jobs(self):
+        """Test that reserved slots count against the queue until their jobs finish."""
+        async def run():
+            self.assertTrue(self.service.reserve(2))
+            self.assertFalse(self.service.reserve(2))
+            job = asyncio.create_task(self.service.convert_reserved(time.sleep, 0.2))
+            await asyncio.sleep(0)
+            await self.service.convert(time.sleep, 0)  # the one free slot
+            self.service.release(1)
+            await job
+            return self.service.pending
+
+        self.assertEqual(asyncio.run(run()), 0)
+
+    def test_page_batches(self):
+        """Test that batches cover every page once, in order, one per worker."""
+        with mock.patch.object(config, "PDF_PARALLEL_PAGE_THRESHOLD", 10):
+            self.assertEqual(_page_batches(9, 4), [list(range(9))])
+            self.assertEqual(_page_batches(50, 1), [list(range(50))])
+            batches = _page_batches(10, 4)
+        with mock.patch.object(config, "PDF_PARALLEL_PAGE_THRESHOLD", 0):
+            self.assertEqual(_page_batches(500, 4), [list(range(500))])
+
+        self.assertEqual(len(batches), 4)
+        self.assertEqual([page for batch in batches for page in batch], list(range(10)))
+
+
+if __name__ == "__main__":
+    unittest.main()
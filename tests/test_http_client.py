@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared async HTTP client layer.
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+import time
+
+import httpx
+
+# Add src to path to import server modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core import fetch_openalex_papers
+from core.http import HostLimitTransport, create_http_client, get_http_client, close_http_client
+from core.ratelimit import RateLimitQueueFull, RateLimitTransport, current_session, parse_rate_limits
+from core.retry import RetryTransport, parse_retry_after
+
+
+class TestHttpClient(unittest.TestCase):
+    """Test class for the shared HTTP client."""
+
+    def test_shared_client_is_reused_within_loop(self):
+        """Test that repeated lookups return the same pooled client."""
+        async def run():
+            first = get_http_client()
+            second = get_http_client()
+            await close_http_client()
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertIs(first, second)
+        self.assertTrue(first.is_closed)
+
+    def test_shared_client_is_recreated_for_new_loop(self):
+        """Test that a client bound to a finished loop is not reused."""
+        async def run():
+            return get_http_client()
+
+        first = asyncio.run(run())
+        second = asyncio.run(run())
+        self.assertIsNot(first, second)
+
+    def test_injected_client_is_used_by_provider(self):
+        """Test that providers use the injected client instead of the network."""
+        requested_urls = []
+
+        def handler(request):
+            requested_urls.append(str(request.url))
+            return httpx.Response(200, json={"results": [{"id": "https://openalex.org/W1", "title": "Mocked"}], "meta": {"count": 1}})
+
+        async def run():
+            async with create_http_client(transport=httpx.MockTransport(handler)) as client:
+                return await fetch_openalex_papers(query="attention", client=client)
+
+        result = asyncio.run(run())
+        self.assertEqual(result["data"][0].id, "W1")
+        self.assertEqual(result["data"][0].title, "Mocked")
+        self.assertTrue(requested_urls[0].startswith("https://api.openalex.org/works?"))
+
+    def test_host_limit_caps_concurrent_requests(self):
+        """Test that in-flight requests per host never exceed the limit."""
+        in_flight = {"current": 0, "peak": 0}
+
+        async def handler(request):
+            in_flight["current"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+            await asyncio.sleep(0.01)
+            in_flight["current"] -= 1
+            return httpx.Response(200, text="ok")
+
+        async def run():
+            transport = HostLimitTransport(httpx.MockTransport(handler), max_per_host=2)
+            async with httpx.AsyncClient(transport=transport) as client:
+                await asyncio.gather(*(client.get("https://api.osf.io/v2/") for _ in range(6)))
+
+        asyncio.run(run())
+        self.assertEqual(in_flight["peak"], 2)
+
+
+class TestRateLimiting(unittest.TestCase):
+    """Test class for the per-host token bucket rate limiter."""
+
+    def setUp(self):
+        """Set up a mocked upstream that records the order requests arrive in."""
+        self.arrivals = []
+
+        def handler(request):
+            self.arrivals.append(request.headers.get("X-Caller"))
+            return httpx.Response(200)
+
+        self.handler = handler
+
+    def client(self, limits, max_queue=100):
+        transport = RateLimitTransport(httpx.MockTransport(self.handler), parse_rate_limits(limits), max_queue)
+        return httpx.AsyncClient(transport=transport)
+
+    def test_requests_are_paced_per_host(self):
+        """Test that a limited host is paced while other hosts are not."""
+        async def run():
+            async with self.client("api.osf.io=20:1") as client:
+                started = time.perf_counter()
+                await asyncio.gather(*(client.get("https://api.openalex.org/works") for _ in range(5)))
+                unlimited = time.perf_counter() - started
+
+                started = time.perf_counter()
+                await asyncio.gather(*(client.get("https://api.osf.io/v2/") for _ in range(5)))
+                return unlimited, time.perf_counter() - started
+
+        unlimited, limited = asyncio.run(run())
+        self.assertLess(unlimited, 0.05)
+        self.assertGreaterEqual(limited, 0.18)
+
+    def test_waiting_requests_are_shared_fairly_across_sessions(self):
+        """Test that a session arriving late is not stuck behind another session's backlog."""
+        async def call(client, session, caller):
+            current_session.set(session)
+            await client.get("https://export.arxiv.org/api/query", headers={"X-Caller": caller})
+
+        async def run():
+            async with self.client("export.arxiv.org=50:1") as client:
+                greedy = [asyncio.create_task(call(client, "greedy", "greedy")) for _ in range(6)]
+                await asyncio.sleep(0)
+                polite = [asyncio.create_task(call(client, "polite", "polite")) for _ in range(2)]
+                await asyncio.gather(*greedy, *polite)
+
+        asyncio.run(run())
+        self.assertLessEqual(max(i for i, caller in enumerate(self.arrivals) if caller == "polite"), 4)
+
+    def test_full_queue_fails_fast(self):
+        """Test that requests beyond the queue limit raise instead of waiting."""
+        async def run():
+            async with self.client("api.osf.io=10:1", max_queue=2) as client:
+                tasks = [asyncio.create_task(client.get("https://api.osf.io/v2/")) for _ in range(4)]
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+                return [type(result) for result in results]
+
+        outcomes = asyncio.run(run())
+        self.assertIn(RateLimitQueueFull, outcomes)
+        self.assertTrue(issubclass(RateLimitQueueFull, httpx.HTTPError))
+
+    def test_parse_rate_limits(self):
+        """Test the host=rate[:burst] configuration format."""
+        self.assertEqual(
+            parse_rate_limits("export.arxiv.org=0.333:1, api.openalex.org=10"),
+            {"export.arxiv.org": (0.333, 1), "api.openalex.org": (10.0, 1)},
+        )
+
+
+class TestRetry(unittest.TestCase):
+    """Test class for retrying transient upstream failures."""
+
+    def client(self, responses, budget=5.0):
+        """Build a client whose upstream returns (or raises) `responses` in order."""
+        self.attempts = []
+
+        def handler(request):
+            self.attempts.append((request.method, time.perf_counter()))
+            outcome = responses[min(len(self.attempts), len(responses)) - 1]
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        transport = RetryTransport(httpx.MockTransport(handler), max_attempts=4, base_delay=0.01, max_delay=0.05, budget=budget)
+        return httpx.AsyncClient(transport=transport)
+
+    def test_transient_error_is_retried_and_counted(self):
+        """Test that a 503 followed by a 200 succeeds and reports one retry in the meta."""
+        ok = httpx.Response(200, json={"results": [], "meta": {"count": 0}})
+
+        async def run():
+            async with self.client([httpx.Response(503), ok]) as client:
+                return await fetch_openalex_papers(query="attention", client=client)
+
+        result = asyncio.run(run())
+        self.assertEqual(len(self.attempts), 2)
+        self.assertEqual(result["meta"]["retries"], 1)
+
+    def test_retry_after_is_honored(self):
+        """Test that the delay requested by Retry-After is waited before retrying."""
+        async def run():
+            async with self.client([httpx.Response(429, headers={"Retry-After": "1"}), httpx.Response(200)]) as client:
+                return await client.get("https://api.openalex.org/works")
+
+        response = asyncio.run(run())
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(self.attempts[1][1] - self.attempts[0][1], 0.95)
+
+    def test_budget_stops_retries(self):
+        """Test that a Retry-After beyond the budget returns the error response right away."""
+        async def run():
+            async with self.client([httpx.Response(503, headers={"Retry-After": "60"})], budget=1.0) as client:
+                return await client.get("https://api.osf.io/v2/preprints/")
+
+        response = asyncio.run(run())
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.attempts), 1)
+
+    def test_attempts_are_capped(self):
+        """Test that a persistently failing upstream is tried at most max_attempts times."""
+        async def run():
+            async with self.client([httpx.ConnectError("refused")]) as client:
+                await client.get("https://export.arxiv.org/api/query")
+
+        with self.assertRaises(httpx.ConnectError):
+            asyncio.run(run())
+        self.assertEqual(len(self.attempts), 4)
+
+    def test_non_idempotent_requests_are_not_retried(self):
+        """Test that POST requests are sent only once."""
+        async def run():
+            async with self.client([httpx.Response(503), httpx.Response(200)]) as client:
+                return await client.post("https://api.osf.io/v2/preprints/")
+
+        response = asyncio.run(run())
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.attempts), 1)
+
+    def test_full_rate_limit_queue_is_not_retried(self):
+        """Test that local backpressure is surfaced instead of retried."""
+        async def run():
+            async with self.client([RateLimitQueueFull("full")]) as client:
+                await client.get("https://api.osf.io/v2/")
+
+        with self.assertRaises(RateLimitQueueFull):
+            asyncio.run(run())
+        self.assertEqual(len(self.attempts), 1)
+
+    def test_parse_retry_after(self):
+        """Test delta-seconds, HTTP-date and invalid Retry-After values."""
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
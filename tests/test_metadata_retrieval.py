@@ -6,11 +6,13 @@ Unit tests for metadata retrieval functionality.
 import unittest
 import sys
 import os
+import asyncio
 
 # Add src to path to import server modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from core import (
+    Paper,
     fetch_single_arxiv_paper_metadata,
     fetch_single_openalex_paper_metadata,
     fetch_single_osf_preprint_metadata,
@@ -33,49 +35,45 @@ class TestMetadataRetrieval(unittest.TestCase):
 
     def test_osf_metadata_retrieval(self):
         """Test OSF paper metadata retrieval."""
-        result = fetch_single_osf_preprint_metadata(self.osf_id)
+        result = asyncio.run(fetch_single_osf_preprint_metadata(self.osf_id))
         
-        # Assert that result is a dictionary and not an error
-        self.assertIsInstance(result, dict)
-        self.assertNotIn("status", result) or result.get("status") != "error"
+        # Assert that result is a paper and not an error
+        self.assertIsInstance(result, Paper)
         
         # Assert title and ID
-        self.assertEqual(result.get("title"), self.expected_osf_title)
-        self.assertEqual(result.get("id"), self.osf_id)
+        self.assertEqual(result.title, self.expected_osf_title)
+        self.assertEqual(result.id, self.osf_id)
 
     def test_openalex_metadata_retrieval(self):
         """Test OpenAlex paper metadata retrieval.""" 
-        result = fetch_single_openalex_paper_metadata(self.openalex_id)
+        result = asyncio.run(fetch_single_openalex_paper_metadata(self.openalex_id))
         
-        # Assert that result is a dictionary and not an error
-        self.assertIsInstance(result, dict)
-        self.assertNotIn("status", result) or result.get("status") != "error"
+        # Assert that result is a paper and not an error
+        self.assertIsInstance(result, Paper)
         
         # Assert title and ID
-        self.assertEqual(result.get("title"), self.expected_openalex_title)
-        self.assertEqual(result.get("id"), self.openalex_id)
+        self.assertEqual(result.title, self.expected_openalex_title)
+        self.assertEqual(result.id, self.openalex_id)
 
     def test_arxiv_metadata_retrieval(self):
         """Test ArXiv paper metadata retrieval."""
-        result = fetch_single_arxiv_paper_metadata(self.arxiv_id)
+        result = asyncio.run(fetch_single_arxiv_paper_metadata(self.arxiv_id))
         
-        # Assert that result is a dictionary and not an error
-        self.assertIsInstance(result, dict)
-        self.assertNotIn("status", result) or result.get("status") != "error"
+        # Assert that result is a paper and not an error
+        self.assertIsInstance(result, Paper)
         
         # Assert title and ID
-        self.assertEqual(result.get("title"), self.expected_arxiv_title)
-        self.assertEqual(result.get("id"), self.arxiv_id)
+        self.assertEqual(result.title, self.expected_arxiv_title)
+        self.assertEqual(result.id, self.arxiv_id)
 
     def test_metadata_contains_required_fields(self):
         """Test that metadata contains essential fields."""
-        result = fetch_single_arxiv_paper_metadata(self.arxiv_id)
+        result = asyncio.run(fetch_single_arxiv_paper_metadata(self.arxiv_id))
         
         # Assert required fields are present
-        self.assertIn("title", result)
-        self.assertIn("id", result)
-        self.assertIsNotNone(result.get("title"))
-        self.assertIsNotNone(result.get("id"))
+        self.assertTrue(result.title)
+        self.assertTrue(result.id)
+        self.assertTrue(result.pdf_url)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the OpenAlex client (offline, against a mocked upstream).
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+import random
+from unittest import mock
+from urllib.parse import parse_qs
+
+import httpx
+from fastmcp import Client
+
+# Add src to path to import server modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core import fetch_openalex_papers, fetch_single_openalex_paper_metadata, iter_openalex_papers
+from core.http import create_http_client, set_http_client, close_http_client
+from core.openalex import (
+    OPENALEX_WORK_FIELDS,
+    _reconstruct_abstract_by_sorting,
+    _reconstruct_abstract_from_inverted_index,
+)
+from tools import tools_mcp
+
+WORK = {
+    "id": "https://openalex.org/W1",
+    "title": "Attention Is All You Need",
+    "authorships": [{"author": {"display_name": "Ashish Vaswani"}}],
+    "abstract_inverted_index": {"Attention": [0], "matters": [1]},
+}
+
+
+class TestOpenAlexProjection(unittest.TestCase):
+    """Test class for select= field projection."""
+
+    def run_with(self, handler, call):
+        async def run():
+            async with create_http_client(transport=httpx.MockTransport(handler)) as client:
+                return await call(client)
+
+        return asyncio.run(run())
+
+    def test_requests_select_only_parsed_fields(self):
+        """Test that searches and lookups ask OpenAlex for the parsed fields only."""
+        selects = []
+
+        def handler(request):
+            selects.append(parse_qs(request.url.query.decode())["select"][0].split(","))
+            if request.url.path == "/works":
+                return httpx.Response(200, json={"results": [WORK], "meta": {"count": 1}})
+            return httpx.Response(200, json=WORK)
+
+        async def call(client):
+            return (
+                await fetch_openalex_papers(query="attention", client=client),
+                await fetch_single_openalex_paper_metadata("W1", client),
+            )
+
+        search, metadata = self.run_with(handler, call)
+
+        self.assertEqual(selects[0], list(OPENALEX_WORK_FIELDS))
+        self.assertEqual(selects[1], list(OPENALEX_WORK_FIELDS))
+        self.assertNotIn("relevance_score", selects[0])
+        self.assertNotIn("referenced_works", selects[0])
+        self.assertEqual(search["data"][0].authors, ("Ashish Vaswani",))
+        self.assertEqual(metadata.abstract, "Attention matters")
+        self.assertNotIn("relevance_score", search["data"][0].to_dict())
+
+    def test_rejected_select_falls_back_to_full_works(self):
+        """Test that a 400 for the select= list retries once without projection."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            if "select" in parse_qs(request.url.query.decode()):
+                return httpx.Response(400, json={"error": "Invalid select field"})
+            return httpx.Response(200, json=WORK)
+
+        with self.assertLogs("core.openalex", "WARNING") as logs:
+            metadata = self.run_with(handler, lambda client: fetch_single_openalex_paper_metadata("W1", client))
+
+        self.assertIn("select", logs.output[0])
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(str(requests[1].url), "https://api.openalex.org/works/W1")
+        self.assertEqual(metadata.title, "Attention Is All You Need")
+
+    def test_other_bad_requests_are_not_retried(self):
+        """Test that a 400 unrelated to select= (e.g. a malformed date filter) fails after one request."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(400, json={"error": "Invalid query parameters error.", "message": "Value for param publication_date must be a date."})
+
+        with self.assertRaises(ValueError):
+            self.run_with(handler, lambda client: fetch_openalex_papers(date_published_gte="yesterday", client=client))
+
+        self.assertEqual(len(requests), 1)
+        self.assertIn("select", parse_qs(requests[0].url.query.decode()))
+
+
+class CursorPages:
+    """Mock OpenAlex that serves `total` works in cursor pages."""
+
+    def __init__(self, total):
+        self.total = total
+        self.params = []
+
+    def __call__(self, request):
+        params = parse_qs(request.url.query.decode())
+        self.params.append(params)
+        per_page = int(params["per_page"][0])
+        start = 0 if params["cursor"][0] == "*" else int(params["cursor"][0].removeprefix("c"))
+        end = min(start + per_page, self.total)
+        works = [{"id": f"https://openalex.org/W{n}", "title": f"Paper {n}"} for n in range(start, end)]
+        next_cursor = f"c{end}" if end < self.total else None
+        return httpx.Response(200, json={"results": works, "meta": {"count": self.total, "next_cursor": next_cursor, "next_page": None}})
+
+
+class TestOpenAlexCursorPaging(unittest.TestCase):
+    """Test class for cursor-based deep paging."""
+
+    def harvest(self, upstream, **kwargs):
+        async def run():
+            async with create_http_client(transport=httpx.MockTransport(upstream)) as client:
+                return [paper.id async for paper in iter_openalex_papers(concepts="biology", client=client, **kwargs)]
+
+        return asyncio.run(run())
+
+    def test_iterator_walks_every_page(self):
+        """Test that the iterator follows next_cursor with 200 works per request until it ends."""
+        upstream = CursorPages(450)
+
+        ids = self.harvest(upstream)
+
+        self.assertEqual(ids, [f"W{n}" for n in range(450)])
+        self.assertEqual([p["cursor"][0] for p in upstream.params], ["*", "c200", "c400"])
+        self.assertTrue(all(p["per_page"] == ["200"] for p in upstream.params))
+        self.assertNotIn("page", upstream.params[0])
+
+    def test_iterator_stops_at_max_results(self):
+        """Test that max_results ends the walk without fetching further pages."""
+        upstream = CursorPages(1000)
+
+        ids = self.harvest(upstream, max_results=250)
+
+        self.assertEqual(len(ids), 250)
+        self.assertEqual([p["per_page"][0] for p in upstream.params], ["200", "50"])
+
+    @mock.patch("tools.get_provider", mock.AsyncMock(return_value={"id": "openalex", "type": "standalone"}))
+    def test_search_tool_cursor_mode(self):
+        """Test that search_papers returns next_cursor pages for OpenAlex and rejects cursor elsewhere."""
+        upstream = CursorPages(300)
+
+        async def run():
+            set_http_client(create_http_client(transport=httpx.MockTransport(upstream)))
+            try:
+                async with Client(tools_mcp) as client:
+                    first = await client.call_tool("search_papers", {"provider": "openalex", "query": "cells", "cursor": "*"})
+                    second = await client.call_tool(
+                        "search_papers", {"provider": "openalex", "query": "cells", "cursor": first.data["meta"]["next_cursor"]}
+                    )
+                    arxiv = await client.call_tool("search_papers", {"provider": "arxiv", "cursor": "*"})
+                    return first.data, second.data, arxiv.data
+            finally:
+                await close_http_client()
+
+        first, second, arxiv = asyncio.run(run())
+
+        self.assertEqual(len(first["data"]), 200)
+        self.assertEqual(first["meta"]["next_cursor"], "c200")
+        self.assertEqual(len(second["data"]), 100)
+        self.assertIsNone(second["meta"]["next_cursor"])
+        self.assertIn("error", arxiv)
+
+
+class TestAbstractReconstruction(unittest.TestCase):
+    """Test class for rebuilding abstracts from inverted indexes."""
+
+    def assertSameAsSorting(self, inverted_index):
+        self.assertEqual(
+            _reconstruct_abstract_from_inverted_index(inverted_index),
+            _reconstruct_abstract_by_sorting(inverted_index),
+            inverted_index,
+        )
+
+    def test_reconstructs_text(self):
+        """Test that words are placed at their positions, skipping gaps."""
+        index = {"Attention": [0], "is": [1, 5], "all": [2], "you": [3], "need": [4], "everything": [7]}
+
+        self.assertEqual(_reconstruct_abstract_from_inverted_index(index), "Attention is all you need is everything")
+        self.assertEqual(_reconstruct_abstract_from_inverted_index({}), "")
+        self.assertEqual(_reconstruct_abstract_from_inverted_index(None), "")
+
+    def test_matches_sorting_on_random_indexes(self):
+        """Test that the linear reconstruction is identical to the sort-based one, including edge cases."""
+        rng = random.Random(7)
+        for _ in range(500):
+            length = rng.randint(0, 300)
+            index = {}
+            for position in range(length):
+                if rng.random() < 0.1:
+                    continue  # gap
+                index.setdefault(f"w{rng.randint(0, length // 3 + 1)}", []).append(position)
+            if index and rng.random() < 0.3:
+                # Several words at one position
+                index[f"dup{rng.randint(0, 3)}"] = [rng.randrange(length)]
+            self.assertSameAsSorting(index)
+
+        for index in (
+            {"a": [2], "b": [-1], "c": [0]},
+            {"a": [1.0], "b": [0]},
+            {"a": [0], "b": "not a list", "c": [1]},
+            {"a": [10**9], "b": [0]},
+            {"a": ["x"], "b": [0]},
+            {"a": [], "b": [0]},
+            {"a": [0, 0], "b": [0]},
+        ):
+            self.assertSameAsSorting(index)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared Paper record.
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+from unittest import mock
+
+import httpx
+from fastmcp import Client
+
+# Add src to path to import server modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core import Paper, serialize
+from core.osf import _parse_osf_preprint
+from core.http import create_http_client, set_http_client, close_http_client
+from tools import tools_mcp
+
+ARXIV_FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">
+  <opensearch:totalResults>1</opensearch:totalResults>
+  <entry>
+    <id>http://arxiv.org/abs/1706.03762v7</id>
+    <title>Attention Is All You Need</title>
+    <summary>Transformers.</summary>
+  </entry>
+</feed>"""
+
+
+async def mock_upstreams(request):
+    """Mock arXiv, OpenAlex and OSF each returning one paper in its own format."""
+    if request.url.host == "export.arxiv.org":
+        return httpx.Response(200, text=ARXIV_FEED)
+    if request.url.host == "api.openalex.org":
+        work = {"id": "https://openalex.org/W1", "title": "Attention", "publication_date": "2017-06-12", "cited_by_count": 9}
+        return httpx.Response(200, json={"results": [work], "meta": {"count": 1}})
+    preprint = {
+        "id": "abcde",
+        "attributes": {
+            "title": "Attention in OSF",
+            "description": "A preprint.",
+            "date_published": "2020-01-01",
+            "subjects": [[{"id": "1", "text": "Psychology"}, {"id": "2", "text": "Cognitive Psychology"}]],
+        },
+        "links": {"html": "https://osf.io/preprints/psyarxiv/abcde"},
+    }
+    return httpx.Response(200, json={"data": [preprint], "meta": {"total": 1}, "links": {}})
+
+
+class TestPaper(unittest.TestCase):
+    """Test class for Paper records and their serialization."""
+
+    def test_record_is_compact_and_immutable(self):
+        """Test that papers have no per-instance dict and cannot be modified."""
+        paper = Paper(provider="arxiv", id="1706.03762v7", title="Attention", authors=("A. Vaswani",))
+
+        self.assertFalse(hasattr(paper, "__dict__"))
+        with self.assertRaises(AttributeError):
+            paper.title = "Changed"
+        self.assertEqual(paper.key, ("arxiv", "1706.03762v7"))
+        self.assertEqual(paper, Paper(provider="arxiv", id="1706.03762v7", title="Attention", authors=("A. Vaswani",)))
+
+    def test_osf_paper_is_hashable_and_to_dict_copies(self):
+        """Test that nested OSF extras are frozen and that tool output cannot change the shared record."""
+        item = {
+            "id": "abcde",
+            "attributes": {
+                "title": "Attention in OSF",
+                "tags": ["attention", "memory"],
+                "license_record": {"copyright_holders": ["A. Author"], "year": "2020"},
+            },
+        }
+        paper = _parse_osf_preprint(item)
+
+        self.assertEqual(hash(paper), hash(_parse_osf_preprint(item)))
+        self.assertEqual(len({paper, _parse_osf_preprint(item)}), 1)
+
+        first = paper.to_dict()
+        self.assertEqual(first["tags"], ["attention", "memory"])
+        self.assertEqual(first["license_record"], {"copyright_holders": ["A. Author"], "year": "2020"})
+        first["tags"].append("changed")
+        first["license_record"]["copyright_holders"].append("changed")
+        self.assertEqual(paper.to_dict(), {**first, "tags": ["attention", "memory"],
+                                           "license_record": {"copyright_holders": ["A. Author"], "year": "2020"}})
+
+    def test_serialize_converts_nested_papers(self):
+        """Test that serialize turns papers inside results into dicts and keeps provider extras."""
+        paper = Paper(provider="openalex", id="W1", subjects=("Biology",), extra=(("cited_by_count", 3),))
+        result = {"data": [paper], "meta": {"total_results": 1}}
+
+        serialized = serialize(result)
+
+        self.assertEqual(serialized["data"][0]["subjects"], ["Biology"])
+        self.assertEqual(serialized["data"][0]["cited_by_count"], 3)
+        self.assertEqual(serialized["meta"], {"total_results": 1})
+        self.assertIs(result["data"][0], paper)
+
+    @mock.patch("tools.get_provider", mock.AsyncMock(side_effect=lambda provider: {"id": provider, "type": "standalone"}))
+    def test_search_results_have_one_shape_for_all_providers(self):
+        """Test that search_papers returns the same paper fields for arXiv, OpenAlex and OSF."""
+
+        async def run():
+            set_http_client(create_http_client(transport=httpx.MockTransport(mock_upstreams)))
+            try:
+                async with Client(tools_mcp) as client:
+                    return {
+                        provider: (await client.call_tool("search_papers", {"provider": provider})).data["data"][0]
+                        for provider in ("arxiv", "openalex", "osf")
+                    }
+            finally:
+                await close_http_client()
+
+        papers = asyncio.run(run())
+
+        common = set(Paper.__dataclass_fields__) - {"extra"}
+        for provider, paper in papers.items():
+            self.assertLessEqual(common, set(paper), provider)
+            self.assertEqual(paper["provider"], provider)
+        self.assertEqual(papers["arxiv"]["abstract"], "Transformers.")
+        self.assertEqual(papers["openalex"]["published"], "2017-06-12")
+        self.assertEqual(papers["osf"]["subjects"], ["Psychology", "Cognitive Psychology"])
+        self.assertEqual(papers["osf"]["url"], "https://osf.io/preprints/psyarxiv/abcde")
+
+
+if __name__ == "__main__":
+    unittest.main()
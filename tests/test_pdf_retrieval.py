@@ -35,10 +35,10 @@ class TestPdfRetrieval(unittest.TestCase):
 
     def test_osf_pdf_retrieval(self):
         """Test OSF paper PDF retrieval and content extraction."""
-        metadata = fetch_single_osf_preprint_metadata(self.osf_id)
+        metadata = asyncio.run(fetch_single_osf_preprint_metadata(self.osf_id))
         result = asyncio.run(download_paper_and_parse_to_markdown(
-            metadata=metadata,
-            pdf_url_field="download_url",
+            metadata=metadata.to_dict(),
+            pdf_url_field="pdf_url",
             paper_id=self.osf_id,
             write_images=False
         ))
@@ -54,9 +54,9 @@ class TestPdfRetrieval(unittest.TestCase):
 
     def test_openalex_pdf_retrieval(self):
         """Test OpenAlex paper PDF retrieval and content extraction."""
-        metadata = fetch_single_openalex_paper_metadata(self.openalex_id)
+        metadata = asyncio.run(fetch_single_openalex_paper_metadata(self.openalex_id))
         result = asyncio.run(download_paper_and_parse_to_markdown(
-            metadata=metadata,
+            metadata=metadata.to_dict(),
             pdf_url_field="pdf_url",
             paper_id=self.openalex_id,
             write_images=False
@@ -73,10 +73,10 @@ class TestPdfRetrieval(unittest.TestCase):
 
     def test_arxiv_pdf_retrieval(self):
         """Test ArXiv paper PDF retrieval and content extraction."""
-        metadata = fetch_single_arxiv_paper_metadata(self.arxiv_id)
+        metadata = asyncio.run(fetch_single_arxiv_paper_metadata(self.arxiv_id))
         result = asyncio.run(download_paper_and_parse_to_markdown(
-            metadata=metadata,
-            pdf_url_field="download_url",
+            metadata=metadata.to_dict(),
+            pdf_url_field="pdf_url",
             paper_id=self.arxiv_id,
             write_images=False
         ))
@@ -92,10 +92,10 @@ class TestPdfRetrieval(unittest.TestCase):
 
     def test_pdf_content_contains_markdown(self):
         """Test that PDF content is properly converted to markdown."""
-        metadata = fetch_single_arxiv_paper_metadata(self.arxiv_id)
+        metadata = asyncio.run(fetch_single_arxiv_paper_metadata(self.arxiv_id))
         result = asyncio.run(download_paper_and_parse_to_markdown(
-            metadata=metadata,
-            pdf_url_field="download_url",
+            metadata=metadata.to_dict(),
+            pdf_url_field="pdf_url",
             paper_id=self.arxiv_id,
             write_images=False
         ))
@@ -112,10 +112,10 @@ class TestPdfRetrieval(unittest.TestCase):
 
     def test_pdf_retrieval_includes_metadata(self):
         """Test that PDF retrieval includes paper metadata."""
-        metadata = fetch_single_osf_preprint_metadata(self.osf_id)
+        metadata = asyncio.run(fetch_single_osf_preprint_metadata(self.osf_id))
         result = asyncio.run(download_paper_and_parse_to_markdown(
-            metadata=metadata,
-            pdf_url_field="download_url",
+            metadata=metadata.to_dict(),
+            pdf_url_field="pdf_url",
             paper_id=self.osf_id,
             write_images=False
         ))